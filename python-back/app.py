@@ -8,9 +8,10 @@ load_dotenv()
 
 # Import database utilities
 from utils.database import init_db
+from services.csv_jobs import csv_jobs
 
 # Import routers
-from routes import auth, machines, components, csv_upload, failure_items, machine_positions, machine_pictures
+from routes import auth, machines, components, csv_upload, failure_items, machine_positions, machine_pictures, reliability, diagrams
 
 # Create FastAPI app
 app = FastAPI(
@@ -41,17 +42,29 @@ app.include_router(failure_items.router)
 app.include_router(csv_upload.router)
 app.include_router(machine_positions.router)
 app.include_router(machine_pictures.router)
+app.include_router(reliability.router)
+app.include_router(diagrams.router)
 
 @app.on_event("startup")
 def on_startup():
     """
     Initialize database on startup.
-    Creates tables if they don't exist.
+    Creates tables if they don't exist and fails CSV uploads interrupted by a restart.
     """
     print("🚀 Starting Factory Reliability API...")
     init_db()
+    interrupted = csv_jobs.fail_interrupted()
+    if interrupted:
+        print(f"✓ Marked {interrupted} interrupted CSV upload(s) as failed")
     print("✓ Server is ready!")
 
+@app.on_event("shutdown")
+def on_shutdown():
+    """
+    Let queued CSV jobs finish before the process exits.
+    """
+    csv_jobs.shutdown(wait=True)
+
 @app.get("/")
 def root():
     """
@@ -0,0 +1,37 @@
+"""
+Migration: Add csv_upload_id column to components table
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text, inspect
+from utils.database import engine
+
+def upgrade():
+    """Add csv_upload_id (the CsvUpload that imported the row) to components"""
+    existing = {col["name"] for col in inspect(engine).get_columns("components")}
+    if "csv_upload_id" in existing:
+        print("✓ csv_upload_id column already exists")
+        return
+
+    with engine.connect() as conn:
+        conn.execute(text("ALTER TABLE components ADD COLUMN csv_upload_id VARCHAR"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_components_csv_upload_id ON components (csv_upload_id)"
+        ))
+        conn.commit()
+    print("✓ Added csv_upload_id column to components table")
+
+def downgrade():
+    """Remove csv_upload_id from components"""
+    with engine.connect() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS ix_components_csv_upload_id"))
+        conn.execute(text("ALTER TABLE components DROP COLUMN csv_upload_id"))
+        conn.commit()
+    print("✓ Removed csv_upload_id column")
+
+if __name__ == "__main__":
+    print("Running migration: add_component_upload")
+    upgrade()
+    print("Migration complete")
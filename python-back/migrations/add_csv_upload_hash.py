@@ -0,0 +1,37 @@
+"""
+Migration: Add content_hash column to csv_uploads table
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text, inspect
+from utils.database import engine
+
+def upgrade():
+    """Add content_hash (SHA-256 of the uploaded file) to csv_uploads"""
+    existing = {col["name"] for col in inspect(engine).get_columns("csv_uploads")}
+    if "content_hash" in existing:
+        print("✓ content_hash column already exists")
+        return
+
+    with engine.connect() as conn:
+        conn.execute(text("ALTER TABLE csv_uploads ADD COLUMN content_hash VARCHAR(64)"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_csv_uploads_content_hash ON csv_uploads (content_hash)"
+        ))
+        conn.commit()
+    print("✓ Added content_hash column to csv_uploads table")
+
+def downgrade():
+    """Remove content_hash from csv_uploads"""
+    with engine.connect() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS ix_csv_uploads_content_hash"))
+        conn.execute(text("ALTER TABLE csv_uploads DROP COLUMN content_hash"))
+        conn.commit()
+    print("✓ Removed content_hash column")
+
+if __name__ == "__main__":
+    print("Running migration: add_csv_upload_hash")
+    upgrade()
+    print("Migration complete")
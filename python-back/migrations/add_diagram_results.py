@@ -0,0 +1,47 @@
+"""
+Migration: Add diagram_id and cache_key columns to reliability_results table
+(the diagrams table itself is created by init_db)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text, inspect
+from utils.database import engine
+from models.database import Base
+
+RESULT_COLUMNS = {
+    "diagram_id": "VARCHAR REFERENCES diagrams(id) ON DELETE CASCADE",
+    "cache_key": "VARCHAR(64)",
+}
+
+def upgrade():
+    """Create the diagrams table and add diagram_id / cache_key to reliability_results"""
+    Base.metadata.tables["diagrams"].create(bind=engine, checkfirst=True)
+    existing = {col["name"] for col in inspect(engine).get_columns("reliability_results")}
+
+    with engine.connect() as conn:
+        for name, sql_type in RESULT_COLUMNS.items():
+            if name in existing:
+                print(f"✓ {name} column already exists")
+                continue
+            conn.execute(text(f"ALTER TABLE reliability_results ADD COLUMN {name} {sql_type}"))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_reliability_results_{name} ON reliability_results ({name})"
+            ))
+            print(f"✓ Added {name} column to reliability_results table")
+        conn.commit()
+
+def downgrade():
+    """Remove diagram_id / cache_key from reliability_results"""
+    with engine.connect() as conn:
+        for name in RESULT_COLUMNS:
+            conn.execute(text(f"DROP INDEX IF EXISTS ix_reliability_results_{name}"))
+            conn.execute(text(f"ALTER TABLE reliability_results DROP COLUMN {name}"))
+        conn.commit()
+    print("✓ Removed diagram result columns")
+
+if __name__ == "__main__":
+    print("Running migration: add_diagram_results")
+    upgrade()
+    print("Migration complete")
@@ -0,0 +1,42 @@
+"""
+Migration: Add warm-start MLE state columns to components table
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text, inspect
+from utils.database import engine
+
+FIT_STATE_COLUMNS = {
+    "fit_alpha": "FLOAT",
+    "fit_beta": "FLOAT",
+    "fit_count": "INTEGER",
+    "fit_sum_log": "FLOAT",
+}
+
+def upgrade():
+    """Add fit_alpha, fit_beta, fit_count and fit_sum_log columns to components table"""
+    existing = {col["name"] for col in inspect(engine).get_columns("components")}
+
+    with engine.connect() as conn:
+        for name, sql_type in FIT_STATE_COLUMNS.items():
+            if name in existing:
+                print(f"✓ {name} column already exists")
+                continue
+            conn.execute(text(f"ALTER TABLE components ADD COLUMN {name} {sql_type}"))
+            print(f"✓ Added {name} column to components table")
+        conn.commit()
+
+def downgrade():
+    """Remove fit state columns from components table"""
+    with engine.connect() as conn:
+        for name in FIT_STATE_COLUMNS:
+            conn.execute(text(f"ALTER TABLE components DROP COLUMN {name}"))
+        conn.commit()
+    print("✓ Removed fit state columns")
+
+if __name__ == "__main__":
+    print("Running migration: add_fit_state")
+    upgrade()
+    print("Migration complete")
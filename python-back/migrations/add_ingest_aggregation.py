@@ -0,0 +1,47 @@
+"""
+Migration: Add failure statistics columns to components and ingest_mode to csv_uploads
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text, inspect
+from utils.database import engine
+
+NEW_COLUMNS = {
+    "components": {
+        "failure_count": "INTEGER",
+        "failure_sd": "FLOAT",
+    },
+    "csv_uploads": {
+        "ingest_mode": "VARCHAR(20) DEFAULT 'rows'",
+    },
+}
+
+def upgrade():
+    """Add failure_count / failure_sd to components and ingest_mode to csv_uploads"""
+    inspector = inspect(engine)
+    with engine.connect() as conn:
+        for table, columns in NEW_COLUMNS.items():
+            existing = {col["name"] for col in inspector.get_columns(table)}
+            for name, sql_type in columns.items():
+                if name in existing:
+                    print(f"✓ {name} column already exists")
+                    continue
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}"))
+                print(f"✓ Added {name} column to {table} table")
+        conn.commit()
+
+def downgrade():
+    """Remove the ingest aggregation columns"""
+    with engine.connect() as conn:
+        for table, columns in NEW_COLUMNS.items():
+            for name in columns:
+                conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {name}"))
+        conn.commit()
+    print("✓ Removed ingest aggregation columns")
+
+if __name__ == "__main__":
+    print("Running migration: add_ingest_aggregation")
+    upgrade()
+    print("Migration complete")
@@ -28,6 +28,7 @@ class User(Base):
     reliability_results = relationship("ReliabilityResult", back_populates="user", cascade="all, delete-orphan")
     machine_positions = relationship("MachinePosition", back_populates="user", cascade="all, delete-orphan")
     machine_pictures = relationship("MachinePicture", back_populates="user", cascade="all, delete-orphan")
+    diagrams = relationship("Diagram", back_populates="user", cascade="all, delete-orphan")
 
 
 class Machine(Base):
@@ -59,6 +60,13 @@ class Component(Base):
     failure_mode = Column(String(255), nullable=True)
     failure_hours = Column(Float, nullable=True)  # Mean Time (MT) for default calculation
     manual_hours = Column(JSON, nullable=True)  # Array of manual failure hours for MLE calculation
+    fit_alpha = Column(Float, nullable=True)  # Last MLE shape fitted from manual_hours (warm start)
+    fit_beta = Column(Float, nullable=True)  # Last MLE scale fitted from manual_hours
+    fit_count = Column(Integer, nullable=True)  # Number of manual_hours in the last fit
+    fit_sum_log = Column(Float, nullable=True)  # Sum of ln(manual_hours) in the last fit
+    failure_count = Column(Integer, nullable=True)  # Failure events aggregated at CSV import
+    failure_sd = Column(Float, nullable=True)  # SD of the aggregated failure hours
+    csv_upload_id = Column(String, nullable=True, index=True)  # CsvUpload that imported the row
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -114,6 +122,8 @@ class CsvUpload(Base):
     file_size = Column(Integer, nullable=True)
     records_count = Column(Integer, nullable=True)
     status = Column(String(50), nullable=False, default="pending", index=True)  # pending, processing, completed, failed
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the uploaded bytes
+    ingest_mode = Column(String(20), nullable=True, default="rows")  # rows, aggregate
     error_message = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     processed_at = Column(DateTime(timezone=True), nullable=True)
@@ -128,13 +138,35 @@ class ReliabilityResult(Base):
     id = Column(String, primary_key=True, default=generate_uuid)
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     component_id = Column(String, ForeignKey("components.id", ondelete="CASCADE"), nullable=True, index=True)
-    analysis_type = Column(String(100), nullable=False)  # weibull, risk_matrix, etc.
+    diagram_id = Column(String, ForeignKey("diagrams.id", ondelete="CASCADE"), nullable=True, index=True)
+    analysis_type = Column(String(100), nullable=False)  # weibull, risk_matrix, rbd, etc.
+    cache_key = Column(String(64), nullable=True, index=True)  # Inputs fingerprint for cached results
     results = Column(Text, nullable=False)  # JSON string
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     user = relationship("User", back_populates="reliability_results")
     component = relationship("Component", back_populates="reliability_results")
+    diagram = relationship("Diagram", back_populates="reliability_results")
+
+
+class Diagram(Base):
+    __tablename__ = "diagrams"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    machine_id = Column(String, ForeignKey("machines.id", ondelete="SET NULL"), nullable=True, index=True)
+    name = Column(String(255), nullable=False)
+    diagram_type = Column(String(50), nullable=False, default="component")  # component (GroupComponent) or fail_item (GroupFailItem)
+    content = Column(JSON, nullable=False)  # GoJS GraphLinksModel
+    bindings = Column(JSON, nullable=True)  # Leaf label -> component / failure item id
+    structure_hash = Column(String(64), nullable=False, index=True)  # SHA-256 of the gate structure
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    user = relationship("User", back_populates="diagrams")
+    reliability_results = relationship("ReliabilityResult", back_populates="diagram", cascade="all, delete-orphan")
 
 
 class MachinePosition(Base):
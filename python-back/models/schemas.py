@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Union
 from datetime import datetime
 
 # ============= Auth Schemas =============
@@ -84,6 +84,11 @@ class ComponentResponse(BaseModel):
     failure_mode: Optional[str]
     failure_hours: Optional[float]
     manual_hours: Optional[List[float]]  # Array of manual failure hours
+    fit_alpha: Optional[float] = None  # MLE shape from manual_hours
+    fit_beta: Optional[float] = None  # MLE scale from manual_hours
+    failure_count: Optional[int] = None  # Failure events aggregated at CSV import
+    failure_sd: Optional[float] = None  # SD of the aggregated failure hours
+    csv_upload_id: Optional[str] = None  # CSV upload that imported the row
     created_at: datetime
     updated_at: datetime
 
@@ -102,6 +107,8 @@ class CSVUploadResponse(BaseModel):
     error_message: Optional[str]
     created_at: datetime
     processed_at: Optional[datetime]
+    content_hash: Optional[str] = None
+    ingest_mode: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -118,6 +125,213 @@ class WeibullAnalysisResponse(BaseModel):
     reliability_at_time: dict
     graph_data: Optional[dict] = None
 
+class ReliabilityCurveRequest(BaseModel):
+    component_ids: List[str]
+    times: Optional[List[float]] = None  # Explicit time grid; overrides t_max/n_points
+    t_max: Optional[float] = None  # Default: time where the most durable component reaches R = 0.001
+    n_points: int = Field(default=1000, ge=2, le=10000)
+
+class ComponentCurve(BaseModel):
+    component_id: str
+    shape: float
+    scale: float
+    reliability: List[Optional[float]]
+    unreliability: List[Optional[float]]
+    pdf: List[Optional[float]]
+    hazard: List[Optional[float]]  # None where the hazard is infinite (t = 0, shape < 1)
+
+class ReliabilityCurveResponse(BaseModel):
+    times: List[float]
+    curves: List[ComponentCurve]
+
+class ShardTiming(BaseModel):
+    shard: int
+    components: int
+    seconds: float
+    pid: int
+
+class FleetRefitResponse(BaseModel):
+    components: int
+    results_written: int
+    shards: int
+    workers: Optional[int]
+    fit_seconds: float
+    total_seconds: float
+    shard_timings: List[ShardTiming]
+
+class ParameterBound(BaseModel):
+    estimate: float
+    lower: float
+    upper: float
+
+class ReliabilityBound(ParameterBound):
+    time: float
+
+class ConfidenceBoundsResponse(BaseModel):
+    component_id: str
+    method: str  # bootstrap or fisher
+    confidence: float
+    n_bootstrap: Optional[int] = None  # Resamples used (bootstrap only)
+    alpha: ParameterBound
+    beta: ParameterBound
+    reliability: ReliabilityBound
+
+# ============= Reliability Block Diagram Schemas =============
+
+class RBDEvaluateRequest(BaseModel):
+    diagram: dict  # GoJS GraphLinksModel with nodeDataArray (GroupComponent / GroupFailItem)
+    reliabilities: Dict[str, float]  # Leaf label -> R, e.g. "fi-11-001 Actuating device_VIB"
+    mode: Optional[str] = None  # Failure mode suffix for failure-item leaves
+
+class RBDNodeValue(BaseModel):
+    key: Optional[Union[str, int]]
+    text: str
+    gate: str  # series, parallel, leaf or e.g. 2-out-of-3
+    reliability: float
+
+class RBDEvaluateResponse(BaseModel):
+    r_system: float
+    nodes: List[RBDNodeValue]
+
+class WeibullParameters(BaseModel):
+    shape: float = Field(gt=0)
+    scale: float = Field(gt=0)
+
+class RBDCurveRequest(BaseModel):
+    diagram: dict
+    parameters: Dict[str, WeibullParameters]  # Leaf label -> Weibull parameters
+    mode: Optional[str] = None
+    times: Optional[List[float]] = None
+    t_max: Optional[float] = None
+    n_points: int = Field(default=2000, ge=2, le=100000)
+
+class RBDCurveResponse(BaseModel):
+    times: List[float]
+    r_system: List[Optional[float]]
+
+class RBDLiveRequest(BaseModel):
+    diagram: dict
+    bindings: Dict[str, str]  # Leaf label -> component id or failure item id
+    mode: Optional[str] = None
+    times: Optional[List[float]] = None
+    t_max: Optional[float] = None
+    n_points: int = Field(default=200, ge=2, le=100000)
+
+class RBDLiveResponse(BaseModel):
+    id: str
+    times: List[float]
+    r_system: List[Optional[float]]
+    n_nodes: int
+    leaves_updated: int  # In the last update
+    nodes_reevaluated: int  # Group nodes recomputed in the last update
+    stale_sources: List[str] = []  # Bound rows without usable parameters; their leaves keep their last values
+
+class RBDModesRequest(BaseModel):
+    diagram: dict
+    reliabilities: Dict[str, float]  # "<label>_<mode>" (and plain component labels) -> R
+    modes: List[str] = Field(default=["VIB", "UST", "UNK", "STP", "STD", "SER"], min_length=1)
+    missing_reliability: Optional[float] = Field(default=None, ge=0, le=1)  # R for absent mode labels
+
+class RBDModeValue(BaseModel):
+    mode: str
+    r_system: float
+
+class RBDModesResponse(BaseModel):
+    modes: List[RBDModeValue]
+    r_all_modes: float  # All modes as competing risks
+
+class RBDMeanLifeRequest(BaseModel):
+    diagram: dict
+    parameters: Dict[str, WeibullParameters]  # Leaf label -> Weibull parameters
+    mode: Optional[str] = None
+    ages: List[float] = []  # Ages for the mean residual life
+    method: str = "tanh-sinh"  # tanh-sinh or laguerre
+
+class ResidualLife(BaseModel):
+    age: float
+    reliability: float  # R_sys(age)
+    mrl: Optional[float]  # None when R_sys(age) is 0
+    error: Optional[float]
+
+class RBDMeanLifeResponse(BaseModel):
+    mttf: float
+    mttf_error: float  # Difference to the coarser quadrature rule
+    std_deviation: float  # Of the system time-to-failure
+    mrl: List[ResidualLife]
+    nodes: int  # Time points evaluated
+    method: str
+
+class RBDImportanceRequest(BaseModel):
+    diagram: dict
+    reliabilities: Optional[Dict[str, float]] = None  # Leaf label -> R
+    parameters: Optional[Dict[str, WeibullParameters]] = None  # Or leaf label -> Weibull parameters ...
+    time: Optional[float] = None  # ... evaluated at this mission time
+    mode: Optional[str] = None
+
+class RBDNodeImportance(BaseModel):
+    key: Optional[Union[str, int]]
+    text: str
+    gate: str
+    reliability: float
+    birnbaum: float
+    criticality: Optional[float]
+    raw: Optional[float]  # Risk achievement worth
+    rrw: Optional[float]  # Risk reduction worth
+
+class RBDImportanceResponse(BaseModel):
+    r_system: float
+    nodes: List[RBDNodeImportance]  # Every block except the system root, most critical first
+
+class RBDSimulateRequest(BaseModel):
+    diagram: dict
+    parameters: Dict[str, WeibullParameters]  # Leaf label -> Weibull parameters
+    mode: Optional[str] = None
+    n_samples: int = Field(default=100000, ge=2, le=100000000)
+    seed: Optional[int] = None
+    percentiles: List[float] = [1.0, 5.0, 10.0, 50.0, 90.0, 95.0, 99.0]
+    times: Optional[List[float]] = None  # Time points for the empirical R(t)
+
+class SimulationPercentile(BaseModel):
+    percentile: float
+    time: float
+
+class RBDSimulateResponse(BaseModel):
+    n_samples: int
+    mttf: float
+    variance: float  # Variance of the system time-to-failure
+    std_deviation: float
+    mttf_std_error: float  # Standard error of the MTTF estimate
+    percentiles: List[SimulationPercentile]
+    times: List[float]
+    reliability: List[float]  # Fraction of simulated systems surviving each time
+    min: float
+    max: float
+    seed: int  # Root seed (at most 52 bits when drawn); pass it back to reproduce the run
+    chunks: int
+    workers: Optional[int]
+    seconds: float
+
+class RBDStoredCurveRequest(BaseModel):
+    mode: Optional[str] = None
+    times: Optional[List[float]] = None
+    t_max: Optional[float] = None
+    n_points: int = Field(default=200, ge=2, le=100000)
+
+class RBDStoredCurveResponse(BaseModel):
+    diagram_id: str
+    structure_hash: str
+    times: List[float]
+    r_system: List[Optional[float]]
+    cached: bool  # Read from reliability_results instead of recomputed
+
+class FleetCurveRequest(BaseModel):
+    mode: Optional[str] = None
+    machine_ids: Optional[List[str]] = None  # Default: every machine of the user
+    diagram_type: Optional[str] = None  # component or fail_item
+    times: Optional[List[float]] = None
+    t_max: Optional[float] = None
+    n_points: int = Field(default=200, ge=2, le=100000)
+
 class RiskMatrixRequest(BaseModel):
     failure_modes: List[dict]
 
@@ -142,6 +356,37 @@ class ReliabilityResultResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# ============= Diagram Schemas =============
+
+class DiagramCreate(BaseModel):
+    name: str
+    machine_id: Optional[str] = None
+    diagram_type: str = "component"  # component (GroupComponent) or fail_item (GroupFailItem)
+    content: dict  # GoJS GraphLinksModel with nodeDataArray
+    bindings: Optional[Dict[str, str]] = None  # Leaf label -> component / failure item id
+
+class DiagramUpdate(BaseModel):
+    name: Optional[str] = None
+    machine_id: Optional[str] = None
+    diagram_type: Optional[str] = None
+    content: Optional[dict] = None
+    bindings: Optional[Dict[str, str]] = None
+
+class DiagramResponse(BaseModel):
+    id: str
+    user_id: str
+    machine_id: Optional[str]
+    name: str
+    diagram_type: str
+    content: dict
+    bindings: Optional[Dict[str, str]]
+    structure_hash: str
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
 # ============= Machine Position Schemas =============
 
 class MachinePositionCreate(BaseModel):
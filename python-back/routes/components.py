@@ -1,14 +1,51 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from models.schemas import ComponentCreate, ComponentUpdate, ComponentResponse
 from models.database import Component, User
+from services.rbd_incremental import rbd_registry, refresh_source
+from services.reliability_calculator import ReliabilityCalculator
 from utils.database import get_db
 from utils.auth import get_current_user
 
 router = APIRouter(prefix="/components", tags=["components"])
 
+
+def update_fit_state(component: Component, previous_hours: Optional[List[float]] = None):
+    """
+    Refit the stored MLE state of a component after its manual_hours change.
+
+    When the new manual_hours only append to the previously fitted values, the
+    fit is warm-started from the stored shape and sufficient statistics;
+    otherwise it is a cold fit. The state is cleared when manual_hours is empty.
+    """
+    hours = component.manual_hours
+    if not hours:
+        component.fit_alpha = None
+        component.fit_beta = None
+        component.fit_count = None
+        component.fit_sum_log = None
+        return
+
+    appended = (
+        previous_hours
+        and component.fit_count == len(previous_hours)
+        and list(hours[:len(previous_hours)]) == list(previous_hours)
+    )
+    if appended:
+        alpha, beta, count, sum_log, _ = ReliabilityCalculator.refit_manual_hours(
+            hours, component.fit_alpha, component.fit_count, component.fit_sum_log
+        )
+    else:
+        alpha, beta, count, sum_log, _ = ReliabilityCalculator.refit_manual_hours(hours)
+
+    component.fit_alpha = alpha
+    component.fit_beta = beta
+    component.fit_count = count
+    component.fit_sum_log = sum_log
+
+
 @router.get("", response_model=List[ComponentResponse])
 def get_components(
     machine_id: str = None,
@@ -69,6 +106,7 @@ def create_component(
         failure_hours=component_data.failure_hours,
         manual_hours=component_data.manual_hours
     )
+    update_fit_state(component)
 
     db.add(component)
     db.commit()
@@ -120,13 +158,20 @@ def update_component(
         )
 
     # Update fields if provided
+    previous_hours = component.manual_hours
     update_data = component_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(component, field, value)
 
+    if "manual_hours" in update_data and update_data["manual_hours"] != previous_hours:
+        update_fit_state(component, previous_hours)
+
     db.commit()
     db.refresh(component)
 
+    # Refresh live diagrams using the row
+    refresh_source(db, current_user.id, component.id)
+
     return component
 
 @router.delete("/{component_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -152,4 +197,6 @@ def delete_component(
     db.delete(component)
     db.commit()
 
+    rbd_registry.unbind_source(component_id)
+
     return None
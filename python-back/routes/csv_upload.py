@@ -1,12 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import and_, exists, or_
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+import hashlib
 import os
 import shutil
+import tempfile
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
 
 from models.schemas import CSVUploadResponse
-from models.database import CsvUpload, User
-from services.csv_processor import process_csv_file
+from models.database import Component, CsvUpload, User
+from services.csv_jobs import csv_jobs
+from services.csv_processor import INGEST_MODES
 from utils.database import get_db
 from utils.auth import get_current_user
 from dotenv import load_dotenv
@@ -17,15 +28,287 @@ router = APIRouter(prefix="/csv", tags=["csv_upload"])
 
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
 MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", 10485760))  # 10MB default
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1048576))  # 1MB buffered per spool write
+# Received file bytes kept in memory before the spool moves to a temporary file
+UPLOAD_SPOOL_SIZE = int(os.getenv("UPLOAD_SPOOL_SIZE", MAX_UPLOAD_SIZE))
+# Allowance for multipart boundaries, part headers and other form fields
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+UPLOAD_FIELD = "file"
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File size exceeds maximum allowed size of {MAX_UPLOAD_SIZE} bytes"
+    )
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class UploadReceiver:
+    """
+    python-multipart callbacks that spool the "file" part of a multipart body
+    as it is parsed, counting and hashing its bytes. Other parts are skipped.
+
+    The spool is a SpooledTemporaryFile held in memory up to UPLOAD_SPOOL_SIZE
+    bytes (by default the whole MAX_UPLOAD_SIZE), so nothing is written to the
+    upload directory until save() is called for content that is kept.
+    Callbacks only buffer data; flush(), save() and close() do the I/O (run
+    them in the threadpool from async code).
+    """
+
+    def __init__(self):
+        self.filename: Optional[str] = None
+        self.stored_name: Optional[str] = None
+        self.file_path: Optional[str] = None
+        self.size = 0
+        self.complete = False
+        self.digest = hashlib.sha256()
+        self._spool = None
+        self._in_file = False
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+        self._headers: Dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+
+    def callbacks(self) -> Dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field, self._value = b"", b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._in_file = options.get(b"name") == UPLOAD_FIELD.encode() and self.filename is None
+        if not self._in_file:
+            return
+
+        # Keep the base name only (browsers may send a Windows path)
+        filename = os.path.basename(options.get(b"filename", b"").decode("utf-8", "replace").replace("\\", "/"))
+        if not filename.endswith('.csv'):
+            raise _bad_request("Only CSV files are allowed")
+
+        # Generate unique filename
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")
+        self.filename = filename
+        self.stored_name = f"{timestamp}_{filename}"
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if not self._in_file:
+            return
+        self.size += end - start
+        if self.size > MAX_UPLOAD_SIZE:
+            raise _too_large()
+        chunk = data[start:end]
+        self.digest.update(chunk)
+        self._pending.append(chunk)
+        self._pending_size += len(chunk)
+
+    def on_part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self.complete = True
 
-@router.post("/upload", response_model=CSVUploadResponse)
+    def flush(self, force: bool = False):
+        """Spool the buffered file data once UPLOAD_CHUNK_SIZE bytes have collected (always when force)"""
+        if self.stored_name is None:
+            return
+        if self._spool is None:
+            self._spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE)
+        if self._pending and (force or self._pending_size >= UPLOAD_CHUNK_SIZE):
+            self._spool.write(b"".join(self._pending))
+            self._pending, self._pending_size = [], 0
+
+    def save(self, directory: str) -> str:
+        """Write the spooled file into directory, release the spool and return the file path"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.stored_name)
+        self._spool.seek(0)
+        try:
+            with open(path, "wb") as f:
+                shutil.copyfileobj(self._spool, f, UPLOAD_CHUNK_SIZE)
+        except BaseException:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+        finally:
+            self.close()
+        self.file_path = path
+        return path
+
+    def close(self):
+        """Release the spool (its temporary file, if it spilled to disk, is deleted)"""
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+
+async def receive_upload(request: Request) -> UploadReceiver:
+    """
+    Parse the multipart/form-data body of request into an UploadReceiver spool.
+
+    The body is read from request.stream() as the client sends it: a
+    Content-Length above the limit is rejected before any byte is read, and a
+    file part that passes MAX_UPLOAD_SIZE is rejected (413) as soon as the parser
+    reaches that byte, with the partial spool released.
+
+    Returns:
+        The receiver (filename, size, digest and spooled content) of the complete
+        file part; the caller saves or closes it
+    """
+    body_limit = MAX_UPLOAD_SIZE + UPLOAD_FORM_OVERHEAD
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > body_limit:
+        raise _too_large()
+
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or not options.get(b"boundary"):
+        raise _bad_request("Expected a multipart/form-data body")
+
+    receiver = UploadReceiver()
+    parser = MultipartParser(options[b"boundary"], receiver.callbacks())
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > body_limit:
+                raise _too_large()
+            parser.write(chunk)
+            await run_in_threadpool(receiver.flush)
+        parser.finalize()
+        await run_in_threadpool(receiver.flush, True)
+    except HTTPException:
+        await run_in_threadpool(receiver.close)
+        raise
+    except ValueError as e:  # python-multipart parse errors
+        await run_in_threadpool(receiver.close)
+        raise _bad_request(f"Malformed multipart body: {str(e)}")
+    except BaseException:
+        receiver.close()
+        raise
+
+    if not receiver.complete:
+        await run_in_threadpool(receiver.close)
+        raise _bad_request(f"Missing \"{UPLOAD_FIELD}\" file field")
+    return receiver
+
+
+def find_duplicate(db: Session, user_id: str, content_hash: str, mode: str) -> Optional[CsvUpload]:
+    """
+    Latest upload of the user with the same content and mode that is completed
+    and whose imported components still exist (or that imported no rows), or
+    that is still queued / running in this process. Pending or processing rows
+    that no worker owns (left by a restart) are not matched, nor are completed
+    uploads whose components were all deleted, so re-uploading them imports again.
+    """
+    has_components = exists().where(Component.csv_upload_id == CsvUpload.id)
+    return db.query(CsvUpload).filter(
+        CsvUpload.user_id == user_id,
+        CsvUpload.content_hash == content_hash,
+        CsvUpload.ingest_mode == mode,
+        or_(
+            and_(CsvUpload.status == "completed", or_(CsvUpload.records_count == 0, has_components)),
+            CsvUpload.id.in_(csv_jobs.active_ids())
+        )
+    ).order_by(CsvUpload.created_at.desc()).first()
+
+
+def record_upload(
+    db: Session,
+    user_id: str,
+    upload: UploadReceiver,
+    mode: str,
+    directory: str
+) -> Tuple[CsvUpload, bool]:
+    """
+    Return the duplicate of a received file (releasing the spool, so a duplicate
+    is never written to the upload directory), or save it into directory as a
+    pending upload and queue it. Blocking: run in the threadpool.
+
+    Returns:
+        Tuple of (upload row, created)
+    """
+    content_hash = upload.digest.hexdigest()
+
+    # Same content uploaded before: return that upload instead of re-importing
+    previous = find_duplicate(db, user_id, content_hash, mode)
+    if previous:
+        upload.close()
+        return previous, False
+
+    file_path = upload.save(directory)
+
+    # Create CSV upload record
+    csv_upload = CsvUpload(
+        user_id=user_id,
+        filename=upload.filename,
+        file_size=upload.size,
+        content_hash=content_hash,
+        ingest_mode=mode,
+        status="pending"
+    )
+    db.add(csv_upload)
+    db.commit()
+    db.refresh(csv_upload)
+
+    # Processed in the background; the worker updates status and records_count
+    csv_jobs.submit(csv_upload.id, file_path, user_id)
+    return csv_upload, True
+
+
+# The body is parsed by receive_upload, so describe it for the docs here
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {UPLOAD_FIELD: {"type": "string", "format": "binary"}},
+                    "required": [UPLOAD_FIELD],
+                }
+            }
+        },
+    }
+}
+
+
+@router.post(
+    "/upload",
+    response_model=CSVUploadResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra=UPLOAD_REQUEST_BODY
+)
 async def upload_csv(
-    file: UploadFile = File(...),
+    request: Request,
+    response: Response,
+    mode: str = "rows",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Upload and process CSV file.
+    Upload a CSV file (multipart form field "file") and queue it for processing.
 
     Expected CSV format (NEW - without Machine column):
     ```
@@ -37,68 +320,81 @@ async def upload_csv(
 
     Note: Components will be created as "Unassigned" and must be assigned to machines via editing.
 
-    Returns upload status and processing results.
+    `?mode=`:
+    - rows (default): one component per CSV row
+    - aggregate: one component per (Component, SupComponent, Failure mode) with
+      the event count, mean (failure_hours), SD, sorted hours (manual_hours) and
+      the Weibull MLE fitted for all groups in the same job
+
+    The request body is parsed while it streams in and the file is spooled (in
+    memory up to UPLOAD_SPOOL_SIZE) and hashed in the same pass; it is rejected
+    (413) from Content-Length before reading, or as soon as the file passes
+    MAX_UPLOAD_SIZE. New content is then saved to the upload directory and returned
+    with status "pending" and processed by the CSV job queue, which parses and
+    commits CSV_CHUNK_ROWS rows at a time with records_count updated after every chunk.
+
+    A file whose SHA-256 matches an earlier upload of the same user in the same
+    mode that is completed (with its components still present) or still queued /
+    running is not processed again and never written to the upload directory:
+    that upload is returned with 200.
+
+    The body is read on the event loop; spool / file writes and database work
+    run in the threadpool.
+
+    Returns the upload record; poll GET /csv/uploads/{id} for status and progress.
     """
-    # Validate file type
-    if not file.filename.endswith('.csv'):
+    if mode not in INGEST_MODES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only CSV files are allowed"
+            detail=f"mode must be one of: {', '.join(INGEST_MODES)}"
         )
 
-    # Create user upload directory
-    user_upload_dir = os.path.join(UPLOAD_DIR, current_user.id)
-    os.makedirs(user_upload_dir, exist_ok=True)
-
-    # Generate unique filename
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    safe_filename = f"{timestamp}_{file.filename}"
-    file_path = os.path.join(user_upload_dir, safe_filename)
-
-    # Save file
+    # Spool the file (hashed while it is received); only new content is saved to disk
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        file_size = os.path.getsize(file_path)
-
-        # Check file size
-        if file_size > MAX_UPLOAD_SIZE:
-            os.remove(file_path)
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File size exceeds maximum allowed size of {MAX_UPLOAD_SIZE} bytes"
-            )
-
+        upload = await receive_upload(request)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to save file: {str(e)}"
         )
 
-    # Create CSV upload record
-    csv_upload = CsvUpload(
-        user_id=current_user.id,
-        filename=file.filename,
-        file_size=file_size,
-        status="processing"
-    )
-    db.add(csv_upload)
-    db.commit()
-    db.refresh(csv_upload)
-
-    # Process CSV file
     try:
-        result = process_csv_file(file_path, current_user, db, csv_upload.id)
+        csv_upload, created = await run_in_threadpool(
+            record_upload, db, current_user.id, upload, mode, os.path.join(UPLOAD_DIR, current_user.id)
+        )
+    finally:
+        upload.close()
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return csv_upload
 
-        # Refresh to get updated status
-        db.refresh(csv_upload)
 
-        return csv_upload
+@router.get("/uploads/{upload_id}", response_model=CSVUploadResponse)
+def get_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Status of an upload: pending, processing, completed or failed, with
+    records_count (rows imported so far) and error_message.
+    """
+    csv_upload = db.query(CsvUpload).filter(
+        CsvUpload.id == upload_id,
+        CsvUpload.user_id == current_user.id
+    ).first()
 
-    except Exception as e:
-        # Error handling is done in process_csv_file
-        db.refresh(csv_upload)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to process CSV: {str(e)}"
-        )
+    if not csv_upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    return csv_upload
+
+
+@router.get("/metrics")
+def get_queue_metrics(current_user: User = Depends(get_current_user)):
+    """
+    CSV job queue depth, running jobs and wait / run durations.
+    """
+    return csv_jobs.metrics()
@@ -0,0 +1,173 @@
+"""
+Reliability Block Diagram API Routes
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from models.schemas import DiagramCreate, DiagramUpdate, DiagramResponse
+from models.database import Diagram, Machine, User
+from services.diagram_store import DIAGRAM_TYPES, clear_results, compiled_diagrams, structure_hash
+from services.rbd_engine import compile_diagram
+from utils.database import get_db
+from utils.auth import get_current_user
+
+router = APIRouter(prefix="/diagrams", tags=["diagrams"])
+
+
+def _validate(db: Session, user_id: str, content: Optional[dict], diagram_type: Optional[str], machine_id: Optional[str]):
+    """Reject diagrams that do not compile, unknown types and other users' machines"""
+    if diagram_type is not None and diagram_type not in DIAGRAM_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"diagram_type must be one of: {', '.join(DIAGRAM_TYPES)}"
+        )
+    if machine_id is not None:
+        machine = db.query(Machine).filter(Machine.id == machine_id, Machine.user_id == user_id).first()
+        if not machine:
+            raise HTTPException(status_code=404, detail="Machine not found")
+    if content is not None:
+        try:
+            rbd = compile_diagram(content)
+        except (KeyError, ValueError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid diagram: {e.args[0] if e.args else e}"
+            )
+        # Seed the compiled cache; identical structures share one compiled diagram
+        compiled_diagrams.get_or_compute(structure_hash(content), lambda: rbd)
+
+
+@router.get("", response_model=List[DiagramResponse])
+def get_diagrams(
+    machine_id: str = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get all diagrams for the current user.
+    Optionally filter by machine_id.
+    """
+    query = db.query(Diagram).filter(Diagram.user_id == current_user.id)
+
+    if machine_id:
+        query = query.filter(Diagram.machine_id == machine_id)
+
+    return query.order_by(Diagram.created_at.desc()).all()
+
+
+@router.post("", response_model=DiagramResponse, status_code=status.HTTP_201_CREATED)
+def create_diagram(
+    diagram_data: DiagramCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Save a diagram (GroupComponent.json / *_GroupFailItem.json model).
+    The diagram is compiled once to validate it.
+    """
+    _validate(db, current_user.id, diagram_data.content, diagram_data.diagram_type, diagram_data.machine_id)
+
+    diagram = Diagram(
+        user_id=current_user.id,
+        machine_id=diagram_data.machine_id,
+        name=diagram_data.name,
+        diagram_type=diagram_data.diagram_type,
+        content=diagram_data.content,
+        bindings=diagram_data.bindings,
+        structure_hash=structure_hash(diagram_data.content)
+    )
+
+    db.add(diagram)
+    db.commit()
+    db.refresh(diagram)
+
+    return diagram
+
+
+@router.get("/{diagram_id}", response_model=DiagramResponse)
+def get_diagram(
+    diagram_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a specific diagram by ID.
+    """
+    diagram = db.query(Diagram).filter(
+        Diagram.id == diagram_id,
+        Diagram.user_id == current_user.id
+    ).first()
+
+    if not diagram:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Diagram not found"
+        )
+
+    return diagram
+
+
+@router.put("/{diagram_id}", response_model=DiagramResponse)
+def update_diagram(
+    diagram_id: str,
+    diagram_data: DiagramUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update a diagram.
+    Cached results are dropped when the content or bindings change.
+    """
+    diagram = db.query(Diagram).filter(
+        Diagram.id == diagram_id,
+        Diagram.user_id == current_user.id
+    ).first()
+
+    if not diagram:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Diagram not found"
+        )
+
+    update_data = diagram_data.dict(exclude_unset=True)
+    _validate(db, current_user.id, update_data.get("content"), update_data.get("diagram_type"), update_data.get("machine_id"))
+
+    for field, value in update_data.items():
+        setattr(diagram, field, value)
+
+    if "content" in update_data:
+        diagram.structure_hash = structure_hash(diagram.content)
+    if "content" in update_data or "bindings" in update_data:
+        clear_results(db, diagram.id)
+
+    db.commit()
+    db.refresh(diagram)
+
+    return diagram
+
+
+@router.delete("/{diagram_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_diagram(
+    diagram_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delete a diagram and its cached results.
+    """
+    diagram = db.query(Diagram).filter(
+        Diagram.id == diagram_id,
+        Diagram.user_id == current_user.id
+    ).first()
+
+    if not diagram:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Diagram not found"
+        )
+
+    db.delete(diagram)
+    db.commit()
+
+    return None
@@ -7,6 +7,7 @@ from typing import List
 from datetime import datetime
 
 from models.database import FailureItem, FailureParameter, Component
+from services.rbd_incremental import rbd_registry, refresh_source
 from utils.database import get_db
 from utils.auth import get_current_user, User
 
@@ -176,6 +177,8 @@ def delete_failure_item(
     db.delete(db_failure_item)
     db.commit()
 
+    rbd_registry.unbind_source(failure_item_id)
+
 
 # Failure Parameters Endpoints
 @router.get("/{failure_item_id}/parameters", response_model=List[FailureParameterResponse])
@@ -228,6 +231,51 @@ def create_failure_parameter(
     db.commit()
     db.refresh(db_parameter)
 
+    # Recompute live diagrams whose leaves use this failure item
+    refresh_source(db, current_user.id, failure_item_id)
+
+    return db_parameter
+
+
+@router.put("/{failure_item_id}/parameters/{parameter_id}", response_model=FailureParameterResponse)
+def update_failure_parameter(
+    failure_item_id: str,
+    parameter_id: str,
+    parameter_update: FailureParameterUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Update a failure parameter (e.g. MT / SD)"""
+    # Verify failure item exists and belongs to user
+    failure_item = db.query(FailureItem).filter(
+        FailureItem.id == failure_item_id,
+        FailureItem.user_id == current_user.id
+    ).first()
+
+    if not failure_item:
+        raise HTTPException(status_code=404, detail="Failure item not found")
+
+    db_parameter = db.query(FailureParameter).filter(
+        FailureParameter.id == parameter_id,
+        FailureParameter.failure_item_id == failure_item_id
+    ).first()
+
+    if not db_parameter:
+        raise HTTPException(status_code=404, detail="Parameter not found")
+
+    # Update fields if provided
+    if parameter_update.parameter_type is not None:
+        db_parameter.parameter_type = parameter_update.parameter_type
+    if parameter_update.parameter_value is not None:
+        db_parameter.parameter_value = parameter_update.parameter_value
+    if parameter_update.parameter_text is not None:
+        db_parameter.parameter_text = parameter_update.parameter_text
+
+    db.commit()
+    db.refresh(db_parameter)
+
+    refresh_source(db, current_user.id, failure_item_id)
+
     return db_parameter
 
 
@@ -258,3 +306,5 @@ def delete_failure_parameter(
 
     db.delete(db_parameter)
     db.commit()
+
+    refresh_source(db, current_user.id, failure_item_id)
@@ -0,0 +1,572 @@
+"""
+Reliability Analysis API Routes
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import numpy as np
+
+from models.schemas import (
+    ReliabilityCurveRequest, ReliabilityCurveResponse, ComponentCurve, FleetRefitResponse, ConfidenceBoundsResponse,
+    RBDEvaluateRequest, RBDEvaluateResponse, RBDNodeValue, RBDCurveRequest, RBDCurveResponse,
+    RBDLiveRequest, RBDLiveResponse, RBDSimulateRequest, RBDSimulateResponse, SimulationPercentile,
+    RBDImportanceRequest, RBDImportanceResponse, RBDNodeImportance,
+    RBDModesRequest, RBDModesResponse, RBDModeValue, RBDMeanLifeRequest, RBDMeanLifeResponse,
+    RBDStoredCurveRequest, RBDStoredCurveResponse, FleetCurveRequest
+)
+from models.database import Component, Diagram, User, generate_uuid
+from services.reliability_cache import component_reliability, reliability_cache
+from services.reliability_calculator import ReliabilityCalculator, CONFIDENCE_METHODS
+from services.fleet_refit import refit_user_components
+from services.fleet_rbd import load_fleet, stream_fleet_curves
+from services.rbd_engine import compile_diagram, INTEGRATION_METHODS
+from services.rbd_simulation import simulate_system
+from services.diagram_store import cached_curve, get_compiled, grid_spec
+from services.rbd_incremental import IncrementalRBD, rbd_registry, source_parameters_bulk
+from utils.database import get_db
+from utils.auth import get_current_user
+from utils.numbers import finite_floats
+
+router = APIRouter(prefix="/reliability", tags=["reliability"])
+
+# R(t_max) reached by the most durable component on the default time grid
+DEFAULT_CURVE_END_RELIABILITY = 1e-3
+
+
+@contextmanager
+def _diagram_errors():
+    """Report KeyError / ValueError from compiling or binding a diagram as 400 "Invalid diagram" """
+    try:
+        yield
+    except (KeyError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid diagram: {e.args[0] if e.args else e}"
+        )
+
+
+def _time_grid(
+    times: Optional[List[float]],
+    t_max: Optional[float],
+    n_points: int,
+    alphas: np.ndarray,
+    betas: np.ndarray
+) -> np.ndarray:
+    """
+    Explicit times if given, otherwise n_points from 0 to t_max.
+    t_max defaults to the time at which the most durable block reaches
+    R = DEFAULT_CURVE_END_RELIABILITY.
+    """
+    if times:
+        grid = np.asarray(times, dtype=np.float64)
+        if np.any(grid < 0):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="times must be non-negative"
+            )
+        return grid
+
+    if not t_max:
+        t_max = float(np.max(betas * (-np.log(DEFAULT_CURVE_END_RELIABILITY)) ** (1.0 / alphas)))
+    return np.linspace(0.0, t_max, n_points)
+
+
+@router.post("/curves", response_model=ReliabilityCurveResponse)
+def get_reliability_curves(
+    request: ReliabilityCurveRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Reliability, unreliability, pdf and hazard curves for many components in one call.
+
+    Each component uses its stored MLE fit when current, or is fitted (cached) from
+    its manual hours or mean time, and all curves are evaluated together over a
+    shared time grid.
+    """
+    components = db.query(Component).filter(
+        Component.id.in_(request.component_ids),
+        Component.user_id == current_user.id
+    ).all()
+
+    found = {c.id: c for c in components}
+    missing = [cid for cid in request.component_ids if cid not in found]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Component not found: {', '.join(missing)}"
+        )
+
+    ordered = [found[cid] for cid in request.component_ids]
+    params = [component_reliability(c)[:2] for c in ordered]
+    alphas = np.array([p[0] for p in params], dtype=np.float64)
+    betas = np.array([p[1] for p in params], dtype=np.float64)
+
+    times = _time_grid(request.times, request.t_max, request.n_points, alphas, betas)
+    curves = ReliabilityCalculator.calculate_curves(alphas, betas, times)
+
+    return ReliabilityCurveResponse(
+        times=times.tolist(),
+        curves=[
+            ComponentCurve(
+                component_id=c.id,
+                shape=float(alphas[i]),
+                scale=float(betas[i]),
+                reliability=finite_floats(curves["reliability"][i]),
+                unreliability=finite_floats(curves["unreliability"][i]),
+                pdf=finite_floats(curves["pdf"][i]),
+                hazard=finite_floats(curves["hazard"][i])
+            )
+            for i, c in enumerate(ordered)
+        ]
+    )
+
+
+@router.get("/components/{component_id}/confidence", response_model=ConfidenceBoundsResponse)
+def get_confidence_bounds(
+    component_id: str,
+    time: float,
+    confidence: float = 0.9,
+    method: str = "auto",
+    n_bootstrap: int = 2000,
+    seed: int = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Confidence bounds on shape, scale and R(time) from a component's manual hours.
+
+    method: "bootstrap", "fisher", or "auto" (Fisher-matrix bounds for large samples).
+    """
+    component = db.query(Component).filter(
+        Component.id == component_id,
+        Component.user_id == current_user.id
+    ).first()
+
+    if not component:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Component not found"
+        )
+
+    if method not in CONFIDENCE_METHODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"method must be one of: {', '.join(CONFIDENCE_METHODS)}"
+        )
+    if not 2 <= n_bootstrap <= 20000:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="n_bootstrap must be between 2 and 20000"
+        )
+
+    try:
+        bounds = ReliabilityCalculator.calculate_confidence_bounds(
+            component.manual_hours or [],
+            mission_time=time,
+            confidence=confidence,
+            method=method,
+            n_bootstrap=n_bootstrap,
+            seed=seed
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot compute confidence bounds: {str(e)}"
+        )
+
+    return ConfidenceBoundsResponse(component_id=component.id, **bounds)
+
+
+@router.post("/refit", response_model=FleetRefitResponse)
+def refit_fleet(
+    time: float = 1.0,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Refit Weibull parameters for all components of the current user.
+
+    Fits are sharded across the fleet process pool (FLEET_REFIT_WORKERS) and
+    stored as "weibull" reliability results, replacing each component's previous
+    ones. This is a sync endpoint, so it runs
+    in the threadpool and the event loop keeps serving other requests.
+    """
+    if time < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="time must be non-negative"
+        )
+
+    return refit_user_components(current_user.id, db, time_point=time)
+
+
+@router.post("/rbd/evaluate", response_model=RBDEvaluateResponse)
+def evaluate_rbd(
+    request: RBDEvaluateRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    System reliability of a reliability block diagram.
+
+    The GoJS group model is compiled into flat arrays (series/parallel gates by
+    "horiz") and folded from the leaf reliabilities in one O(nodes) pass.
+    """
+    with _diagram_errors():
+        rbd = compile_diagram(request.diagram)
+        values = rbd.evaluate_nodes(rbd.leaf_vector(request.reliabilities, request.mode))
+
+    return RBDEvaluateResponse(
+        r_system=float(values[0]),
+        nodes=[
+            RBDNodeValue(
+                key=rbd.keys[i],
+                text=rbd.texts[i],
+                gate=rbd.gate_name(i),
+                reliability=float(values[i])
+            )
+            for i in range(rbd.n_nodes)
+        ]
+    )
+
+
+@router.post("/rbd/curve", response_model=RBDCurveResponse)
+def evaluate_rbd_curve(
+    request: RBDCurveRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    System reliability R_sys(t) of a diagram over a whole time grid in one call.
+
+    Leaf Weibull reliabilities are computed as a (leaves x times) matrix and
+    folded through the compiled series/parallel gates.
+    """
+    with _diagram_errors():
+        rbd = compile_diagram(request.diagram)
+        params = rbd.leaf_vector(
+            {label: (p.shape, p.scale) for label, p in request.parameters.items()},
+            request.mode
+        )
+
+    alphas, betas = params[:, 0], params[:, 1]
+    times = _time_grid(request.times, request.t_max, request.n_points, alphas, betas)
+    r_system = rbd.evaluate_times(alphas, betas, times)
+
+    return RBDCurveResponse(times=times.tolist(), r_system=finite_floats(r_system))
+
+
+@router.post("/diagrams/{diagram_id}/curve", response_model=RBDStoredCurveResponse)
+def evaluate_stored_diagram(
+    diagram_id: str,
+    request: RBDStoredCurveRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    R_sys(t) of a saved diagram from the parameters of its bound components / failure items.
+
+    The diagram is compiled once per structure hash, and results are stored as
+    "rbd" reliability results keyed by structure, bound row versions and time grid,
+    so repeated requests are read back without fitting or evaluating anything.
+    """
+    diagram = db.query(Diagram).filter(
+        Diagram.id == diagram_id,
+        Diagram.user_id == current_user.id
+    ).first()
+
+    if not diagram:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Diagram not found"
+        )
+
+    with _diagram_errors():
+        rbd = get_compiled(diagram)
+        times, r_system, cached = cached_curve(
+            db, diagram, rbd, request.mode,
+            grid_spec(request.times, request.t_max, request.n_points),
+            lambda alphas, betas: _time_grid(request.times, request.t_max, request.n_points, alphas, betas)
+        )
+
+    return RBDStoredCurveResponse(
+        diagram_id=diagram.id,
+        structure_hash=diagram.structure_hash,
+        times=times,
+        r_system=r_system,
+        cached=cached
+    )
+
+
+@router.post("/fleet/curves")
+def fleet_curves(
+    request: FleetCurveRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    R_sys(t) of every saved diagram of the user's machines, streamed as NDJSON.
+
+    Diagrams, machines and bound row versions are loaded with a few bulk queries;
+    cached curves are sent first, the rest are fitted, evaluated in the process
+    pool and sent as each finishes. The last line is a {"summary": ...} object.
+    """
+    jobs = load_fleet(db, current_user.id, request.mode, request.machine_ids, request.diagram_type)
+
+    return StreamingResponse(
+        stream_fleet_curves(
+            db, current_user.id, jobs,
+            grid_spec(request.times, request.t_max, request.n_points),
+            lambda alphas, betas: _time_grid(request.times, request.t_max, request.n_points, alphas, betas),
+            request.mode
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/rbd/modes", response_model=RBDModesResponse)
+def evaluate_rbd_modes(
+    request: RBDModesRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    System reliability of a diagram for every failure mode, plus all modes combined.
+
+    Leaf reliabilities form a (leaves x modes) matrix that is folded through the
+    diagram in one pass. The combined figure treats modes as competing risks
+    (a failure item survives only if it survives every mode).
+    """
+    with _diagram_errors():
+        rbd = compile_diagram(request.diagram)
+        matrix = rbd.mode_matrix(request.reliabilities, request.modes, request.missing_reliability)
+
+    per_mode, combined = rbd.evaluate_modes(matrix)
+    return RBDModesResponse(
+        modes=[RBDModeValue(mode=m, r_system=float(r)) for m, r in zip(request.modes, per_mode)],
+        r_all_modes=combined
+    )
+
+
+@router.post("/rbd/mttf", response_model=RBDMeanLifeResponse)
+def rbd_mean_life(
+    request: RBDMeanLifeRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    System MTTF and mean residual life at the given ages.
+
+    R_sys(t) is integrated with a fixed-node tanh-sinh (double-exponential) or
+    Gauss-Laguerre rule; all nodes are evaluated as one time grid through the
+    compiled diagram. Each result carries an error estimate.
+    """
+    if request.method not in INTEGRATION_METHODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"method must be one of: {', '.join(INTEGRATION_METHODS)}"
+        )
+    if any(age < 0 for age in request.ages):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ages must be non-negative"
+        )
+
+    with _diagram_errors():
+        rbd = compile_diagram(request.diagram)
+        params = rbd.leaf_vector(
+            {label: (p.shape, p.scale) for label, p in request.parameters.items()},
+            request.mode
+        )
+
+    return RBDMeanLifeResponse(**rbd.mean_life(params[:, 0], params[:, 1], request.ages, request.method))
+
+
+@router.post("/rbd/importance", response_model=RBDImportanceResponse)
+def rbd_importance(
+    request: RBDImportanceRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Birnbaum, criticality, RAW and RRW importance of every block of a diagram.
+
+    Leaf reliabilities are given directly, or as Weibull parameters plus a
+    mission time. All dR_sys/dR_i come from one forward and one backward pass
+    over the compiled tree instead of re-evaluating the diagram once per block.
+    """
+    if (request.reliabilities is None) == (request.parameters is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either reliabilities or parameters"
+        )
+    if request.parameters is not None and (request.time is None or request.time < 0):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A non-negative time is required with parameters"
+        )
+
+    with _diagram_errors():
+        rbd = compile_diagram(request.diagram)
+        if request.parameters is not None:
+            params = rbd.leaf_vector(
+                {label: (p.shape, p.scale) for label, p in request.parameters.items()},
+                request.mode
+            )
+            leaf_reliability = ReliabilityCalculator.calculate_reliability_grid(
+                params[:, 0], params[:, 1], [request.time]
+            )[:, 0]
+        else:
+            leaf_reliability = rbd.leaf_vector(request.reliabilities, request.mode)
+
+    measures = rbd.importance(leaf_reliability)
+    criticality = finite_floats(measures["criticality"])
+    raw = finite_floats(measures["raw"])
+    rrw = finite_floats(measures["rrw"])
+    ranked = sorted(range(1, rbd.n_nodes), key=lambda i: -measures["birnbaum"][i] * (1.0 - measures["reliability"][i]))
+
+    return RBDImportanceResponse(
+        r_system=float(measures["reliability"][0]),
+        nodes=[
+            RBDNodeImportance(
+                key=rbd.keys[i],
+                text=rbd.texts[i],
+                gate=rbd.gate_name(i),
+                reliability=float(measures["reliability"][i]),
+                birnbaum=float(measures["birnbaum"][i]),
+                criticality=criticality[i],
+                raw=raw[i],
+                rrw=rrw[i]
+            )
+            for i in ranked
+        ]
+    )
+
+
+@router.post("/rbd/simulate", response_model=RBDSimulateResponse)
+def simulate_rbd(
+    request: RBDSimulateRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Monte Carlo distribution of system time-to-failure (MTTF, variance, percentiles).
+
+    Leaf Weibull failure times are sampled in bounded (leaves x chunk) matrices
+    and reduced through the gates (series = min, parallel = max). Chunks run in
+    the process pool; the same seed gives the same result.
+    """
+    if any(not 0 <= p <= 100 for p in request.percentiles):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="percentiles must be between 0 and 100"
+        )
+
+    with _diagram_errors():
+        rbd = compile_diagram(request.diagram)
+        params = rbd.leaf_vector(
+            {label: (p.shape, p.scale) for label, p in request.parameters.items()},
+            request.mode
+        )
+
+    result = simulate_system(
+        rbd,
+        params[:, 0],
+        params[:, 1],
+        request.n_samples,
+        seed=request.seed,
+        percentiles=request.percentiles,
+        times=request.times
+    )
+    result["percentiles"] = [
+        SimulationPercentile(percentile=p, time=t) for p, t in result["percentiles"].items()
+    ]
+    return RBDSimulateResponse(**result)
+
+
+def _live_response(entry_id: str, snapshot: Dict) -> RBDLiveResponse:
+    return RBDLiveResponse(id=entry_id, **dict(snapshot, r_system=finite_floats(snapshot["r_system"])))
+
+
+@router.post("/rbd/live", response_model=RBDLiveResponse, status_code=status.HTTP_201_CREATED)
+def create_live_rbd(
+    request: RBDLiveRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Register a diagram whose leaves are bound to components / failure items.
+
+    Node values are kept over the time grid. Editing a bound row (components,
+    failure items or their parameters) recomputes only the changed leaf's path
+    to the root; GET /reliability/rbd/live/{id} reports the last update.
+    """
+    with _diagram_errors():
+        rbd = compile_diagram(request.diagram)
+
+    labels = rbd.leaf_labels(request.mode)
+    leaf_sources = [request.bindings.get(label) for label in labels]
+    unbound = sorted({label for label, s in zip(labels, leaf_sources) if s is None})
+    if unbound:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Missing binding for: {', '.join(unbound)}"
+        )
+
+    params = source_parameters_bulk(db, current_user.id, leaf_sources)
+    unresolved = sorted(source_id for source_id, p in params.items() if p is None)
+    if unresolved:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No Weibull parameters for component / failure item: {', '.join(unresolved)}"
+        )
+
+    alphas = np.array([params[s][0] for s in leaf_sources], dtype=np.float64)
+    betas = np.array([params[s][1] for s in leaf_sources], dtype=np.float64)
+    times = _time_grid(request.times, request.t_max, request.n_points, alphas, betas)
+
+    entry_id = generate_uuid()
+    evaluator = IncrementalRBD(rbd, alphas, betas, times)
+    snapshot = evaluator.snapshot()
+    rbd_registry.register(entry_id, current_user.id, evaluator, leaf_sources)
+    return _live_response(entry_id, snapshot)
+
+
+@router.get("/rbd/live/{entry_id}", response_model=RBDLiveResponse)
+def get_live_rbd(
+    entry_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Current R_sys(t) of a live diagram and the size of its last incremental update.
+    stale_sources lists bound rows without usable parameters (their leaves keep
+    their last values).
+    """
+    snapshot = rbd_registry.snapshot(entry_id, current_user.id)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Live diagram not found"
+        )
+    return _live_response(entry_id, snapshot)
+
+
+@router.delete("/rbd/live/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_live_rbd(
+    entry_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stop tracking a live diagram.
+    """
+    if not rbd_registry.remove(entry_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Live diagram not found"
+        )
+    return None
+
+
+@router.get("/cache-stats")
+def get_cache_stats(current_user: User = Depends(get_current_user)):
+    """
+    Hit/miss counters of the fitted-parameter cache.
+    """
+    return reliability_cache.stats()
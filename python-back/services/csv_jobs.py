@@ -0,0 +1,164 @@
+"""
+CSV Job Queue
+Runs uploaded CSV files through process_csv_file on a local thread pool so the
+upload request returns as soon as the file is on disk.
+
+- an upload is stored with status "pending", then moves to "processing" when
+  a worker picks it up and to "completed" / "failed" when it ends
+- progress is CsvUpload.records_count, committed after every parsed chunk
+- metrics: queue depth, running jobs and per-job wait / run durations
+- the queue lives in the API process (one worker process, see Procfile): at
+  startup, uploads left "pending" / "processing" by the previous process are
+  marked failed so they can be uploaded again
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional, Set
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models.database import CsvUpload, User
+from services.csv_processor import process_csv_file
+from utils.database import SessionLocal
+
+CSV_WORKERS = int(os.getenv("CSV_WORKERS", 2))
+# Finished jobs kept for the duration metrics
+CSV_JOB_HISTORY = 1000
+INTERRUPTED_MESSAGE = "Interrupted by a server restart; upload the file again"
+
+
+def _summary(values) -> Dict:
+    """count / mean / p50 / p95 / max of a list of seconds"""
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "max": None}
+    array = np.fromiter(values, dtype=np.float64)
+    return {
+        "count": int(array.size),
+        "mean": float(array.mean()),
+        "p50": float(np.percentile(array, 50)),
+        "p95": float(np.percentile(array, 95)),
+        "max": float(array.max()),
+    }
+
+
+class CsvJobQueue:
+    """Thread pool for CSV ingestion jobs with queue and duration metrics"""
+
+    def __init__(self, workers: int = CSV_WORKERS, session_factory: Callable[[], Session] = SessionLocal):
+        self.workers = max(1, workers)
+        self.session_factory = session_factory
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self._waits = deque(maxlen=CSV_JOB_HISTORY)
+        self._durations = deque(maxlen=CSV_JOB_HISTORY)
+        self._active: Set[str] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(self, upload_id: str, file_path: str, user_id: str) -> Future:
+        """Queue a stored upload (status "pending") for processing"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="csv-job")
+            self.queued += 1
+            self._active.add(upload_id)
+            return self._executor.submit(self._run, upload_id, file_path, user_id, time.perf_counter())
+
+    def _run(self, upload_id: str, file_path: str, user_id: str, queued_at: float) -> Optional[Dict]:
+        start = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self._waits.append(start - queued_at)
+
+        result = None
+        with self.session_factory() as db:
+            try:
+                csv_upload = db.query(CsvUpload).filter(CsvUpload.id == upload_id).first()
+                user = db.query(User).filter(User.id == user_id).first()
+                if csv_upload is None or user is None:
+                    raise ValueError("Upload or user no longer exists")
+                csv_upload.status = "processing"
+                db.commit()
+
+                # Marks the upload completed / failed itself
+                result = process_csv_file(file_path, user, db, upload_id, mode=csv_upload.ingest_mode or "rows")
+            except Exception as e:
+                # process_csv_file has already recorded the error on the upload
+                # row when it got that far; cover failures before that point
+                db.rollback()
+                csv_upload = db.query(CsvUpload).filter(CsvUpload.id == upload_id).first()
+                if csv_upload and csv_upload.status != "failed":
+                    csv_upload.status = "failed"
+                    csv_upload.error_message = str(e)
+                    csv_upload.processed_at = datetime.utcnow()
+                    db.commit()
+
+        with self._lock:
+            self._active.discard(upload_id)
+            self.running -= 1
+            self._durations.append(time.perf_counter() - start)
+            if result is None:
+                self.failed += 1
+            else:
+                self.completed += 1
+        return result
+
+    def fail_interrupted(self) -> int:
+        """
+        Mark uploads still "pending" / "processing" in the database but not queued
+        here as failed (run at startup: their worker died with the old process).
+        Rows committed before the interruption are kept, as for a failed import.
+
+        Returns:
+            Number of uploads marked failed
+        """
+        active = self.active_ids()
+        with self.session_factory() as db:
+            query = db.query(CsvUpload).filter(CsvUpload.status.in_(("pending", "processing")))
+            if active:
+                query = query.filter(CsvUpload.id.notin_(active))
+            # One UPDATE of the status columns only
+            count = query.update({
+                CsvUpload.status: "failed",
+                CsvUpload.error_message: INTERRUPTED_MESSAGE,
+                CsvUpload.processed_at: datetime.utcnow(),
+            }, synchronize_session=False)
+            db.commit()
+        return count
+
+    def active_ids(self) -> Set[str]:
+        """Uploads queued or running in this process"""
+        with self._lock:
+            return set(self._active)
+
+    def metrics(self) -> Dict:
+        """Queue depth, job counters and wait / run durations (seconds)"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "wait_seconds": _summary(self._waits),
+                "duration_seconds": _summary(self._durations),
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the pool (queued jobs still run when wait is True)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# Queue shared by the API process
+csv_jobs = CsvJobQueue()
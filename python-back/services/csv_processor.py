@@ -1,9 +1,63 @@
-import pandas as pd
+"""
+CSV Ingestion Service
+Turns an uploaded CSV into component rows column-wise instead of row by row:
+
+- component_id: pd.factorize over the stripped Component names gives each name
+  its order of first appearance ("1.1 Motor", "1.2 Gearbox", ...)
+- inserts: Core insert() executemany in batches of CSV_INSERT_BATCH_SIZE rows;
+  on PostgreSQL the rows are streamed with COPY ... FROM STDIN instead
+- memory: the file is parsed CSV_CHUNK_ROWS rows at a time; every chunk is
+  committed on its own and its progress written to CsvUpload.records_count
+
+Ingest modes:
+- "rows": one component row per CSV row (failure event)
+- "aggregate": one component row per (Component, SupComponent, Failure mode)
+  with the event count, mean (failure_hours), SD and sorted hours
+  (manual_hours); the Weibull MLE of every group is fitted in one batch and
+  stored as the component's fit state
+"""
+import io
+import json
 import os
-from typing import List, Dict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
-from models.database import Machine, Component, CsvUpload, User
+from models.database import Component, CsvUpload, User
+from services.reliability_calculator import ReliabilityCalculator
+from utils.numbers import finite_floats
+
+# Rows per executemany batch (non-PostgreSQL databases)
+CSV_INSERT_BATCH_SIZE = int(os.getenv("CSV_INSERT_BATCH_SIZE", 5000))
+
+# Rows parsed, inserted and committed per chunk
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", 50000))
+
+# Columns read from the upload (any others are skipped while parsing)
+CSV_COLUMNS = ("Component", "SupComponent", "Failure mode", "Failure hours")
+CSV_TEXT_COLUMNS = {"Component": str, "SupComponent": str, "Failure mode": str}
+
+INGEST_MODES = ("rows", "aggregate")
+
+# Columns written for every imported row, in COPY order
+COMPONENT_COLUMNS = (
+    "id", "user_id", "machine_id", "machine_name", "component_id",
+    "component_name", "sub_component", "failure_mode", "failure_hours",
+    "csv_upload_id",
+)
+# Extra columns of an aggregated (per failure mode) row
+AGGREGATE_COLUMNS = COMPONENT_COLUMNS + (
+    "manual_hours", "failure_count", "failure_sd",
+    "fit_alpha", "fit_beta", "fit_count", "fit_sum_log",
+)
+GROUP_COLUMNS = ["component_name", "sub_component", "failure_mode"]
+# NULL marker of the COPY input (an unquoted empty field is an empty string)
+COPY_NULL = "\\N"
+
 
 def generate_component_id(component_name: str, component_index: int) -> str:
     """
@@ -13,7 +67,239 @@ def generate_component_id(component_name: str, component_index: int) -> str:
     """
     return f"1.{component_index} {component_name}"
 
-def process_csv_file(file_path: str, user: User, db: Session, csv_upload_id: str) -> Dict:
+
+def uuid4_strings(n: int) -> List[str]:
+    """n random UUID4 strings (same format as generate_uuid) from one urandom call"""
+    raw = np.frombuffer(os.urandom(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    hexed = raw.tobytes().hex()
+    return [
+        f"{hexed[i:i + 8]}-{hexed[i + 8:i + 12]}-{hexed[i + 12:i + 16]}-{hexed[i + 16:i + 20]}-{hexed[i + 20:i + 32]}"
+        for i in range(0, 32 * n, 32)
+    ]
+
+
+def _text_column(df: pd.DataFrame, column: str, missing_as_none: bool = False) -> pd.Series:
+    """
+    str(value).strip() of an optional column, None where empty or absent.
+    Missing cells become "nan" like str() did in the row-by-row importer,
+    unless missing_as_none is set.
+    """
+    if column not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+    values = df[column].astype(object).map(str).str.strip()
+    keep = values != ""
+    if missing_as_none:
+        keep &= df[column].notna()
+    return values.astype(object).where(keep, None)
+
+
+def parse_events(df: pd.DataFrame, missing_as_none: bool = False) -> pd.DataFrame:
+    """
+    Normalized failure events of parsed CSV rows: component_name,
+    sub_component, failure_mode (object, None when empty) and failure_hours (float, NaN when empty).
+    missing_as_none also maps missing SupComponent / Failure mode cells to None.
+
+    Raises:
+        ValueError: when the Component column is missing or Failure hours is not numeric
+    """
+    if "Component" not in df.columns:
+        raise ValueError("Missing required column: Component")
+
+    if "Failure hours" in df.columns:
+        hours = pd.to_numeric(df["Failure hours"]).astype(np.float64)
+    else:
+        hours = pd.Series(np.nan, index=df.index)
+
+    return pd.DataFrame({
+        "component_name": df["Component"].astype(object).map(str).str.strip().astype(object),
+        "sub_component": _text_column(df, "SupComponent", missing_as_none),
+        "failure_mode": _text_column(df, "Failure mode", missing_as_none),
+        "failure_hours": hours,
+    })
+
+
+def _component_labels(names: pd.Series, component_ids: Optional[Dict[str, str]]) -> np.ndarray:
+    """component_id of every name, numbering names not in component_ids after the known ones"""
+    codes, uniques = pd.factorize(names)
+    if component_ids is None:
+        component_ids = {}
+    for name in uniques:
+        if name not in component_ids:
+            component_ids[name] = generate_component_id(name, len(component_ids) + 1)
+    labels = np.array([component_ids[name] for name in uniques], dtype=object)
+    return labels[codes]
+
+
+def build_component_frame(
+    df: pd.DataFrame,
+    user_id: str,
+    component_ids: Optional[Dict[str, str]] = None,
+    csv_upload_id: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Component rows for a parsed CSV, one per CSV row (object columns, None for NULL).
+
+    Args:
+        df: Parsed CSV rows
+        user_id: Owner of the new rows
+        component_ids: component_id of every name seen in earlier chunks of the
+            same file; names new to this chunk are numbered after them and added
+        csv_upload_id: Upload the rows come from
+
+    Raises:
+        ValueError: when the Component column is missing or Failure hours is not numeric
+    """
+    events = parse_events(df)
+    hours = events["failure_hours"]
+
+    return pd.DataFrame({
+        "id": uuid4_strings(len(events)),
+        "user_id": user_id,
+        "machine_id": None,  # No machine assigned yet
+        "machine_name": "Unassigned",
+        "component_id": _component_labels(events["component_name"], component_ids),
+        "component_name": events["component_name"],
+        "sub_component": events["sub_component"],
+        "failure_mode": events["failure_mode"],
+        "failure_hours": hours.astype(object).where(hours.notna(), None),
+        "csv_upload_id": csv_upload_id,
+    }, columns=list(COMPONENT_COLUMNS))
+
+
+def aggregate_components(events: pd.DataFrame, user_id: str, csv_upload_id: Optional[str] = None) -> pd.DataFrame:
+    """
+    One component row per (component, sub component, failure mode) of the
+    events, in order of first appearance.
+
+    Count, mean and SD (ddof=1) come from one groupby aggregation; the hours of
+    every group are sorted with one lexsort and stored as manual_hours. Groups
+    with at least one failure hour are fitted together with
+    ReliabilityCalculator.calculate_from_manual_hours_batch, and the result is
+    stored as the fit state (fit_alpha, fit_beta, fit_count, fit_sum_log) that
+    later manual_hours edits warm-start from.
+    """
+    grouped = events.groupby(GROUP_COLUMNS, dropna=False, sort=False)
+    stats = grouped["failure_hours"].agg(["count", "mean", "std"]).reset_index()
+    n_groups = len(stats)
+
+    # Sorted hours of each group, contiguous in group order
+    group = grouped.ngroup().to_numpy()
+    hours = events["failure_hours"].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(hours)
+    group, hours = group[valid], hours[valid]
+    order = np.lexsort((hours, group))
+    sorted_hours = hours[order]
+    counts = stats["count"].to_numpy(dtype=np.int64)
+    starts = np.zeros(n_groups, dtype=np.int64)
+    np.cumsum(counts[:-1], out=starts[1:])
+
+    alpha = np.full(n_groups, np.nan)
+    beta = np.full(n_groups, np.nan)
+    sum_log = np.full(n_groups, np.nan)
+    fitted = np.flatnonzero(counts > 0)
+    samples = [sorted_hours[starts[i]:starts[i] + counts[i]] for i in fitted]
+    if len(fitted):
+        alpha[fitted], beta[fitted] = ReliabilityCalculator.calculate_from_manual_hours_batch(samples)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sum_log[fitted] = np.add.reduceat(np.log(sorted_hours), starts[fitted])
+
+    # Nullable integers: a float column with NaN would be written "2.0", which
+    # COPY rejects for an INTEGER column
+    fit_count = pd.array(counts, dtype="Int64")
+    fit_count[counts == 0] = pd.NA
+
+    manual_hours = [None] * n_groups
+    for i, sample in zip(fitted, samples):
+        manual_hours[i] = json.dumps(sample.tolist())
+
+    return pd.DataFrame({
+        "id": uuid4_strings(n_groups),
+        "user_id": user_id,
+        "machine_id": None,  # No machine assigned yet
+        "machine_name": "Unassigned",
+        "component_id": _component_labels(stats["component_name"], None),
+        "component_name": stats["component_name"],
+        "sub_component": stats["sub_component"].astype(object).where(stats["sub_component"].notna(), None),
+        "failure_mode": stats["failure_mode"].astype(object).where(stats["failure_mode"].notna(), None),
+        "failure_hours": finite_floats(stats["mean"].to_numpy()),
+        "csv_upload_id": csv_upload_id,
+        "manual_hours": manual_hours,
+        "failure_count": counts,
+        "failure_sd": finite_floats(stats["std"].to_numpy()),
+        "fit_alpha": finite_floats(alpha),
+        "fit_beta": finite_floats(beta),
+        "fit_count": fit_count,
+        "fit_sum_log": finite_floats(sum_log),
+    }, columns=list(AGGREGATE_COLUMNS))
+
+
+def copy_buffer(frame: pd.DataFrame) -> io.StringIO:
+    """
+    Component rows as COPY ... WITH (FORMAT csv, NULL '\\N') input.
+
+    Missing values are written as \\N rather than as unquoted empty fields, which
+    COPY would otherwise read as NULL: an empty string (e.g. a whitespace-only
+    Component) stays an empty string, as with the executemany path.
+    """
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL)
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_components(db: Session, frame: pd.DataFrame) -> bool:
+    """COPY rows into components on PostgreSQL; False when COPY is not available"""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    cursor = db.connection().connection.cursor()
+    if not hasattr(cursor, "copy_expert"):
+        cursor.close()
+        return False
+
+    try:
+        cursor.copy_expert(
+            f"COPY {Component.__tablename__} ({', '.join(frame.columns)}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            copy_buffer(frame)
+        )
+    finally:
+        cursor.close()
+    return True
+
+
+def insert_components(db: Session, frame: pd.DataFrame, batch_size: int = CSV_INSERT_BATCH_SIZE) -> int:
+    """Insert component rows (COPY on PostgreSQL, batched executemany otherwise); no commit"""
+    if frame.empty:
+        return 0
+    if not _copy_components(db, frame):
+        # The Core insert is compiled once and handed to the driver's executemany
+        # (the ORM bulk path splits batches into single-row statements when NULL
+        # columns vary, and per-row parameter processing dominates otherwise)
+        connection = db.connection()
+        compiled = insert(Component.__table__).compile(
+            dialect=connection.dialect, column_keys=list(frame.columns)
+        )
+        # Python values with None for missing (no NaN / pd.NA, which drivers cannot bind)
+        columns = {c: frame[c].astype(object).where(frame[c].notna(), None).tolist() for c in frame.columns}
+        if compiled.positional:
+            records: List = list(zip(*(columns[c] for c in compiled.positiontup)))
+        else:
+            records = [dict(zip(columns, row)) for row in zip(*columns.values())]
+        for start in range(0, len(records), batch_size):
+            connection.exec_driver_sql(str(compiled), records[start:start + batch_size])
+    return len(frame)
+
+
+def process_csv_file(
+    file_path: str,
+    user: User,
+    db: Session,
+    csv_upload_id: str,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    mode: str = "rows"
+) -> Dict:
     """
     Process uploaded CSV file and create components.
 
@@ -23,65 +309,61 @@ def process_csv_file(file_path: str, user: User, db: Session, csv_upload_id: str
     - Failure mode (optional)
     - Failure hours (optional)
 
+    The file is read chunk_rows rows at a time. In "rows" mode each chunk is
+    committed together with the running records_count, so a failure keeps the
+    chunks before it. In "aggregate" mode records_count tracks the rows read and
+    the per-failure-mode components are inserted in one transaction at the end.
+
     Note: Machine must be assigned later by editing components.
     """
+    created = 0
+    rows_read = 0
     try:
-        # Read CSV
-        df = pd.read_csv(file_path)
-
-        # Validate required columns
-        required_columns = ['Component']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f"Missing required column: {col}")
-
-        # Track created records and unique component names
-        components_created = []
-        component_names_seen = {}  # Track unique component names and their IDs
-        component_index = 1  # Counter for unique components
-
-        # Process each row
-        for _, row in df.iterrows():
-            component_name = str(row['Component']).strip()
-
-            # Auto-generate component_id based on component name (only for unique components)
-            if component_name not in component_names_seen:
-                component_id = generate_component_id(component_name, component_index)
-                component_names_seen[component_name] = component_id
-                component_index += 1
+        if mode not in INGEST_MODES:
+            raise ValueError(f"Unknown ingest mode: {mode}")
+
+        # Validate the header before parsing any rows
+        header = pd.read_csv(file_path, nrows=0).columns
+        if "Component" not in header:
+            raise ValueError("Missing required column: Component")
+
+        csv_upload = db.query(CsvUpload).filter(CsvUpload.id == csv_upload_id).first()
+        component_ids: Dict[str, str] = {}
+        reader = pd.read_csv(
+            file_path,
+            usecols=lambda column: column in CSV_COLUMNS,
+            dtype={c: t for c, t in CSV_TEXT_COLUMNS.items() if c in header},
+            chunksize=chunk_rows
+        )
+        events = []
+        for chunk in reader:
+            rows_read += len(chunk)
+            if mode == "aggregate":
+                events.append(parse_events(chunk, missing_as_none=True))
             else:
-                component_id = component_names_seen[component_name]
-
-            # Create component without machine (machine_name will be "Unassigned")
-            component = Component(
-                user_id=user.id,
-                machine_id=None,  # No machine assigned yet
-                machine_name="Unassigned",  # Default value
-                component_id=component_id,  # Auto-generated ID
-                component_name=component_name,
-                sub_component=str(row.get('SupComponent', '')).strip() or None,
-                failure_mode=str(row.get('Failure mode', '')).strip() or None,
-                failure_hours=float(row['Failure hours']) if pd.notna(row.get('Failure hours')) else None
-            )
-            db.add(component)
-            components_created.append(component)
+                frame = build_component_frame(chunk, user.id, component_ids, csv_upload_id)
+                created += insert_components(db, frame)
+            if csv_upload:
+                csv_upload.records_count = rows_read
+            db.commit()
 
-        # Commit all changes
-        db.commit()
+        if mode == "aggregate" and events:
+            created = insert_components(
+                db, aggregate_components(pd.concat(events, ignore_index=True), user.id, csv_upload_id)
+            )
+            db.commit()
 
         # Update CSV upload status
-        csv_upload = db.query(CsvUpload).filter(CsvUpload.id == csv_upload_id).first()
         if csv_upload:
             csv_upload.status = "completed"
-            csv_upload.records_count = len(components_created)
-            from datetime import datetime
+            csv_upload.records_count = rows_read
             csv_upload.processed_at = datetime.utcnow()
             db.commit()
 
         return {
             "success": True,
-            "components_created": len(components_created),
-            "records_processed": len(components_created)
+            "components_created": created,
+            "records_processed": rows_read
         }
 
     except Exception as e:
@@ -92,7 +374,7 @@ def process_csv_file(file_path: str, user: User, db: Session, csv_upload_id: str
         if csv_upload:
             csv_upload.status = "failed"
             csv_upload.error_message = str(e)
-            from datetime import datetime
+            csv_upload.records_count = created if mode == "rows" else 0
             csv_upload.processed_at = datetime.utcnow()
             db.commit()
 
@@ -0,0 +1,204 @@
+"""
+Stored diagram evaluation
+Compiles saved diagrams once per structure and caches evaluated curves in
+reliability_results (analysis_type "rbd").
+
+- structure hash: SHA-256 of the fields that define the gates (key, group,
+  isGroup, horiz, k, text, fi01_id); layout fields such as loc or colors are ignored
+- compiled diagrams: LRU keyed by structure hash, shared by identical diagrams
+- result cache key: structure hash + mode + the version of every bound row
+  (updated_at and the values the fit reads, see source_versions) + the requested
+  time grid, so any edit changes the key and nothing is fitted on a hit
+- at most RBD_RESULTS_PER_DIAGRAM curves are kept per diagram (newest first)
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models.database import Diagram, ReliabilityResult, generate_uuid
+from services.rbd_engine import CompiledRBD, compile_diagram
+from services.rbd_incremental import source_parameters_bulk, source_versions
+from services.reliability_cache import ReliabilityCache
+from utils.numbers import finite_floats
+
+RBD_ANALYSIS_TYPE = "rbd"
+STRUCTURE_FIELDS = ("key", "group", "isGroup", "horiz", "k", "text", "fi01_id")
+DIAGRAM_TYPES = ("component", "fail_item")
+# Stored curves kept per diagram (modes x time grids)
+RBD_RESULTS_PER_DIAGRAM = int(os.getenv("RBD_RESULTS_PER_DIAGRAM", 16))
+
+# Compiled diagrams for the API process, keyed by structure hash
+compiled_diagrams = ReliabilityCache(maxsize=256)
+
+
+def structure_hash(content: Dict) -> str:
+    """Order-independent hash of the diagram's gate structure"""
+    nodes = sorted(
+        json.dumps({f: n[f] for f in STRUCTURE_FIELDS if f in n}, sort_keys=True, default=str)
+        for n in content.get("nodeDataArray", [])
+    )
+    return hashlib.sha256("\n".join(nodes).encode("utf-8")).hexdigest()
+
+
+def get_compiled(diagram: Diagram) -> CompiledRBD:
+    """Compiled form of a stored diagram (compiled on first use per structure)"""
+    return compiled_diagrams.get_or_compute(diagram.structure_hash, lambda: compile_diagram(diagram.content))
+
+
+def leaf_sources(diagram: Diagram, rbd: CompiledRBD, mode: Optional[str] = None) -> List[str]:
+    """
+    Bound row id of each leaf column.
+
+    Raises:
+        KeyError: when a leaf has no binding
+    """
+    bindings = diagram.bindings or {}
+    labels = rbd.leaf_labels(mode)
+    unbound = sorted({label for label in labels if label not in bindings})
+    if unbound:
+        raise KeyError(f"Missing binding for: {', '.join(unbound)}")
+    return [bindings[label] for label in labels]
+
+
+def resolve_parameters(
+    sources: List[str],
+    params: Dict[str, Optional[Tuple[float, float]]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (alphas, betas) of the leaf columns from source_parameters_bulk output.
+
+    Raises:
+        KeyError: when a row has no usable parameters
+    """
+    unresolved = sorted({source_id for source_id in sources if params[source_id] is None})
+    if unresolved:
+        raise KeyError(f"No Weibull parameters for component / failure item: {', '.join(unresolved)}")
+    values = np.array([params[source_id] for source_id in sources], dtype=np.float64)
+    return values[:, 0], values[:, 1]
+
+
+def leaf_parameters(
+    db: Session,
+    diagram: Diagram,
+    rbd: CompiledRBD,
+    mode: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weibull parameters of each leaf column from the diagram's bound rows.
+
+    Raises:
+        KeyError: when a leaf has no binding, or its row has no usable parameters
+    """
+    sources = leaf_sources(diagram, rbd, mode)
+    return resolve_parameters(sources, source_parameters_bulk(db, diagram.user_id, sources))
+
+
+def grid_spec(times: Optional[List[float]], t_max: Optional[float], n_points: int) -> Dict:
+    """The requested time grid as it enters the result key"""
+    return {"times": [float(t) for t in times]} if times else {"t_max": t_max, "n_points": n_points}
+
+
+def result_key(diagram: Diagram, mode: Optional[str], versions: List[Optional[str]], grid: Dict) -> str:
+    """Fingerprint of everything a stored curve depends on"""
+    digest = hashlib.sha256()
+    digest.update(diagram.structure_hash.encode("utf-8"))
+    digest.update(json.dumps(mode).encode("utf-8"))
+    digest.update(json.dumps(versions).encode("utf-8"))
+    digest.update(json.dumps(grid, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def prune_results(db: Session, keep: Dict[str, List[str]], limit: int = RBD_RESULTS_PER_DIAGRAM) -> int:
+    """
+    Delete all but the newest `limit` rbd results of each diagram in keep
+    ({diagram_id: result ids that must survive, e.g. the rows just added}).
+    Does not commit.
+    """
+    if not keep:
+        return 0
+    rows = db.query(ReliabilityResult.id, ReliabilityResult.diagram_id).filter(
+        ReliabilityResult.diagram_id.in_(list(keep)),
+        ReliabilityResult.analysis_type == RBD_ANALYSIS_TYPE
+    ).order_by(ReliabilityResult.created_at.desc(), ReliabilityResult.id).all()
+
+    kept = {diagram_id: set(ids) for diagram_id, ids in keep.items()}
+    stale = []
+    for row in rows:
+        survivors = kept[row.diagram_id]
+        if row.id in survivors:
+            continue
+        if len(survivors) < limit:
+            survivors.add(row.id)
+        else:
+            stale.append(row.id)
+    if stale:
+        db.query(ReliabilityResult).filter(ReliabilityResult.id.in_(stale)).delete(synchronize_session=False)
+    return len(stale)
+
+
+def cached_curve(
+    db: Session,
+    diagram: Diagram,
+    rbd: CompiledRBD,
+    mode: Optional[str],
+    grid: Dict,
+    time_grid: Callable[[np.ndarray, np.ndarray], np.ndarray]
+) -> Tuple[List[float], List[Optional[float]], bool]:
+    """
+    R_sys(t) of a stored diagram, read from reliability_results when the same
+    structure, bound row versions and grid were evaluated before. Leaf parameters
+    are only fitted on a miss; the new curve then replaces the oldest ones past
+    RBD_RESULTS_PER_DIAGRAM.
+
+    Args:
+        grid: grid_spec of the request
+        time_grid: Builds the time points from the leaf (alphas, betas)
+
+    Returns:
+        Tuple of (times, r_system, cached)
+
+    Raises:
+        KeyError: when a leaf has no binding, or its row has no usable parameters
+    """
+    sources = leaf_sources(diagram, rbd, mode)
+    versions = source_versions(db, diagram.user_id, sources)
+    key = result_key(diagram, mode, [versions[s] for s in sources], grid)
+    stored = db.query(ReliabilityResult).filter(
+        ReliabilityResult.diagram_id == diagram.id,
+        ReliabilityResult.cache_key == key
+    ).first()
+    if stored:
+        results = json.loads(stored.results)
+        return results["times"], results["r_system"], True
+
+    alphas, betas = resolve_parameters(sources, source_parameters_bulk(db, diagram.user_id, sources))
+    times = time_grid(alphas, betas)
+    values = finite_floats(rbd.evaluate_times(alphas, betas, times))
+    result = ReliabilityResult(
+        id=generate_uuid(),
+        user_id=diagram.user_id,
+        diagram_id=diagram.id,
+        analysis_type=RBD_ANALYSIS_TYPE,
+        cache_key=key,
+        results=json.dumps({"mode": mode, "times": times.tolist(), "r_system": values}),
+        # Explicit so pruning can order curves stored within the same second (SQLite)
+        created_at=datetime.now(timezone.utc)
+    )
+    db.add(result)
+    db.flush()
+    prune_results(db, {diagram.id: [result.id]})
+    db.commit()
+    return times.tolist(), values, False
+
+
+def clear_results(db: Session, diagram_id: str) -> int:
+    """Delete the cached curves of a diagram (after its content or bindings change)"""
+    return db.query(ReliabilityResult).filter(
+        ReliabilityResult.diagram_id == diagram_id,
+        ReliabilityResult.analysis_type == RBD_ANALYSIS_TYPE
+    ).delete(synchronize_session=False)
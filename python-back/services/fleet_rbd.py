@@ -0,0 +1,243 @@
+"""
+Fleet System Reliability Service
+Evaluates the saved diagrams of every machine of a user in the shared process
+pool and streams one result per diagram as it finishes.
+
+All database reads happen up front with a few bulk queries (diagrams, machines,
+bound row versions, cached results, then leaf parameters of the diagrams without
+a cached curve); workers only receive the compiled diagram and its parameter
+arrays. New curves are stored as "rbd" results in one bulk insert at the end of
+the stream (also when a diagram failed or the client went away), with their own
+session, and older curves past RBD_RESULTS_PER_DIAGRAM are pruned.
+"""
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from models.database import Diagram, Machine, ReliabilityResult, generate_uuid
+from services.diagram_store import (
+    RBD_ANALYSIS_TYPE,
+    get_compiled,
+    leaf_sources,
+    prune_results,
+    resolve_parameters,
+    result_key,
+)
+from services.fleet_refit import get_executor
+from services.rbd_engine import CompiledRBD
+from services.rbd_incremental import source_parameters_bulk, source_versions
+from utils.database import SessionLocal
+from utils.numbers import finite_floats
+
+
+def load_fleet(
+    db: Session,
+    user_id: str,
+    mode: Optional[str] = None,
+    machine_ids: Optional[List[str]] = None,
+    diagram_type: Optional[str] = None
+) -> List[Dict]:
+    """
+    Diagrams of a user with their compiled form and bound rows.
+
+    Returns:
+        One job per diagram: "diagram" (id, name, machine_id, machine_name) and
+        "structure" (the Diagram row) plus either "rbd", "sources" (bound row id
+        per leaf column) and "versions" (source_versions of those rows), or "error"
+    """
+    query = db.query(Diagram).filter(Diagram.user_id == user_id)
+    if machine_ids:
+        query = query.filter(Diagram.machine_id.in_(machine_ids))
+    if diagram_type:
+        query = query.filter(Diagram.diagram_type == diagram_type)
+    diagrams = query.order_by(Diagram.created_at).all()
+
+    machine_names = {
+        m.id: m.name for m in db.query(Machine.id, Machine.name).filter(Machine.user_id == user_id).all()
+    }
+
+    jobs = []
+    sources = set()
+    for diagram in diagrams:
+        job = {
+            "diagram": {
+                "diagram_id": diagram.id,
+                "diagram_name": diagram.name,
+                "machine_id": diagram.machine_id,
+                "machine_name": machine_names.get(diagram.machine_id),
+            },
+            "structure": diagram,
+        }
+        try:
+            job["rbd"] = get_compiled(diagram)
+        except ValueError as e:
+            job["error"] = f"Invalid diagram: {e}"
+            jobs.append(job)
+            continue
+
+        try:
+            job["sources"] = leaf_sources(diagram, job["rbd"], mode)
+            sources.update(job["sources"])
+        except KeyError as e:
+            job["error"] = e.args[0]
+        jobs.append(job)
+
+    versions = source_versions(db, user_id, sources) if sources else {}
+    for job in jobs:
+        if "sources" in job:
+            job["versions"] = [versions[s] for s in job["sources"]]
+    return jobs
+
+
+def evaluate_fleet_diagram(index: int, rbd: CompiledRBD, alphas: np.ndarray, betas: np.ndarray, times: np.ndarray) -> Dict:
+    """R_sys(t) of one diagram (runs inside a worker process)"""
+    start = time.perf_counter()
+    r_system = rbd.evaluate_times(alphas, betas, times)
+    return {
+        "index": index,
+        "r_system": finite_floats(r_system),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _store_curves(new_rows: List[Dict]) -> Optional[str]:
+    """
+    Bulk-insert computed curves and prune each diagram's older ones, with a
+    session of its own (the request's session may already be closed while the
+    response streams). Returns the error message if the write failed.
+    """
+    if not new_rows:
+        return None
+    keep = {}
+    for row in new_rows:
+        keep.setdefault(row["diagram_id"], []).append(row["id"])
+    with SessionLocal() as session:
+        try:
+            session.execute(insert(ReliabilityResult), new_rows)
+            prune_results(session, keep)
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            return str(e.__cause__ or e)
+    return None
+
+
+def stream_fleet_curves(
+    db: Session,
+    user_id: str,
+    jobs: List[Dict],
+    grid: Dict,
+    time_grid: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    mode: Optional[str] = None,
+    executor: Optional[ProcessPoolExecutor] = None
+) -> Iterator[str]:
+    """
+    NDJSON lines for every job: errors and cached curves first, then computed
+    curves in completion order, then a {"summary": ...} line.
+
+    A diagram whose evaluation raises (or whose worker dies) gets an "error"
+    line instead of a curve; the curves computed so far are still stored and
+    the summary still written.
+
+    The cached-result lookup (keyed by grid, the grid_spec of the request) and
+    the parameter fits of the remaining diagrams, whose times come from
+    time_grid(alphas, betas), are done before the first line is produced.
+    """
+    start = time.perf_counter()
+    keyed = [job for job in jobs if "error" not in job]
+    for job in keyed:
+        job["key"] = result_key(job["structure"], mode, job["versions"], grid)
+
+    cached = {}
+    if keyed:
+        rows = db.query(ReliabilityResult.diagram_id, ReliabilityResult.cache_key, ReliabilityResult.results).filter(
+            ReliabilityResult.user_id == user_id,
+            ReliabilityResult.analysis_type == RBD_ANALYSIS_TYPE,
+            ReliabilityResult.cache_key.in_([job["key"] for job in keyed])
+        ).all()
+        cached = {(r.diagram_id, r.cache_key): r.results for r in rows}
+
+    # Fit only the leaves of diagrams that have to be evaluated
+    missed = [job for job in keyed if (job["diagram"]["diagram_id"], job["key"]) not in cached]
+    params = source_parameters_bulk(db, user_id, {s for job in missed for s in job["sources"]}) if missed else {}
+    for job in missed:
+        try:
+            job["alphas"], job["betas"] = resolve_parameters(job["sources"], params)
+        except KeyError as e:
+            job["error"] = e.args[0]
+            continue
+        job["times"] = time_grid(job["alphas"], job["betas"])
+
+    def generate():
+        counts = {"evaluated": 0, "cached": 0, "failed": 0}
+        pending = []
+        for job in jobs:
+            if "error" in job:
+                counts["failed"] += 1
+                yield json.dumps({**job["diagram"], "error": job["error"]}) + "\n"
+            elif (job["diagram"]["diagram_id"], job["key"]) in cached:
+                counts["cached"] += 1
+                stored = json.loads(cached[(job["diagram"]["diagram_id"], job["key"])])
+                yield json.dumps({**job["diagram"], "times": stored["times"], "r_system": stored["r_system"], "cached": True}) + "\n"
+            else:
+                pending.append(job)
+
+        new_rows = []
+        futures = {}
+        try:
+            if pending:
+                pool = executor or get_executor()
+                for i, job in enumerate(pending):
+                    try:
+                        futures[pool.submit(evaluate_fleet_diagram, i, job["rbd"], job["alphas"], job["betas"], job["times"])] = job
+                    except Exception as e:
+                        counts["failed"] += 1
+                        yield json.dumps({**job["diagram"], "error": f"Evaluation failed: {e}"}) + "\n"
+
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # A diagram error or a dead worker fails this diagram only
+                    counts["failed"] += 1
+                    yield json.dumps({**job["diagram"], "error": f"Evaluation failed: {e}"}) + "\n"
+                    continue
+                counts["evaluated"] += 1
+                times = job["times"].tolist()
+                new_rows.append({
+                    "id": generate_uuid(),
+                    "user_id": user_id,
+                    "diagram_id": job["diagram"]["diagram_id"],
+                    "analysis_type": RBD_ANALYSIS_TYPE,
+                    "cache_key": job["key"],
+                    "results": json.dumps({"mode": mode, "times": times, "r_system": result["r_system"]}),
+                    "created_at": datetime.now(timezone.utc),
+                })
+                yield json.dumps({
+                    **job["diagram"],
+                    "times": times,
+                    "r_system": result["r_system"],
+                    "cached": False,
+                    "seconds": result["seconds"],
+                }) + "\n"
+        finally:
+            # Also runs when the client disconnects: drop queued work, keep what finished
+            for future in futures:
+                future.cancel()
+            store_error = _store_curves(new_rows)
+
+        summary = {"diagrams": len(jobs), **counts, "stored": 0 if store_error else len(new_rows)}
+        if store_error:
+            summary["store_error"] = store_error
+        summary["seconds"] = time.perf_counter() - start
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return generate()
@@ -0,0 +1,202 @@
+"""
+Fleet Refit Service
+Refits Weibull parameters for every component of a user in a process pool and
+bulk-writes the results to reliability_results, replacing each component's
+previous "weibull" rows so a component has one current result.
+"""
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from models.database import Component, ReliabilityResult, generate_uuid
+from services.reliability_cache import stored_fit
+from services.reliability_calculator import ReliabilityCalculator
+
+FLEET_REFIT_WORKERS = int(os.getenv("FLEET_REFIT_WORKERS", os.cpu_count() or 1))
+FLEET_REFIT_SHARD_SIZE = int(os.getenv("FLEET_REFIT_SHARD_SIZE", 5000))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Shared process pool, created on first use.
+    Uses "spawn" so workers never inherit the API process's threads or DB connections.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=FLEET_REFIT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def fit_shard(shard_index: int, rows: List[Dict], time_point: float) -> Dict:
+    """
+    Fit one shard of components (runs inside a worker process).
+
+    Rows with a current stored MLE fit ("fit") reuse it; other rows with manual
+    hours go through the batched MLE, rows with a mean time and an SD through the
+    batched moment fit; the rest use the same exponential default as
+    calculate_standard_reliability (alpha=1, beta=MT).
+
+    Args:
+        shard_index: Position of the shard, echoed back for timing reports
+        rows: Dicts with "id", "failure_hours", "failure_sd", "manual_hours" and
+            "fit" ((alpha, beta) from stored_fit, or None)
+        time_point: Time at which reliability is reported
+
+    Returns:
+        Dict with the fitted rows and the shard timing
+    """
+    start = time.perf_counter()
+    n = len(rows)
+    alphas = np.ones(n)
+    betas = np.array([r["failure_hours"] if r["failure_hours"] else 1000.0 for r in rows], dtype=np.float64)
+    methods = ["default"] * n
+
+    for i, r in enumerate(rows):
+        if r["fit"] is not None:
+            alphas[i], betas[i] = r["fit"]
+            methods[i] = "mle"
+
+    mle_idx = [i for i, r in enumerate(rows) if r["manual_hours"] and r["fit"] is None]
+    if mle_idx:
+        a, b = ReliabilityCalculator.calculate_from_manual_hours_batch([rows[i]["manual_hours"] for i in mle_idx])
+        alphas[mle_idx] = a
+        betas[mle_idx] = b
+        for i in mle_idx:
+            methods[i] = "mle"
+
+    moment_idx = [
+        i for i, r in enumerate(rows)
+        if not r["manual_hours"] and r["failure_hours"] is not None and r["failure_sd"] and r["failure_sd"] > 0
+    ]
+    if moment_idx:
+        a, b = ReliabilityCalculator.calculate_from_mean_sd_batch(
+            np.array([rows[i]["failure_hours"] for i in moment_idx], dtype=np.float64),
+            np.array([rows[i]["failure_sd"] for i in moment_idx], dtype=np.float64)
+        )
+        alphas[moment_idx] = a
+        betas[moment_idx] = b
+        for i in moment_idx:
+            methods[i] = "mean_sd"
+
+    reliability = ReliabilityCalculator.calculate_curves(alphas, betas, [time_point])["reliability"][:, 0]
+
+    fits = [
+        {
+            "component_id": rows[i]["id"],
+            "shape": float(alphas[i]),
+            "scale": float(betas[i]),
+            "reliability": float(reliability[i]),
+            "method": methods[i],
+        }
+        for i in range(n)
+    ]
+    return {
+        "shard": shard_index,
+        "fits": fits,
+        "timing": {
+            "shard": shard_index,
+            "components": n,
+            "seconds": time.perf_counter() - start,
+            "pid": os.getpid(),
+        },
+    }
+
+
+def refit_user_components(
+    user_id: str,
+    db: Session,
+    time_point: float = 1.0,
+    shard_size: int = FLEET_REFIT_SHARD_SIZE,
+    executor: Optional[ProcessPoolExecutor] = None
+) -> Dict:
+    """
+    Refit every component of a user and store one "weibull" ReliabilityResult per component.
+
+    Each shard's previous "weibull" rows are deleted before its new rows are
+    inserted, in the same transaction, so repeated refits do not accumulate rows.
+
+    Args:
+        user_id: Owner of the components
+        db: Database session
+        time_point: Time at which reliability is reported
+        shard_size: Components per worker task
+        executor: Process pool to use (default: the shared pool)
+
+    Returns:
+        Summary with component count, total seconds and per-shard timings
+    """
+    start = time.perf_counter()
+    rows = [
+        {
+            "id": r.id, "failure_hours": r.failure_hours, "failure_sd": r.failure_sd,
+            "manual_hours": r.manual_hours, "fit": stored_fit(r)
+        }
+        for r in db.query(
+            Component.id, Component.failure_hours, Component.failure_sd, Component.manual_hours,
+            Component.fit_alpha, Component.fit_beta, Component.fit_count
+        )
+        .filter(Component.user_id == user_id)
+        .all()
+    ]
+
+    shards = [rows[i:i + shard_size] for i in range(0, len(rows), shard_size)]
+    pool = executor or get_executor()
+    futures = [pool.submit(fit_shard, i, shard, time_point) for i, shard in enumerate(shards)]
+
+    fit_seconds = time.perf_counter()
+    timings = []
+    written = 0
+    for future in as_completed(futures):
+        result = future.result()
+        timings.append(result["timing"])
+        if result["fits"]:
+            db.execute(
+                delete(ReliabilityResult).where(
+                    ReliabilityResult.user_id == user_id,
+                    ReliabilityResult.analysis_type == "weibull",
+                    ReliabilityResult.component_id.in_([fit["component_id"] for fit in result["fits"]])
+                )
+            )
+            db.execute(
+                insert(ReliabilityResult),
+                [
+                    {
+                        "id": generate_uuid(),
+                        "user_id": user_id,
+                        "component_id": fit["component_id"],
+                        "analysis_type": "weibull",
+                        "results": json.dumps({
+                            "shape": fit["shape"],
+                            "scale": fit["scale"],
+                            "reliability_at_time": {str(time_point): fit["reliability"]},
+                            "method": fit["method"],
+                        }),
+                    }
+                    for fit in result["fits"]
+                ]
+            )
+            written += len(result["fits"])
+    db.commit()
+
+    timings.sort(key=lambda t: t["shard"])
+    return {
+        "components": len(rows),
+        "results_written": written,
+        "shards": len(shards),
+        "workers": FLEET_REFIT_WORKERS if executor is None else None,
+        "fit_seconds": time.perf_counter() - fit_seconds,
+        "total_seconds": time.perf_counter() - start,
+        "shard_timings": timings,
+    }
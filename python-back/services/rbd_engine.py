@@ -0,0 +1,629 @@
+"""
+Reliability Block Diagram (RBD) Engine
+Compiles a GoJS group model (GroupComponent.json / *_GroupFailItem.json) into flat
+arrays and evaluates system reliability from leaf reliabilities.
+
+Diagram semantics (as in System_reliability.ipynb):
+- A group node ("isGroup": true) combines its members in series when "horiz" is
+  true and in parallel otherwise
+- A group with a "k" attribute is a k-out-of-n voting gate: it works while at
+  least k of its members work ("horiz" is ignored for it)
+- A node belongs to the group named by its "group" attribute
+- Top-level groups (and top-level leaves) are combined in series into the system
+
+Unlike the notebook, subgroups are found from the "group" links themselves (no
+matching of 'group'/'main' in node text), evaluation follows a topological
+order instead of counting keys down from max(key), and leaf keys may repeat.
+Groups without any leaf below them are dropped.
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.reliability_calculator import ReliabilityCalculator
+
+SERIES = 0
+PARALLEL = 1
+K_OF_N = 2
+LEAF = -1
+GATE_NAMES = {SERIES: "series", PARALLEL: "parallel", K_OF_N: "k-out-of-n", LEAF: "leaf"}
+
+# Failure modes of failure-item leaves (FailItemDetail "mode_name")
+FAILURE_MODES = ("VIB", "UST", "UNK", "STP", "STD", "SER")
+
+
+def is_failure_item(node: Dict) -> bool:
+    """Leaf keyed per failure mode (fi01_id set) rather than a plain component"""
+    return str(node.get("fi01_id", 0)) not in ("", "0")
+
+
+def leaf_label(node: Dict, mode: Optional[str] = None) -> str:
+    """
+    Key of a leaf's reliability, following the notebook's naming:
+    - failure-item leaves (fi01_id != 0): "fi-11-<fi01_id:03> <text>_<mode>"
+    - component leaves (fi01_id == 0 or missing): "<text>"
+    """
+    if is_failure_item(node):
+        label = f"fi-11-{str(node['fi01_id']).zfill(3)} {node['text']}"
+        return f"{label}_{mode}" if mode else label
+    return str(node.get("text", ""))
+
+
+# Quadrature rules for integrals of R_sys(t) over [t0, inf)
+INTEGRATION_METHODS = ("tanh-sinh", "laguerre")
+# Max leaf x time values evaluated at once when integrating
+_INTEGRATION_CHUNK_ELEMENTS = 4_000_000
+
+
+@lru_cache(maxsize=None)
+def _double_exponential_rule(level: int = 6, v_max: float = 4.0):
+    """
+    Double-exponential (tanh-sinh family) rule for [0, inf): x = exp(pi/2 sinh v),
+    trapezoidal in v with step 2^-level. The rule at step 2h uses every other
+    node, so both estimates come from one set of evaluations.
+
+    Returns:
+        Tuple of (nodes, weights, coarse weights)
+    """
+    h = 2.0 ** -level
+    v = np.arange(-v_max, v_max + h / 2, h)
+    x = np.exp(np.pi / 2 * np.sinh(v))
+    w = h * np.pi / 2 * np.cosh(v) * x
+    coarse = np.zeros_like(w)
+    coarse[::2] = 2.0 * w[::2]
+    return x, w, coarse
+
+
+@lru_cache(maxsize=None)
+def _laguerre_rule(n: int = 64):
+    """
+    Gauss-Laguerre nodes for [0, inf) with the e^-x factor folded into the
+    weights. The n/2-point rule is appended for the error estimate.
+
+    Returns:
+        Tuple of (nodes, weights, coarse weights)
+    """
+    x, w = np.polynomial.laguerre.laggauss(n)
+    xc, wc = np.polynomial.laguerre.laggauss(n // 2)
+    nodes = np.concatenate([x, xc])
+    return (
+        nodes,
+        np.concatenate([w * np.exp(x), np.zeros(n // 2)]),
+        np.concatenate([np.zeros(n), wc * np.exp(xc)]),
+    )
+
+
+def _segment_exclusive_products(x: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    For each element, the product of the other elements of its segment.
+    Zeros are counted instead of divided by: with one zero in a segment only
+    that element gets a non-zero result, with two or more all results are zero.
+    """
+    lengths = np.diff(np.append(offsets, len(x)))
+    is_zero = x == 0.0
+    zeros = np.add.reduceat(is_zero.astype(np.int64), offsets, axis=0)
+    nonzero_product = np.multiply.reduceat(np.where(is_zero, 1.0, x), offsets, axis=0)
+    zeros = np.repeat(zeros, lengths, axis=0)
+    nonzero_product = np.repeat(nonzero_product, lengths, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        others = np.where(is_zero, nonzero_product, nonzero_product / np.where(is_zero, 1.0, x))
+    return np.where(zeros - is_zero > 0, 0.0, others)
+
+
+def _k_of_n(p: np.ndarray, k: int) -> np.ndarray:
+    """
+    P(at least k of n independent blocks work) for a (n x ...) array of block
+    reliabilities, by the Poisson-binomial DP over success counts 0..k-1 with
+    an absorbing ">= k" state. O(n * k) per column.
+    """
+    dist = np.zeros((k + 1,) + p.shape[1:])
+    dist[0] = 1.0
+    for p_i in p:
+        moved = dist[:k] * p_i
+        dist[:k] -= moved
+        dist[1:k] += moved[:-1]
+        dist[k] += moved[-1]
+    return dist[k]
+
+
+def _k_of_n_others(p: np.ndarray, k: int) -> np.ndarray:
+    """
+    For every block i, P(exactly j of the other blocks work) for j = 0..k-1,
+    from prefix and suffix count distributions. O(n * k^2) per column.
+
+    Returns:
+        (n x k x ...) array
+    """
+    n = len(p)
+    prefix = np.zeros((n + 1, k) + p.shape[1:])
+    suffix = np.zeros((n + 1, k) + p.shape[1:])
+    prefix[0, 0] = 1.0
+    suffix[n, 0] = 1.0
+    for i in range(n):
+        prefix[i + 1] = prefix[i] * (1.0 - p[i])
+        prefix[i + 1, 1:] += prefix[i, :-1] * p[i]
+    for i in range(n - 1, -1, -1):
+        suffix[i] = suffix[i + 1] * (1.0 - p[i])
+        suffix[i, 1:] += suffix[i + 1, :-1] * p[i]
+    # P(j others work) = sum over a of prefix[i][a] * suffix[i + 1][j - a]
+    return np.stack([np.sum(prefix[:n, :j + 1] * suffix[1:, j::-1], axis=1) for j in range(k)], axis=1)
+
+
+def _k_of_n_derivatives(p: np.ndarray, k: int) -> np.ndarray:
+    """dP(at least k work)/dp_i = P(exactly k - 1 of the other blocks work), for every block i"""
+    return _k_of_n_others(p, k)[:, k - 1]
+
+
+class CompiledRBD:
+    """
+    Flat-array form of a diagram.
+
+    Node 0 is the virtual system root (series). Arrays are indexed by node:
+    - parent: parent node index (-1 for the root)
+    - gate: SERIES / PARALLEL / K_OF_N for groups, LEAF for leaves
+    - k: required working members of K_OF_N groups (0 elsewhere)
+    - depth: distance from the root
+    - order: topological order, children before parents
+    Leaves are also numbered 0..n_leaves-1 in diagram order (leaf_nodes maps a
+    leaf column to its node index).
+    """
+
+    def __init__(
+        self,
+        parent: np.ndarray,
+        gate: np.ndarray,
+        texts: List[str],
+        keys: List,
+        leaf_nodes: np.ndarray,
+        leaf_data: List[Dict],
+        k: Optional[np.ndarray] = None
+    ):
+        self.parent = parent
+        self.gate = gate
+        self.k = k if k is not None else np.zeros(len(parent), dtype=np.int32)
+        self.texts = texts
+        self.keys = keys
+        self.leaf_nodes = leaf_nodes
+        self.leaf_data = leaf_data
+        self.n_nodes = len(parent)
+        self.n_leaves = len(leaf_nodes)
+
+        depth = np.zeros(self.n_nodes, dtype=np.int32)
+        for i in range(1, self.n_nodes):
+            # Parents always precede children in node numbering (see compile_diagram)
+            depth[i] = depth[parent[i]] + 1
+        self.depth = depth
+        self.order = np.argsort(-depth, kind="stable").astype(np.int32)
+
+        # Children of every node in CSR form (child_idx[child_ptr[i]:child_ptr[i + 1]])
+        by_parent = np.argsort(parent[1:], kind="stable") + 1
+        self.child_idx = by_parent.astype(np.int32)
+        self.child_ptr = np.zeros(self.n_nodes + 1, dtype=np.int32)
+        np.cumsum(np.bincount(parent[1:], minlength=self.n_nodes), out=self.child_ptr[1:])
+
+        # Per-level segments: the children of every series/parallel group at depth d,
+        # sorted by parent, so each level is folded with one multiply.reduceat.
+        # k-out-of-n groups of the level are listed separately as (group, children, k).
+        self.levels = []
+        for d in range(int(depth.max()) - 1, -1, -1):
+            children = np.flatnonzero((depth == d + 1) & (gate[np.maximum(parent, 0)] != K_OF_N))
+            children = children[np.argsort(parent[children], kind="stable")]
+            groups, offsets = np.unique(parent[children], return_index=True)
+            voting = [
+                (int(g), self.child_idx[self.child_ptr[g]:self.child_ptr[g + 1]], int(self.k[g]))
+                for g in np.flatnonzero((depth == d) & (gate == K_OF_N))
+            ]
+            self.levels.append((
+                children,
+                offsets,
+                groups,
+                np.repeat(gate[groups] == PARALLEL, np.diff(np.append(offsets, len(children)))),
+                gate[groups] == PARALLEL,
+                voting,
+            ))
+
+        # Series/parallel segments split by gate for the min/max fold of failure times
+        self.gate_levels = []
+        for children, offsets, groups, child_parallel, group_parallel, _ in self.levels:
+            split = []
+            for parallel in (False, True):
+                keep = child_parallel == parallel
+                sub_children = children[keep]
+                sub_groups, sub_offsets = np.unique(parent[sub_children], return_index=True)
+                split.append((sub_children, sub_offsets, sub_groups))
+            self.gate_levels.append(tuple(split))
+
+    def gate_name(self, node: int) -> str:
+        """"series", "parallel", "leaf" or e.g. "2-out-of-3" """
+        if self.gate[node] == K_OF_N:
+            return f"{self.k[node]}-out-of-{self.child_ptr[node + 1] - self.child_ptr[node]}"
+        return GATE_NAMES[int(self.gate[node])]
+
+    def leaf_labels(self, mode: Optional[str] = None) -> List[str]:
+        """Reliability key of each leaf column (see leaf_label)"""
+        return [leaf_label(node, mode) for node in self.leaf_data]
+
+    def leaf_vector(self, reliabilities: Dict[str, float], mode: Optional[str] = None) -> np.ndarray:
+        """
+        Gather per-leaf values from a {label: value} mapping.
+        Values may be scalars (R) or tuples such as (alpha, beta), giving (leaves x k).
+        """
+        labels = self.leaf_labels(mode)
+        missing = [label for label in labels if label not in reliabilities]
+        if missing:
+            raise KeyError(f"Missing reliability for: {', '.join(sorted(set(missing)))}")
+        return np.array([reliabilities[label] for label in labels], dtype=np.float64)
+
+    def mode_matrix(
+        self,
+        reliabilities: Dict[str, float],
+        modes: Sequence[str] = FAILURE_MODES,
+        missing: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        (leaves x modes) reliability matrix from a {label: R} mapping keyed
+        "<label>_<mode>". Component leaves have no mode and repeat across columns.
+
+        Args:
+            missing: Value for absent labels (e.g. 1.0 when a mode does not apply);
+                when None, absent labels raise KeyError
+        """
+        matrix = np.empty((self.n_leaves, len(modes)))
+        absent = set()
+        for j, mode in enumerate(modes):
+            for i, label in enumerate(self.leaf_labels(mode)):
+                value = reliabilities.get(label, missing)
+                if value is None:
+                    absent.add(label)
+                    value = np.nan
+                matrix[i, j] = value
+        if absent:
+            raise KeyError(f"Missing reliability for: {', '.join(sorted(absent))}")
+        return matrix
+
+    def evaluate_modes(self, mode_matrix: np.ndarray):
+        """
+        System reliability for every failure mode plus all modes combined, in one pass.
+
+        Modes are competing risks: a failure-item leaf survives only if it survives
+        every mode, so its combined R is the product over modes (component leaves
+        keep their single value). The combined leaf column is folded through the
+        diagram with the per-mode columns; it is not the product of the per-mode
+        system values whenever the diagram has parallel groups.
+
+        Returns:
+            Tuple of (per-mode R_sys array, combined R_sys)
+        """
+        modal = np.array([is_failure_item(node) for node in self.leaf_data], dtype=bool)
+        combined = np.where(modal, np.prod(mode_matrix, axis=1), mode_matrix[:, 0])
+        system = self.evaluate_nodes(np.column_stack([mode_matrix, combined]))[0]
+        return system[:-1], float(system[-1])
+
+    def evaluate_nodes(self, leaf_reliability: np.ndarray) -> np.ndarray:
+        """
+        Reliability of every node for one leaf vector, or for a (leaves x times) matrix.
+
+        Each depth level is one gather, one multiply.reduceat along the node axis
+        and one scatter: series groups multiply R, parallel groups multiply (1 - R).
+        k-out-of-n groups use the Poisson-binomial DP (O(n * k) per group).
+        O(nodes) work in total (per time point) without voting gates.
+
+        Returns:
+            (n_nodes,) or (n_nodes x n_times) array; row 0 is the system
+        """
+        leaf_reliability = np.asarray(leaf_reliability, dtype=np.float64)
+        if leaf_reliability.ndim not in (1, 2) or leaf_reliability.shape[0] != self.n_leaves:
+            raise ValueError(f"expected {self.n_leaves} leaf reliabilities, got {leaf_reliability.shape}")
+
+        values = np.ones((self.n_nodes,) + leaf_reliability.shape[1:])
+        values[self.leaf_nodes] = leaf_reliability
+        extra = (slice(None),) + (None,) * (leaf_reliability.ndim - 1)
+        for children, offsets, groups, child_parallel, group_parallel, voting in self.levels:
+            if len(children):
+                x = values[children]
+                x = np.where(child_parallel[extra], 1.0 - x, x)
+                p = np.multiply.reduceat(x, offsets, axis=0)
+                values[groups] = np.where(group_parallel[extra], 1.0 - p, p)
+            for group, members, k in voting:
+                values[group] = _k_of_n(values[members], k)
+        return values
+
+    def gradients(self, leaf_reliability: np.ndarray):
+        """
+        Node values and dR_sys/dR_node for every node, in one forward and one backward pass.
+
+        Going down the tree, a child's derivative is its parent's derivative times
+        the product of its siblings' factors (R for series, 1 - R for parallel).
+        Works for one leaf vector or a (leaves x times) matrix.
+
+        Returns:
+            Tuple of (values, gradient), both shaped like evaluate_nodes' result
+        """
+        values = self.evaluate_nodes(leaf_reliability)
+        gradient = np.zeros_like(values)
+        gradient[0] = 1.0
+        extra = (slice(None),) + (None,) * (values.ndim - 1)
+        for children, offsets, groups, child_parallel, _, voting in reversed(self.levels):
+            if len(children):
+                x = values[children]
+                x = np.where(child_parallel[extra], 1.0 - x, x)
+                gradient[children] = gradient[self.parent[children]] * _segment_exclusive_products(x, offsets)
+            for group, members, k in voting:
+                gradient[members] = gradient[group] * _k_of_n_derivatives(values[members], k)
+        return values, gradient
+
+    def perfect_unreliability(self, values: np.ndarray, gradient: np.ndarray) -> np.ndarray:
+        """
+        F_sys with each node made perfect (R_i = 1), for every node, top-down.
+
+        F_sys is linear in a node's unreliability with slope dR_sys/dR_node, so
+        F_sys(R_i = 1) = F_sys(R_p = 1) + gradient[p] * F_p(R_i = 1) for the parent p,
+        where F_p(R_i = 1) is 0 under a parallel gate, 1 - product of the siblings'
+        R under a series gate and P(fewer than k - 1 others work) under a voting
+        gate. Every term is non-negative, so the result is exactly 0 whenever a
+        perfect node makes the system perfect (no F_sys - I_B * F_i cancellation).
+
+        Returns:
+            Array shaped like values; row 0 (the root) is 0
+        """
+        perfect = np.zeros_like(values)
+        extra = (slice(None),) + (None,) * (values.ndim - 1)
+        for children, offsets, _, child_parallel, _, voting in reversed(self.levels):
+            if len(children):
+                parents = self.parent[children]
+                others = _segment_exclusive_products(values[children], offsets)
+                f_parent = np.where(child_parallel[extra], 0.0, 1.0 - others)
+                perfect[children] = perfect[parents] + gradient[parents] * f_parent
+            for group, members, k in voting:
+                f_parent = np.sum(_k_of_n_others(values[members], k)[:, :k - 1], axis=1)
+                perfect[members] = perfect[group] + gradient[group] * f_parent
+        return perfect
+
+    def mean_life(
+        self,
+        alphas: np.ndarray,
+        betas: np.ndarray,
+        ages: Sequence[float] = (),
+        method: str = "tanh-sinh"
+    ) -> Dict:
+        """
+        System MTTF, time-to-failure standard deviation and mean residual life
+        MRL(t0) = integral of R_sys from t0 to inf / R_sys(t0), by fixed-node quadrature.
+
+        All nodes of all integrals form one time grid evaluated through the
+        diagram with evaluate_times (in bounded chunks). The error estimate is the
+        difference to the coarser rule (every other node for tanh-sinh, the
+        n/2-point rule for Gauss-Laguerre).
+
+        Args:
+            alphas, betas: Weibull parameters of each leaf column
+            ages: Ages t0 for the mean residual life
+            method: "tanh-sinh" or "laguerre"
+
+        Returns:
+            Dict with mttf, mttf_error, std_deviation, mrl (per age: age,
+            reliability, mrl, error), nodes (time points evaluated) and method
+        """
+        if method not in INTEGRATION_METHODS:
+            raise ValueError(f"method must be one of: {', '.join(INTEGRATION_METHODS)}")
+        alphas = np.asarray(alphas, dtype=np.float64)
+        betas = np.asarray(betas, dtype=np.float64)
+        ages = np.asarray(ages, dtype=np.float64)
+
+        x, w, w_coarse = _double_exponential_rule() if method == "tanh-sinh" else _laguerre_rule()
+        # Time scale of the substitution t = t0 + scale * x: where R_sys falls to 1/e,
+        # located on a coarse log grid spanning all leaves
+        probe = np.geomspace(np.min(betas) * 1e-6, np.max(betas) * 1e3, 97)
+        below = np.flatnonzero(self.evaluate_times(alphas, betas, probe) < np.exp(-1.0))
+        scale = float(probe[below[0]] if len(below) else probe[-1])
+        starts = np.concatenate([[0.0], ages])
+        times = np.concatenate([(starts[:, None] + scale * x[None, :]).ravel(), ages])
+
+        step = max(1, _INTEGRATION_CHUNK_ELEMENTS // max(self.n_leaves, 1))
+        r = np.concatenate([
+            self.evaluate_times(alphas, betas, times[i:i + step]) for i in range(0, len(times), step)
+        ])
+        r_nodes = r[:len(starts) * len(x)].reshape(len(starts), len(x))
+        r_ages = r[len(starts) * len(x):]
+
+        tail = scale * (r_nodes @ w)
+        tail_coarse = scale * (r_nodes @ w_coarse)
+        # E[T^2] = 2 * integral of t R(t)
+        t = scale * x
+        second = 2.0 * scale * np.dot(t * r_nodes[0], w)
+        variance = max(second - tail[0] ** 2, 0.0)
+
+        mrl = []
+        for i, age in enumerate(ages):
+            reliability = float(r_ages[i])
+            if reliability > 0:
+                mrl.append({
+                    "age": float(age),
+                    "reliability": reliability,
+                    "mrl": float(tail[i + 1] / reliability),
+                    "error": float(abs(tail[i + 1] - tail_coarse[i + 1]) / reliability),
+                })
+            else:
+                mrl.append({"age": float(age), "reliability": reliability, "mrl": None, "error": None})
+
+        return {
+            "mttf": float(tail[0]),
+            "mttf_error": float(abs(tail[0] - tail_coarse[0])),
+            "std_deviation": float(np.sqrt(variance)),
+            "mrl": mrl,
+            "nodes": len(times),
+            "method": method,
+        }
+
+    def importance(self, leaf_reliability: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Importance measures of every node (leaves and groups) from one gradient pass.
+
+        R_sys is linear in each node's R (every node appears once in the tree), so
+        with I_B = dR_sys/dR_i and F = 1 - R:
+        - birnbaum: I_B
+        - criticality: I_B * F_i / F_sys (share of system unreliability due to i)
+        - raw: risk achievement worth, F_sys(R_i = 0) / F_sys
+        - rrw: risk reduction worth, F_sys / F_sys(R_i = 1), with the denominator
+          from perfect_unreliability (inf for a member of a parallel group)
+        Ratios with a zero denominator are inf (or nan for 0/0).
+
+        Returns:
+            Dict of per-node arrays, plus the node "reliability" values
+        """
+        values, birnbaum = self.gradients(leaf_reliability)
+        perfect = self.perfect_unreliability(values, birnbaum)
+        f_sys = 1.0 - values[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            criticality = birnbaum * (1.0 - values) / f_sys
+            raw = (f_sys + birnbaum * values) / f_sys
+            rrw = (perfect + birnbaum * (1.0 - values)) / perfect
+        return {
+            "reliability": values,
+            "birnbaum": birnbaum,
+            "criticality": criticality,
+            "raw": raw,
+            "rrw": rrw,
+        }
+
+    def system_failure_times(self, leaf_times: np.ndarray) -> np.ndarray:
+        """
+        System time-to-failure from a (leaves x samples) matrix of leaf failure times.
+
+        A series group fails with its first member (min), a parallel group with
+        its last (max); each level is one minimum.reduceat and one maximum.reduceat.
+        A k-out-of-n group fails at its (n - k + 1)-th member failure.
+        """
+        values = np.empty((self.n_nodes,) + leaf_times.shape[1:])
+        values[self.leaf_nodes] = leaf_times
+        for level, (series, parallel) in zip(self.levels, self.gate_levels):
+            s_children, s_offsets, s_groups = series
+            p_children, p_offsets, p_groups = parallel
+            if len(s_groups):
+                values[s_groups] = np.minimum.reduceat(values[s_children], s_offsets, axis=0)
+            if len(p_groups):
+                values[p_groups] = np.maximum.reduceat(values[p_children], p_offsets, axis=0)
+            for group, members, k in level[5]:
+                nth = len(members) - k
+                values[group] = np.partition(values[members], nth, axis=0)[nth]
+        return values[0]
+
+    def fold_node(self, node: int, values: np.ndarray) -> np.ndarray:
+        """Recompute one group's value from its children's current values"""
+        x = values[self.child_idx[self.child_ptr[node]:self.child_ptr[node + 1]]]
+        if self.gate[node] == K_OF_N:
+            return _k_of_n(x, int(self.k[node]))
+        if self.gate[node] == PARALLEL:
+            return 1.0 - np.prod(1.0 - x, axis=0)
+        return np.prod(x, axis=0)
+
+    def evaluate(self, leaf_reliability: np.ndarray) -> float:
+        """System reliability for one leaf vector"""
+        return float(self.evaluate_nodes(leaf_reliability)[0])
+
+    def evaluate_times(self, alphas: np.ndarray, betas: np.ndarray, times: np.ndarray) -> np.ndarray:
+        """
+        System reliability R_sys(t) over a time grid from Weibull leaf parameters.
+
+        Leaf reliabilities are computed as one (leaves x times) matrix and folded
+        through the gates with vectorized products.
+
+        Args:
+            alphas: Shape parameter of each leaf column
+            betas: Scale parameter of each leaf column
+            times: Non-negative time points
+
+        Returns:
+            R_sys at each time point
+        """
+        leaf_reliability = ReliabilityCalculator.calculate_reliability_grid(alphas, betas, times)
+        return self.evaluate_nodes(leaf_reliability)[0]
+
+
+def compile_diagram(diagram: Dict) -> CompiledRBD:
+    """
+    Compile a GoJS GraphLinksModel dict into a CompiledRBD.
+
+    Raises:
+        ValueError: on duplicate group keys, links to unknown groups, cycles, a
+            diagram without leaves, or a k outside 1..n for a voting group
+    """
+    nodes = diagram.get("nodeDataArray", [])
+
+    groups = {}
+    for n in nodes:
+        if n.get("isGroup"):
+            key = str(n["key"])
+            if key in groups:
+                raise ValueError(f"Duplicate group key: {key}")
+            groups[key] = n
+
+    def parent_key(n):
+        return str(n["group"]) if n.get("group") not in (None, "") else None
+
+    for n in nodes:
+        pk = parent_key(n)
+        if pk is not None and pk not in groups:
+            raise ValueError(f"Node {n.get('text')!r} refers to unknown group {pk}")
+
+    # Number groups so parents precede children (breadth-first from the top level)
+    children_of: Dict[Optional[str], List[str]] = {}
+    for key, g in groups.items():
+        children_of.setdefault(parent_key(g), []).append(key)
+    ordered_groups = []
+    frontier = children_of.get(None, [])
+    while frontier:
+        ordered_groups.extend(frontier)
+        frontier = [c for key in frontier for c in children_of.get(key, [])]
+    if len(ordered_groups) != len(groups):
+        raise ValueError("Group hierarchy contains a cycle")
+
+    leaves = [n for n in nodes if not n.get("isGroup")]
+    if not leaves:
+        raise ValueError("Diagram has no leaf blocks")
+
+    # Drop groups with no leaf below them
+    has_leaf = set()
+    for leaf in leaves:
+        key = parent_key(leaf)
+        while key is not None and key not in has_leaf:
+            has_leaf.add(key)
+            key = parent_key(groups[key])
+    ordered_groups = [key for key in ordered_groups if key in has_leaf]
+
+    index = {key: i + 1 for i, key in enumerate(ordered_groups)}
+    n_nodes = 1 + len(ordered_groups) + len(leaves)
+    parent = np.full(n_nodes, -1, dtype=np.int32)
+    gate = np.full(n_nodes, LEAF, dtype=np.int8)
+    k = np.zeros(n_nodes, dtype=np.int32)
+    texts = ["system"] + [""] * (n_nodes - 1)
+    keys = [None] * n_nodes
+    gate[0] = SERIES
+
+    for key in ordered_groups:
+        i = index[key]
+        g = groups[key]
+        pk = parent_key(g)
+        parent[i] = index[pk] if pk is not None else 0
+        if g.get("k") not in (None, ""):
+            gate[i] = K_OF_N
+            k[i] = int(g["k"])
+        else:
+            gate[i] = SERIES if g.get("horiz") else PARALLEL
+        texts[i] = str(g.get("text", ""))
+        keys[i] = key
+
+    leaf_nodes = np.arange(1 + len(ordered_groups), n_nodes, dtype=np.int32)
+    for i, leaf in zip(leaf_nodes, leaves):
+        pk = parent_key(leaf)
+        parent[i] = index[pk] if pk is not None else 0
+        texts[i] = str(leaf.get("text", ""))
+        keys[i] = leaf.get("key")
+
+    members = np.bincount(parent[1:], minlength=n_nodes)
+    for i in np.flatnonzero(gate == K_OF_N):
+        if not 1 <= k[i] <= members[i]:
+            raise ValueError(f"Group {texts[i]!r}: k={k[i]} must be between 1 and its {members[i]} members")
+
+    return CompiledRBD(parent, gate, texts, keys, leaf_nodes, leaves, k)
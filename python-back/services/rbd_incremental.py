@@ -0,0 +1,368 @@
+"""
+Incremental RBD Evaluation
+Keeps per-node reliability values of live diagrams and, when a leaf's parameters
+change, recomputes only the changed leaves' root paths.
+
+Leaves are bound to source rows (component ids or failure item ids); the edit
+hooks in routes/components.py and routes/failure_items.py push new Weibull
+parameters through rbd_registry. The registry lives in the API process memory
+(it is not shared between worker processes) and is bounded: entries idle for
+RBD_LIVE_TTL_SECONDS expire and the least recently read ones are evicted past
+RBD_LIVE_MAX_ENTRIES.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models.database import Component, FailureItem, FailureParameter
+from services.rbd_engine import CompiledRBD
+from services.reliability_cache import component_reliability
+from services.reliability_calculator import ReliabilityCalculator
+
+# FailureParameter.parameter_type values used to derive a failure item's Weibull parameters
+SHAPE_PARAMETER = "weibull_shape"
+SCALE_PARAMETER = "weibull_scale"
+MEAN_TIME_PARAMETER = "MT"
+STD_DEVIATION_PARAMETER = "SD"
+MANUAL_HOURS_PARAMETER = "manual_hours"  # parameter_text holds a JSON list of hours
+
+# Live diagram limits (per API process)
+RBD_LIVE_MAX_ENTRIES = int(os.getenv("RBD_LIVE_MAX_ENTRIES", 256))
+RBD_LIVE_TTL_SECONDS = float(os.getenv("RBD_LIVE_TTL_SECONDS", 3600))
+
+
+class IncrementalRBD:
+    """
+    A compiled diagram with cached node values over a fixed time grid.
+
+    values is (n_nodes x n_times). update_leaves marks the changed leaves and
+    their ancestors dirty and re-folds only those groups, deepest first.
+    stale maps leaf columns whose bound row lost its parameters (or was deleted)
+    to that row's id; those leaves keep their last values until updated again.
+    """
+
+    def __init__(self, rbd: CompiledRBD, alphas: np.ndarray, betas: np.ndarray, times: np.ndarray):
+        self.rbd = rbd
+        self.times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        self.alphas = np.asarray(alphas, dtype=np.float64).copy()
+        self.betas = np.asarray(betas, dtype=np.float64).copy()
+        self.values = rbd.evaluate_nodes(
+            ReliabilityCalculator.calculate_reliability_grid(self.alphas, self.betas, self.times)
+        )
+        self.last_update = {"leaves_updated": 0, "nodes_reevaluated": rbd.n_nodes - rbd.n_leaves}
+        self.stale: Dict[int, str] = {}
+
+    @property
+    def r_system(self) -> np.ndarray:
+        return self.values[0]
+
+    def snapshot(self) -> Dict:
+        """Copy of the state reported to clients (times, R_sys, last update, stale rows)"""
+        return {
+            "times": self.times.tolist(),
+            "r_system": self.r_system.copy(),
+            "n_nodes": self.rbd.n_nodes,
+            "stale_sources": sorted(set(self.stale.values())),
+            **self.last_update,
+        }
+
+    def update_leaves(self, updates: Dict[int, Tuple[float, float]]) -> int:
+        """
+        Apply new (alpha, beta) to some leaf columns and refresh their root paths.
+
+        Returns:
+            Number of group nodes re-evaluated
+        """
+        if not updates:
+            return 0
+
+        leaves = np.fromiter(updates.keys(), dtype=np.int64)
+        params = np.array(list(updates.values()), dtype=np.float64)
+        for leaf in updates:
+            self.stale.pop(leaf, None)
+        self.alphas[leaves] = params[:, 0]
+        self.betas[leaves] = params[:, 1]
+        self.values[self.rbd.leaf_nodes[leaves]] = ReliabilityCalculator.calculate_reliability_grid(
+            params[:, 0], params[:, 1], self.times
+        )
+
+        dirty: Set[int] = set()
+        for node in self.rbd.leaf_nodes[leaves]:
+            node = int(self.rbd.parent[node])
+            while node >= 0 and node not in dirty:
+                dirty.add(node)
+                node = int(self.rbd.parent[node])
+
+        for node in sorted(dirty, key=lambda i: -self.rbd.depth[i]):
+            self.values[node] = self.rbd.fold_node(node, self.values)
+
+        self.last_update = {"leaves_updated": len(updates), "nodes_reevaluated": len(dirty)}
+        return len(dirty)
+
+
+class RBDRegistry:
+    """
+    Live diagrams of all users, indexed by the source rows their leaves are bound to.
+    LRU by last registration / read, with an idle TTL.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = RBD_LIVE_MAX_ENTRIES,
+        ttl: float = RBD_LIVE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[str, IncrementalRBD, List[Optional[str]]]]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._by_source: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._entries)
+
+    def register(self, entry_id: str, user_id: str, evaluator: IncrementalRBD, leaf_sources: List[Optional[str]]):
+        """Add (or replace) a live diagram; leaf_sources[i] is the source row of leaf column i"""
+        with self._lock:
+            self._remove(entry_id)
+            self._expire()
+            self._entries[entry_id] = (user_id, evaluator, leaf_sources)
+            self._last_used[entry_id] = self._clock()
+            for source_id in set(leaf_sources):
+                if source_id:
+                    self._by_source[source_id].add(entry_id)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def get(self, entry_id: str, user_id: str) -> Optional[IncrementalRBD]:
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(entry_id)
+            if not entry or entry[0] != user_id:
+                return None
+            self._entries.move_to_end(entry_id)
+            self._last_used[entry_id] = self._clock()
+            return entry[1]
+
+    def snapshot(self, entry_id: str, user_id: str) -> Optional[Dict]:
+        """IncrementalRBD.snapshot of a live diagram, taken under the lock (counts as a read)"""
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(entry_id)
+            if not entry or entry[0] != user_id:
+                return None
+            self._entries.move_to_end(entry_id)
+            self._last_used[entry_id] = self._clock()
+            return entry[1].snapshot()
+
+    def remove(self, entry_id: str, user_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if not entry or entry[0] != user_id:
+                return False
+            self._remove(entry_id)
+            return True
+
+    def watches(self, source_id: str) -> bool:
+        with self._lock:
+            self._expire()
+            return bool(self._by_source.get(source_id))
+
+    def update_source(self, user_id: str, source_id: str, alpha: float, beta: float) -> Dict[str, int]:
+        """
+        Push new parameters of a source row into every live diagram of the user bound to it.
+
+        Returns:
+            {entry_id: nodes re-evaluated}
+        """
+        with self._lock:
+            self._expire()
+            report = {}
+            for entry_id in self._by_source.get(source_id, set()):
+                owner, evaluator, leaf_sources = self._entries[entry_id]
+                if owner != user_id:
+                    continue
+                updates = {i: (alpha, beta) for i, s in enumerate(leaf_sources) if s == source_id}
+                report[entry_id] = evaluator.update_leaves(updates)
+            return report
+
+    def mark_stale(self, user_id: str, source_id: str) -> Dict[str, int]:
+        """
+        Flag the leaves bound to a source row that no longer has usable parameters.
+        They keep their last values, reported as stale until the row is fitted again.
+
+        Returns:
+            {entry_id: 0} for every live diagram of the user bound to the row
+        """
+        with self._lock:
+            self._expire()
+            report = {}
+            for entry_id in self._by_source.get(source_id, set()):
+                owner, evaluator, leaf_sources = self._entries[entry_id]
+                if owner != user_id:
+                    continue
+                evaluator.stale.update({i: source_id for i, s in enumerate(leaf_sources) if s == source_id})
+                report[entry_id] = 0
+            return report
+
+    def unbind_source(self, source_id: str):
+        """Detach a deleted source row; its leaves keep their last parameters and are reported stale"""
+        with self._lock:
+            for entry_id in self._by_source.pop(source_id, set()):
+                evaluator, leaf_sources = self._entries[entry_id][1:]
+                for i, s in enumerate(leaf_sources):
+                    if s == source_id:
+                        leaf_sources[i] = None
+                        evaluator.stale[i] = source_id
+
+    def _expire(self):
+        """Drop entries idle for longer than the TTL (oldest first, lock held)"""
+        deadline = self._clock() - self.ttl
+        while self._entries:
+            entry_id = next(iter(self._entries))
+            if self._last_used[entry_id] > deadline:
+                break
+            self._remove(entry_id)
+
+    def _remove(self, entry_id: str):
+        self._last_used.pop(entry_id, None)
+        entry = self._entries.pop(entry_id, None)
+        if entry:
+            for source_id in set(entry[2]):
+                entries = self._by_source.get(source_id)
+                if entries is not None:
+                    entries.discard(entry_id)
+                    if not entries:
+                        del self._by_source[source_id]
+
+
+# Shared registry for the API process
+rbd_registry = RBDRegistry()
+
+
+def component_parameters(component: Component) -> Tuple[float, float]:
+    """(alpha, beta) of a component: its stored MLE fit when current, else fitted (cached)"""
+    alpha, beta, _ = component_reliability(component)
+    return alpha, beta
+
+
+def _failure_item_fit(rows: List[FailureParameter]) -> Optional[Tuple[float, float]]:
+    """
+    (alpha, beta) from a failure item's parameter rows, in order of preference:
+    weibull_shape + weibull_scale, manual_hours (MLE), MT + SD (moments).
+    Returns None when the item has none of these.
+    """
+    values = {r.parameter_type: r.parameter_value for r in rows}
+    texts = {r.parameter_type: r.parameter_text for r in rows}
+
+    if values.get(SHAPE_PARAMETER) and values.get(SCALE_PARAMETER):
+        return values[SHAPE_PARAMETER], values[SCALE_PARAMETER]
+    if texts.get(MANUAL_HOURS_PARAMETER):
+        try:
+            hours = [float(h) for h in json.loads(texts[MANUAL_HOURS_PARAMETER])]
+        except (TypeError, ValueError):
+            hours = []
+        if hours:
+            return ReliabilityCalculator.calculate_from_manual_hours(hours)
+    if values.get(MEAN_TIME_PARAMETER) and values.get(STD_DEVIATION_PARAMETER):
+        return ReliabilityCalculator.calculate_from_mean_sd(values[MEAN_TIME_PARAMETER], values[STD_DEVIATION_PARAMETER])
+    return None
+
+
+def failure_item_parameters(db: Session, failure_item_id: str) -> Optional[Tuple[float, float]]:
+    """(alpha, beta) of a failure item from its parameters (see _failure_item_fit)"""
+    rows = db.query(FailureParameter).filter(FailureParameter.failure_item_id == failure_item_id).all()
+    return _failure_item_fit(rows)
+
+
+def source_parameters_bulk(db: Session, user_id: str, source_ids: Iterable[str]) -> Dict[str, Optional[Tuple[float, float]]]:
+    """
+    (alpha, beta) of many component / failure item rows owned by the user, with one
+    query per table. Unknown ids, or items without usable parameters, map to None.
+    """
+    source_ids = set(source_ids)
+    params: Dict[str, Optional[Tuple[float, float]]] = dict.fromkeys(source_ids)
+
+    components = db.query(Component).filter(Component.id.in_(source_ids), Component.user_id == user_id).all()
+    for component in components:
+        params[component.id] = component_parameters(component)
+
+    item_ids = [
+        r.id for r in db.query(FailureItem.id)
+        .filter(FailureItem.id.in_(source_ids - {c.id for c in components}), FailureItem.user_id == user_id)
+        .all()
+    ]
+    if item_ids:
+        rows_by_item = defaultdict(list)
+        for row in db.query(FailureParameter).filter(FailureParameter.failure_item_id.in_(item_ids)).all():
+            rows_by_item[row.failure_item_id].append(row)
+        for item_id in item_ids:
+            params[item_id] = _failure_item_fit(rows_by_item[item_id])
+    return params
+
+
+def source_versions(db: Session, user_id: str, source_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Fingerprint of the inputs of many component / failure item rows owned by the
+    user (updated_at plus the values the fit reads), without fitting anything.
+    Used to key stored results; unknown ids map to None.
+    """
+    source_ids = set(source_ids)
+    versions: Dict[str, Optional[str]] = dict.fromkeys(source_ids)
+
+    def digest(value) -> str:
+        return hashlib.sha256(json.dumps(value, default=str).encode("utf-8")).hexdigest()
+
+    components = db.query(
+        Component.id, Component.updated_at, Component.failure_hours, Component.failure_sd, Component.manual_hours
+    ).filter(Component.id.in_(source_ids), Component.user_id == user_id).all()
+    for c in components:
+        versions[c.id] = digest(["component", c.id, c.updated_at, c.failure_hours, c.failure_sd, c.manual_hours])
+
+    items = db.query(FailureItem.id, FailureItem.updated_at).filter(
+        FailureItem.id.in_(source_ids - {c.id for c in components}),
+        FailureItem.user_id == user_id
+    ).all()
+    if items:
+        rows_by_item = defaultdict(list)
+        for row in db.query(
+            FailureParameter.failure_item_id, FailureParameter.id, FailureParameter.updated_at,
+            FailureParameter.parameter_type, FailureParameter.parameter_value, FailureParameter.parameter_text
+        ).filter(FailureParameter.failure_item_id.in_([i.id for i in items])).all():
+            rows_by_item[row.failure_item_id].append(tuple(row[1:]))
+        for item in items:
+            versions[item.id] = digest(["fail_item", item.id, item.updated_at, sorted(rows_by_item[item.id])])
+    return versions
+
+
+def source_parameters(db: Session, user_id: str, source_id: str) -> Optional[Tuple[float, float]]:
+    """(alpha, beta) of a component or failure item row owned by the user"""
+    return source_parameters_bulk(db, user_id, [source_id])[source_id]
+
+
+def refresh_source(db: Session, user_id: str, source_id: str) -> Dict[str, int]:
+    """
+    Edit hook: refit a changed component / failure item and update the live
+    diagrams bound to it. A no-op when no live diagram watches the row; when the
+    row has no usable parameters left, its leaves are marked stale instead.
+
+    Returns:
+        {entry_id: nodes re-evaluated}
+    """
+    if not rbd_registry.watches(source_id):
+        return {}
+    params = source_parameters(db, user_id, source_id)
+    if params is None:
+        return rbd_registry.mark_stale(user_id, source_id)
+    return rbd_registry.update_source(user_id, source_id, *params)
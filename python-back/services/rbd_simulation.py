@@ -0,0 +1,213 @@
+"""
+Monte Carlo simulation of system time-to-failure
+Samples Weibull failure times for every leaf of a compiled RBD and reduces them
+through the gates (series = min, parallel = max) to get the system's
+time-to-failure distribution: MTTF, its variance, percentiles and R(t).
+
+Samples are generated in chunks of (leaves x chunk) so memory stays bounded for
+any sample count; chunks run in the shared process pool. Every chunk has its own
+child SeedSequence, so results depend only on the seed and the chunk size, not on
+the number of workers.
+"""
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.fleet_refit import FLEET_REFIT_WORKERS, get_executor
+from services.rbd_engine import CompiledRBD
+
+# Max float64 node values per chunk (n_nodes x chunk_size), about 32 MB
+SIMULATION_CHUNK_ELEMENTS = int(os.getenv("SIMULATION_CHUNK_ELEMENTS", 4_000_000))
+# Log-spaced histogram bins used for percentiles
+SIMULATION_HISTOGRAM_BINS = 16384
+# Leaf quantiles bounding the histogram range
+_HISTOGRAM_TAIL = 1e-12
+
+DEFAULT_PERCENTILES = (1.0, 5.0, 10.0, 50.0, 90.0, 95.0, 99.0)
+# Bits of a drawn root seed, so it survives a JSON round trip through a float64
+# (JavaScript Number.MAX_SAFE_INTEGER is 2**53 - 1)
+SEED_BITS = 52
+
+
+def chunk_sizes(n_samples: int, n_nodes: int, chunk_elements: int = SIMULATION_CHUNK_ELEMENTS) -> List[int]:
+    """Split n_samples into chunks of at most chunk_elements // n_nodes samples"""
+    size = max(1024, chunk_elements // max(n_nodes, 1))
+    sizes = [size] * (n_samples // size)
+    if n_samples % size:
+        sizes.append(n_samples % size)
+    return sizes
+
+
+def histogram_range(alphas: np.ndarray, betas: np.ndarray) -> tuple:
+    """ln(t) range covering every leaf's failure time except the 1e-12 tails"""
+    lo = np.min(betas * (-np.log1p(-_HISTOGRAM_TAIL)) ** (1.0 / alphas))
+    hi = np.max(betas * (-np.log(_HISTOGRAM_TAIL)) ** (1.0 / alphas))
+    return float(np.log(lo)), float(np.log(hi))
+
+
+def simulate_chunk(
+    rbd: CompiledRBD,
+    alphas: np.ndarray,
+    betas: np.ndarray,
+    n: int,
+    seed: np.random.SeedSequence,
+    log_range: tuple,
+    times: np.ndarray
+) -> Dict:
+    """
+    Simulate one chunk (runs inside a worker process).
+
+    Returns:
+        Dict with the chunk's count, mean, sum of squared deviations (m2),
+        histogram of ln(T) (with underflow/overflow bins), min, max and the
+        number of systems still working at each of times
+    """
+    rng = np.random.default_rng(seed)
+    leaf_times = rng.standard_exponential((len(alphas), n))
+    np.power(leaf_times, (1.0 / alphas)[:, None], out=leaf_times)
+    leaf_times *= betas[:, None]
+
+    system = rbd.system_failure_times(leaf_times)
+    del leaf_times
+
+    mean = system.mean()
+    lo, hi = log_range
+    width = (hi - lo) / SIMULATION_HISTOGRAM_BINS
+    bins = np.floor((np.log(system) - lo) / width)
+    np.clip(bins, -1, SIMULATION_HISTOGRAM_BINS, out=bins)
+    sorted_system = np.sort(system)
+
+    return {
+        "n": n,
+        "mean": float(mean),
+        "m2": float(np.sum((system - mean) ** 2)),
+        "histogram": np.bincount(bins.astype(np.int64) + 1, minlength=SIMULATION_HISTOGRAM_BINS + 2),
+        "min": float(sorted_system[0]),
+        "max": float(sorted_system[-1]),
+        "survivors": n - np.searchsorted(sorted_system, times, side="right"),
+    }
+
+
+def _histogram_percentiles(
+    histogram: np.ndarray,
+    n: int,
+    percentiles: Sequence[float],
+    log_range: tuple,
+    t_min: float,
+    t_max: float
+) -> List[float]:
+    """Percentiles from the merged ln(T) histogram, log-linear within a bin"""
+    lo, hi = log_range
+    width = (hi - lo) / SIMULATION_HISTOGRAM_BINS
+    # Bin i (0 = underflow) covers [lo + (i - 1) * width, lo + i * width)
+    upper = np.cumsum(histogram)
+    values = []
+    for p in percentiles:
+        rank = p / 100.0 * n
+        i = int(np.searchsorted(upper, rank, side="left"))
+        i = min(i, len(histogram) - 1)
+        if i == 0:
+            values.append(t_min)
+            continue
+        if i == len(histogram) - 1:
+            values.append(t_max)
+            continue
+        below = upper[i - 1]
+        fraction = (rank - below) / histogram[i] if histogram[i] else 0.0
+        value = float(np.exp(lo + (i - 1 + fraction) * width))
+        values.append(min(max(value, t_min), t_max))
+    return values
+
+
+def simulate_system(
+    rbd: CompiledRBD,
+    alphas: np.ndarray,
+    betas: np.ndarray,
+    n_samples: int,
+    seed: Optional[int] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    times: Optional[Sequence[float]] = None,
+    chunk_elements: int = SIMULATION_CHUNK_ELEMENTS,
+    executor: Optional[ProcessPoolExecutor] = None
+) -> Dict:
+    """
+    Monte Carlo distribution of system time-to-failure.
+
+    Args:
+        rbd: Compiled diagram
+        alphas, betas: Weibull parameters of each leaf column
+        n_samples: Number of simulated systems
+        seed: Root seed (a random SEED_BITS one is drawn and reported when None)
+        percentiles: Percentiles (0-100) of the time-to-failure to report
+        times: Optional time points for the empirical R(t)
+        chunk_elements: Memory budget per chunk in float64 node values
+        executor: Process pool (default: the shared pool; a single chunk runs inline)
+
+    Returns:
+        Dict with mttf, variance, std_deviation, mttf_std_error, percentiles,
+        reliability (at times), min, max, seed, chunks and seconds
+    """
+    start = time.perf_counter()
+    alphas = np.asarray(alphas, dtype=np.float64)
+    betas = np.asarray(betas, dtype=np.float64)
+    times = np.asarray(times if times is not None else [], dtype=np.float64)
+    if n_samples < 2:
+        raise ValueError("n_samples must be at least 2")
+
+    if seed is None:
+        seed = secrets.randbits(SEED_BITS)
+    root = np.random.SeedSequence(seed)
+    sizes = chunk_sizes(n_samples, rbd.n_nodes, chunk_elements)
+    seeds = root.spawn(len(sizes))
+    log_range = histogram_range(alphas, betas)
+
+    if len(sizes) == 1:
+        results = [simulate_chunk(rbd, alphas, betas, sizes[0], seeds[0], log_range, times)]
+    else:
+        pool = executor or get_executor()
+        futures = [
+            pool.submit(simulate_chunk, rbd, alphas, betas, n, s, log_range, times)
+            for n, s in zip(sizes, seeds)
+        ]
+        results = [future.result() for future in futures]
+
+    # Merge in chunk order (Chan et al. pairwise update of mean and m2)
+    n, mean, m2 = 0, 0.0, 0.0
+    histogram = np.zeros(SIMULATION_HISTOGRAM_BINS + 2, dtype=np.int64)
+    survivors = np.zeros(len(times), dtype=np.int64)
+    for r in results:
+        total = n + r["n"]
+        delta = r["mean"] - mean
+        mean += delta * r["n"] / total
+        m2 += r["m2"] + delta ** 2 * n * r["n"] / total
+        n = total
+        histogram += r["histogram"]
+        survivors += r["survivors"]
+
+    t_min = min(r["min"] for r in results)
+    t_max = max(r["max"] for r in results)
+    variance = m2 / (n - 1)
+
+    return {
+        "n_samples": n,
+        "mttf": mean,
+        "variance": variance,
+        "std_deviation": float(np.sqrt(variance)),
+        "mttf_std_error": float(np.sqrt(variance / n)),
+        "percentiles": dict(zip(
+            [float(p) for p in percentiles],
+            _histogram_percentiles(histogram, n, percentiles, log_range, t_min, t_max)
+        )),
+        "times": times.tolist(),
+        "reliability": (survivors / n).tolist(),
+        "min": t_min,
+        "max": t_max,
+        "seed": seed,
+        "chunks": len(sizes),
+        "workers": 1 if len(sizes) == 1 else (FLEET_REFIT_WORKERS if executor is None else None),
+        "seconds": time.perf_counter() - start,
+    }
@@ -0,0 +1,152 @@
+"""
+Fitted-parameter cache
+LRU cache in front of ReliabilityCalculator.calculate_standard_reliability, keyed by
+a stable SHA-256 fingerprint of the fitting method and its inputs.
+The key is the content itself, so an edited row simply misses and the stale entry
+ages out of the LRU; no invalidation is needed.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.reliability_calculator import ReliabilityCalculator
+
+RELIABILITY_CACHE_SIZE = int(os.getenv("RELIABILITY_CACHE_SIZE", 4096))
+
+
+def _normalize(value):
+    """Make inputs hash the same regardless of int/float/numpy types"""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return [float(v) for v in value]
+    return float(value)
+
+
+class ReliabilityCache:
+    """Thread-safe LRU cache of fitted (alpha, beta, reliability) tuples"""
+
+    def __init__(self, maxsize: int = RELIABILITY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(method: str, **inputs) -> str:
+        """Stable hash of the method name plus its (normalized) inputs"""
+        payload = {"method": method}
+        payload.update({k: _normalize(v) for k, v in inputs.items()})
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Tuple]) -> Tuple:
+        """Return the cached value for key, computing and storing it on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Compute outside the lock; a concurrent miss on the same key just recomputes
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Shared cache instance for the API process
+reliability_cache = ReliabilityCache()
+
+
+def cached_standard_reliability(
+    mean_time: Optional[float] = None,
+    std_deviation: Optional[float] = None,
+    manual_hours: Optional[List[float]] = None,
+    time: float = 1.0
+) -> Tuple[float, float, float]:
+    """
+    Cached ReliabilityCalculator.calculate_standard_reliability
+
+    The fingerprint only includes the inputs of the method that will actually be
+    used, so e.g. a changed SD does not miss when manual hours drive the fit.
+
+    Args:
+        mean_time, std_deviation, manual_hours, time: As calculate_standard_reliability
+
+    Returns:
+        Tuple of (alpha, beta, reliability)
+    """
+    if manual_hours and len(manual_hours) > 0:
+        key = ReliabilityCache.fingerprint("mle", manual_hours=manual_hours, time=time)
+    elif mean_time is not None and std_deviation is not None and std_deviation > 0:
+        key = ReliabilityCache.fingerprint("mean_sd", mean_time=mean_time, std_deviation=std_deviation, time=time)
+    else:
+        key = ReliabilityCache.fingerprint("default", mean_time=mean_time, time=time)
+
+    return reliability_cache.get_or_compute(
+        key,
+        lambda: ReliabilityCalculator.calculate_standard_reliability(
+            mean_time=mean_time,
+            std_deviation=std_deviation,
+            manual_hours=manual_hours,
+            time=time
+        )
+    )
+
+
+def stored_fit(component) -> Optional[Tuple[float, float]]:
+    """
+    (fit_alpha, fit_beta) of a component row when its stored MLE state is current,
+    i.e. was fitted from all of its manual_hours (fit_count == len(manual_hours)).
+    None when the row has no stored fit or it is stale.
+    """
+    hours = component.manual_hours
+    if hours and component.fit_count == len(hours) and component.fit_alpha and component.fit_beta:
+        return component.fit_alpha, component.fit_beta
+    return None
+
+
+def component_reliability(component, time: float = 1.0) -> Tuple[float, float, float]:
+    """
+    (alpha, beta, reliability) of a component row: the stored MLE state when it is
+    current, otherwise cached_standard_reliability on the row's inputs (manual
+    hours, or mean time with the aggregated failure_sd for the moment fit).
+    """
+    fit = stored_fit(component)
+    if fit is not None:
+        return fit[0], fit[1], ReliabilityCalculator.calculate_reliability(fit[0], fit[1], time)
+    return cached_standard_reliability(
+        mean_time=component.failure_hours,
+        std_deviation=component.failure_sd,
+        manual_hours=component.manual_hours,
+        time=time
+    )
@@ -1,13 +1,512 @@
 """
 Reliability Calculation Service
-Implements two methods for calculating Weibull parameters and reliability:
+Implements three methods for calculating Weibull parameters and reliability:
 1. Default Method: Using Mean Time (MT) and Standard Deviation (SD)
 2. Manual Method: Using Maximum Likelihood Estimation (MLE) from manual failure hours
+3. Three-parameter MLE: Manual Method with a fitted location (gamma)
 """
+import os
 import numpy as np
-from scipy.optimize import minimize, fsolve
+from scipy.optimize import minimize, minimize_scalar
 import scipy.special as sp_special
-from typing import List, Tuple, Optional
+from scipy.stats import norm
+from typing import Dict, List, Tuple, Optional
+
+# Bracket for the inverse shape x = 1/alpha used by the vectorized moment solver.
+# alpha ranges from 1e8 (almost deterministic) down to 0.02 (extremely dispersed).
+_INV_SHAPE_MIN = 1e-8
+_INV_SHAPE_MAX = 50.0
+
+
+def _log_cv2_gap(inv_shape: np.ndarray, log1p_cv2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Residual and derivative of the Weibull CV equation in terms of x = 1/alpha:
+
+    g(x) = ln Gamma(1 + 2x) - 2 ln Gamma(1 + x) - ln(1 + CV^2)
+    g'(x) = 2 * [digamma(1 + 2x) - digamma(1 + x)]
+    """
+    g = sp_special.gammaln(1 + 2 * inv_shape) - 2 * sp_special.gammaln(1 + inv_shape) - log1p_cv2
+    dg = 2 * (sp_special.digamma(1 + 2 * inv_shape) - sp_special.digamma(1 + inv_shape))
+    return g, dg
+
+
+def _solve_inv_shape_from_cv(
+    log1p_cv2: np.ndarray,
+    inv_shape: Optional[np.ndarray] = None,
+    max_iter: int = 60,
+    tol: float = 1e-12
+) -> np.ndarray:
+    """
+    Solve g(x) = 0 for every element at once with a bracketed Newton iteration.
+
+    g is strictly increasing in x, so each element keeps its own [lo, hi] bracket
+    and falls back to bisection whenever a Newton step leaves it.
+    """
+    lo = np.full(log1p_cv2.shape, _INV_SHAPE_MIN)
+    hi = np.full(log1p_cv2.shape, _INV_SHAPE_MAX)
+    if inv_shape is None:
+        # CV ~ 1/alpha for large alpha, CV = 1 at alpha = 1
+        inv_shape = np.sqrt(np.expm1(log1p_cv2))
+    x = np.clip(inv_shape, lo, hi)
+
+    for _ in range(max_iter):
+        g, dg = _log_cv2_gap(x, log1p_cv2)
+        lo = np.where(g < 0, x, lo)
+        hi = np.where(g > 0, x, hi)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_new = x - g / dg
+        outside = ~np.isfinite(x_new) | (x_new < lo) | (x_new > hi)
+        x_new = np.where(outside, 0.5 * (lo + hi), x_new)
+
+        if np.all(np.abs(x_new - x) <= tol * x):
+            return x_new
+        x = x_new
+
+    return x
+
+
+# ============= CV -> shape lookup table =============
+
+# Optional .npz path to persist the table between processes (built in-memory if unset)
+CV_SHAPE_TABLE_PATH = os.getenv("WEIBULL_CV_TABLE_PATH")
+_CV_SHAPE_TABLE_SIZE = 4096
+_CV_SHAPE_TABLE: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+
+def _build_cv_shape_table() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tabulate ln(ln(1 + CV^2)) against ln(1/alpha) over the solver bracket.
+
+    Both axes are close to linear in each other (CV^2 ~ 1.645/alpha^2 for large
+    alpha), so linear interpolation already gives a guess within ~1e-6.
+    """
+    log_inv_shape = np.linspace(np.log(_INV_SHAPE_MIN), np.log(_INV_SHAPE_MAX), _CV_SHAPE_TABLE_SIZE)
+    inv_shape = np.exp(log_inv_shape)
+    log1p_cv2 = sp_special.gammaln(1 + 2 * inv_shape) - 2 * sp_special.gammaln(1 + inv_shape)
+    return np.log(log1p_cv2), log_inv_shape
+
+
+def get_cv_shape_table() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the (ln ln(1 + CV^2), ln(1/alpha)) table, building it on first use.
+
+    If WEIBULL_CV_TABLE_PATH is set the table is loaded from that file, or
+    written there after it is built.
+    """
+    global _CV_SHAPE_TABLE
+    if _CV_SHAPE_TABLE is not None:
+        return _CV_SHAPE_TABLE
+
+    table = None
+    if CV_SHAPE_TABLE_PATH and os.path.exists(CV_SHAPE_TABLE_PATH):
+        try:
+            with np.load(CV_SHAPE_TABLE_PATH) as data:
+                table = (data["log_log1p_cv2"], data["log_inv_shape"])
+        except Exception as e:
+            print(f"Error loading CV table from {CV_SHAPE_TABLE_PATH}: {e}")
+
+    if table is None:
+        table = _build_cv_shape_table()
+        if CV_SHAPE_TABLE_PATH:
+            try:
+                np.savez(CV_SHAPE_TABLE_PATH, log_log1p_cv2=table[0], log_inv_shape=table[1])
+            except OSError as e:
+                print(f"Error saving CV table to {CV_SHAPE_TABLE_PATH}: {e}")
+
+    _CV_SHAPE_TABLE = table
+    return table
+
+
+def _inv_shape_from_cv(log1p_cv2: np.ndarray, newton_steps: int = 2) -> np.ndarray:
+    """
+    Interpolate 1/alpha from the CV table and polish with a few Newton steps.
+
+    Values outside the tabulated range are handed to the bracketed solver.
+    """
+    log_log1p_cv2, log_inv_shape = get_cv_shape_table()
+    log1p_cv2 = np.asarray(log1p_cv2, dtype=np.float64)
+
+    with np.errstate(divide='ignore'):
+        query = np.log(log1p_cv2)
+    in_range = (query >= log_log1p_cv2[0]) & (query <= log_log1p_cv2[-1])
+    x = np.exp(np.interp(query, log_log1p_cv2, log_inv_shape))
+
+    if not np.all(in_range):
+        return _solve_inv_shape_from_cv(log1p_cv2, inv_shape=x)
+
+    for _ in range(newton_steps):
+        g, dg = _log_cv2_gap(x, log1p_cv2)
+        x = x - g / dg
+
+    return x
+
+
+# ============= Profile-likelihood MLE =============
+
+# Shape bounds for the MLE, matching the L-BFGS-B bounds (alpha >= 0.1)
+_MLE_SHAPE_MIN = 0.1
+_MLE_SHAPE_MAX = 1.0 / _INV_SHAPE_MIN
+MLE_METHODS = ("profile", "lbfgsb")
+
+
+def _profile_score(alpha: float, log_ts: np.ndarray, mean_log: float) -> Tuple[float, float, float]:
+    """
+    Profile score h(alpha) of the two-parameter Weibull and its first two derivatives.
+
+    With beta eliminated (beta^alpha = mean(t^alpha)) the likelihood equation is
+    h(alpha) = E_w[ln t] - 1/alpha - mean(ln t) = 0, where E_w weights each ln t by
+    t^alpha. The weights are formed as exp(alpha * (ln t - max ln t)) so they stay
+    in (0, 1] and never overflow.
+    - h'(alpha)  = Var_w[ln t] + 1/alpha^2           (> 0, unique root)
+    - h''(alpha) = E_w[(ln t - E_w[ln t])^3] - 2/alpha^3
+    """
+    w = np.exp(alpha * (log_ts - log_ts.max()))
+    w /= w.sum()
+    mu = np.dot(w, log_ts)
+    d = log_ts - mu
+    var = np.dot(w, d * d)
+    skew = np.dot(w, d * d * d)
+    h = mu - 1.0 / alpha - mean_log
+    return h, var + 1.0 / alpha ** 2, skew - 2.0 / alpha ** 3
+
+
+def _profile_scale(alpha: float, log_ts: np.ndarray) -> float:
+    """ln(beta) = (1/alpha) * ln(mean(t^alpha)), evaluated in log-space"""
+    m = log_ts.max()
+    return m + np.log(np.mean(np.exp(alpha * (log_ts - m)))) / alpha
+
+
+def _weibull_profile_mle(
+    failure_hours: np.ndarray,
+    alpha0: Optional[float] = None,
+    max_iter: int = 50,
+    tol: float = 1e-10,
+    mean_log: Optional[float] = None
+) -> Tuple[float, float, int]:
+    """
+    Two-parameter Weibull MLE by Halley iteration on the profile score.
+
+    Args:
+        failure_hours: Positive failure times
+        alpha0: Starting shape (default: Menon's estimate 1.28 / SD(ln t))
+        max_iter: Maximum number of Halley steps
+        tol: Relative tolerance on alpha
+        mean_log: Precomputed mean(ln t), e.g. from stored sufficient statistics
+
+    Returns:
+        Tuple of (alpha, beta, iterations)
+
+    Raises:
+        ValueError: if the sample is not positive or has no spread (no finite MLE)
+    """
+    ts = np.asarray(failure_hours, dtype=np.float64)
+    if ts.size < 2 or np.any(~np.isfinite(ts)) or np.any(ts <= 0):
+        raise ValueError("profile MLE needs at least two positive, finite failure hours")
+
+    log_ts = np.log(ts)
+    if mean_log is None:
+        mean_log = log_ts.mean()
+    sd_log = log_ts.std()
+    if sd_log == 0:
+        raise ValueError("profile MLE is undefined when all failure hours are equal")
+
+    alpha = alpha0 if alpha0 and alpha0 > 0 else 1.2825 / sd_log
+    alpha = min(max(alpha, _MLE_SHAPE_MIN), _MLE_SHAPE_MAX)
+
+    for iteration in range(1, max_iter + 1):
+        h, dh, d2h = _profile_score(alpha, log_ts, mean_log)
+        if alpha <= _MLE_SHAPE_MIN and h > 0:
+            # Root lies below the lower bound: constrained MLE sits on the bound
+            break
+
+        step = 2 * h * dh / (2 * dh * dh - h * d2h)
+        if not np.isfinite(step) or abs(step) > 0.9 * alpha:
+            # Halley overshoot: fall back to a damped Newton step
+            step = np.clip(h / dh, -0.5 * alpha, 4.0 * alpha)
+        alpha_new = min(max(alpha - step, _MLE_SHAPE_MIN), _MLE_SHAPE_MAX)
+
+        converged = abs(alpha_new - alpha) <= tol * alpha
+        alpha = alpha_new
+        if converged:
+            break
+
+    beta = float(np.exp(_profile_scale(alpha, log_ts)))
+    return float(alpha), beta, iteration
+
+
+# ============= Batched profile MLE over ragged samples =============
+
+def pack_ragged(samples: List[List[float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pack ragged samples into one flat float64 buffer.
+
+    Returns:
+        Tuple of (flat values, segment offsets, segment lengths)
+    """
+    lengths = np.fromiter((len(x) for x in samples), dtype=np.int64, count=len(samples))
+    offsets = np.zeros(len(samples), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    flat = np.concatenate([np.asarray(x, dtype=np.float64) for x in samples]) if len(samples) else np.empty(0)
+    return flat, offsets, lengths
+
+
+def _weibull_profile_mle_packed(
+    flat: np.ndarray,
+    offsets: np.ndarray,
+    lengths: np.ndarray,
+    alpha0: Optional[np.ndarray] = None,
+    max_iter: int = 50,
+    tol: float = 1e-10
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized _weibull_profile_mle for every segment of a packed buffer at once.
+
+    All per-sample sums are np.add.reduceat segment reductions over the flat
+    buffer, so each Halley step costs a handful of passes over the data no
+    matter how many samples there are. Segments must be non-empty.
+
+    Returns:
+        Tuple of (alpha array, beta array, valid mask). Invalid segments (fewer
+        than two values, non-positive values, or no spread) are left as NaN.
+    """
+    n_seg = len(lengths)
+    alpha = np.full(n_seg, np.nan)
+    beta = np.full(n_seg, np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_ts = np.log(flat)
+    finite = np.add.reduceat(np.isfinite(log_ts), offsets) == lengths
+    log_ts = np.where(np.isfinite(log_ts), log_ts, 0.0)
+
+    mean_log = np.add.reduceat(log_ts, offsets) / lengths
+    dev = log_ts - np.repeat(mean_log, lengths)
+    sd_log = np.sqrt(np.add.reduceat(dev * dev, offsets) / lengths)
+    max_log = np.maximum.reduceat(log_ts, offsets)
+
+    valid = finite & (lengths >= 2) & (sd_log > 0)
+    if not np.any(valid):
+        return alpha, beta, valid
+
+    a = 1.2825 / np.where(valid, sd_log, 1.0)
+    if alpha0 is not None:
+        a = np.where(np.isfinite(alpha0) & (alpha0 > 0), alpha0, a)
+    a = np.clip(a, _MLE_SHAPE_MIN, _MLE_SHAPE_MAX)
+    active = valid.copy()
+    shifted = log_ts - np.repeat(max_log, lengths)
+
+    for _ in range(max_iter):
+        w = np.exp(np.repeat(a, lengths) * shifted)
+        s0 = np.add.reduceat(w, offsets)
+        mu = np.add.reduceat(w * log_ts, offsets) / s0
+        d = log_ts - np.repeat(mu, lengths)
+        wd2 = w * d * d
+        var = np.add.reduceat(wd2, offsets) / s0
+        skew = np.add.reduceat(wd2 * d, offsets) / s0
+
+        h = mu - 1.0 / a - mean_log
+        dh = var + 1.0 / a ** 2
+        d2h = skew - 2.0 / a ** 3
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = 2 * h * dh / (2 * dh * dh - h * d2h)
+        damped = ~np.isfinite(step) | (np.abs(step) > 0.9 * a)
+        step = np.where(damped, np.clip(h / dh, -0.5 * a, 4.0 * a), step)
+        # Root below the lower bound: constrained MLE sits on the bound
+        step = np.where((a <= _MLE_SHAPE_MIN) & (h > 0), 0.0, step)
+
+        a_new = np.where(active, np.clip(a - step, _MLE_SHAPE_MIN, _MLE_SHAPE_MAX), a)
+        active &= np.abs(a_new - a) > tol * a
+        a = a_new
+        if not np.any(active):
+            break
+
+    w = np.exp(np.repeat(a, lengths) * shifted)
+    log_beta = max_log + np.log(np.add.reduceat(w, offsets) / lengths) / a
+
+    alpha[valid] = a[valid]
+    beta[valid] = np.exp(log_beta[valid])
+    return alpha, beta, valid
+
+
+# ============= Three-parameter Weibull =============
+
+def _weibull_max_log_likelihood(alpha: float, beta: float, xs: np.ndarray) -> float:
+    """
+    Two-parameter log-likelihood at its MLE, where sum((x/beta)^alpha) = n:
+    L = n*ln(alpha) - n*alpha*ln(beta) + (alpha-1)*sum(ln x) - n
+    """
+    n = len(xs)
+    return n * np.log(alpha) - n * alpha * np.log(beta) + (alpha - 1) * np.sum(np.log(xs)) - n
+
+
+def _weibull_three_parameter_mle(
+    failure_hours: np.ndarray,
+    grid_size: int = 32,
+    xatol: float = 1e-8
+) -> Tuple[float, float, float, int]:
+    """
+    Three-parameter Weibull MLE by a bracketed 1-D search over the location.
+
+    The profile likelihood L(gamma) can have several local maxima, so it is first
+    scanned on a coarse grid of gamma whose gap to min(t) shrinks geometrically
+    (the interesting region is close to min(t)). Bounded Brent then refines
+    inside the bracket around the best local maximum of the grid. Every
+    evaluation is a two-parameter profile MLE on t - gamma, warm-started from
+    the previous shape.
+
+    Singularity: when the fitted shape is below 1 the likelihood grows without
+    bound as gamma -> min(t), so the "best" point there is an artefact of how
+    close to min(t) the search is allowed to go (min_gap), not an estimate. The
+    grid point next to min(t) is therefore never a candidate, and a Brent
+    result that runs into it is discarded. The estimate is the best interior
+    local maximum, or gamma = 0 (the two-parameter fit) when there is none.
+
+    Returns:
+        Tuple of (alpha, beta, gamma, likelihood evaluations)
+    """
+    ts = np.sort(np.asarray(failure_hours, dtype=np.float64))
+    if ts.size < 3 or ts[0] <= 0:
+        raise ValueError("three-parameter MLE needs at least three positive failure hours")
+
+    t_min = ts[0]
+    # Keep the smallest shifted time away from 0 (ln(t - gamma) -> -inf)
+    min_gap = max(1e-9 * t_min, 1e-6 * (ts[-1] - t_min))
+    state = {"alpha": None, "evals": 0}
+
+    def negative_profile(gamma: float) -> float:
+        xs = ts - gamma
+        alpha, beta, _ = _weibull_profile_mle(xs, alpha0=state["alpha"])
+        state["alpha"] = alpha
+        state["evals"] += 1
+        return -_weibull_max_log_likelihood(alpha, beta, xs)
+
+    gaps = np.geomspace(t_min, min_gap, grid_size)
+    grid = t_min - gaps
+    grid[0] = 0.0
+    values = np.array([negative_profile(g) for g in grid])
+
+    # Local maxima of L on the grid, gamma = 0 included, the singular end excluded
+    last = grid_size - 1
+    candidates = [
+        k for k in range(last)
+        if (k == 0 or values[k] <= values[k - 1]) and values[k] <= values[k + 1]
+    ]
+    if not candidates:
+        gamma = 0.0
+    else:
+        k = min(candidates, key=lambda i: values[i])
+        gamma, best = grid[k], values[k]
+        lo, hi = grid[max(k - 1, 0)], grid[k + 1]
+        result = minimize_scalar(
+            negative_profile,
+            bounds=(lo, hi),
+            method="bounded",
+            options={"xatol": xatol * t_min}
+        )
+        at_singular_end = k + 1 == last and result.x >= hi - xatol * t_min
+        if result.fun < best and not at_singular_end:
+            gamma = float(result.x)
+
+    alpha, beta, _ = _weibull_profile_mle(ts - gamma)
+    return alpha, beta, float(gamma), state["evals"]
+
+
+# ============= Confidence bounds =============
+
+CONFIDENCE_METHODS = ("auto", "bootstrap", "fisher")
+# "auto" switches from the bootstrap to the Fisher-matrix bounds at this sample size
+FISHER_MIN_SAMPLES = 50
+# Smallest sample the bootstrap is run on: with fewer (distinct) values most
+# resamples repeat one value or the original data, and the bounds collapse
+BOOTSTRAP_MIN_SAMPLES = 5
+BOOTSTRAP_MIN_DISTINCT = 3
+# Largest share of resamples without a finite MLE before the bootstrap is rejected
+BOOTSTRAP_MAX_DISCARDED = 0.05
+
+
+def _bound(estimate: float, lower: float, upper: float) -> Dict[str, float]:
+    return {"estimate": float(estimate), "lower": float(lower), "upper": float(upper)}
+
+
+def _bootstrap_bounds(
+    ts: np.ndarray,
+    alpha: float,
+    mission_time: float,
+    confidence: float,
+    n_bootstrap: int,
+    rng: np.random.Generator
+) -> Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float], int]:
+    """
+    Percentile bootstrap: all resamples are drawn as one (B x n) index matrix and
+    fitted in a single packed profile-MLE pass, warm-started from the point fit.
+    Resamples without a finite MLE (all values equal) are dropped; more than
+    BOOTSTRAP_MAX_DISCARDED of them is an error, since the remaining ones
+    understate the spread.
+    """
+    n = len(ts)
+    idx = rng.integers(0, n, size=(n_bootstrap, n))
+    flat = ts[idx].ravel()
+    offsets = np.arange(n_bootstrap, dtype=np.int64) * n
+    lengths = np.full(n_bootstrap, n, dtype=np.int64)
+
+    alphas, betas, valid = _weibull_profile_mle_packed(flat, offsets, lengths, alpha0=np.full(n_bootstrap, alpha))
+    # A constant resample "converges" to the shape bound instead of failing
+    valid &= np.ptp(flat.reshape(n_bootstrap, n), axis=1) > 0
+    alphas, betas = alphas[valid], betas[valid]
+    discarded = 1.0 - alphas.size / n_bootstrap
+    if discarded > BOOTSTRAP_MAX_DISCARDED:
+        raise ValueError(
+            f"{discarded:.0%} of the bootstrap resamples have no finite MLE; "
+            "use the Fisher-matrix bounds or more distinct failure hours"
+        )
+    reliability = np.exp(-np.exp(alphas * (np.log(mission_time) - np.log(betas))))
+
+    q = [50 * (1 - confidence), 50 * (1 + confidence)]
+    a_lo, a_hi = np.percentile(alphas, q)
+    b_lo, b_hi = np.percentile(betas, q)
+    r_lo, r_hi = np.percentile(reliability, q)
+    return (a_lo, a_hi), (b_lo, b_hi), (r_lo, r_hi), int(alphas.size)
+
+
+def _fisher_bounds(
+    ts: np.ndarray,
+    alpha: float,
+    beta: float,
+    mission_time: float,
+    confidence: float
+) -> Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float]]:
+    """
+    Fisher-matrix bounds from the observed information at the MLE.
+
+    With z = (t/beta)^alpha and l = ln(t/beta), and sum(z) = n at the MLE:
+    - I_aa = n/alpha^2 + sum(z * l^2)
+    - I_bb = n * alpha^2 / beta^2
+    - I_ab = -(alpha/beta) * sum(z * l)
+    alpha and beta bounds are Wald bounds on the log scale; R(t) bounds use the
+    delta method on u = ln(-ln R) = alpha * (ln t - ln beta).
+    """
+    n = len(ts)
+    l = np.log(ts) - np.log(beta)
+    z = np.exp(alpha * l)
+    info = np.array([
+        [n / alpha ** 2 + np.sum(z * l * l), -(alpha / beta) * np.sum(z * l)],
+        [-(alpha / beta) * np.sum(z * l), n * alpha ** 2 / beta ** 2],
+    ])
+    cov = np.linalg.inv(info)
+    k = norm.ppf(0.5 * (1 + confidence))
+
+    se_log_alpha = np.sqrt(cov[0, 0]) / alpha
+    se_log_beta = np.sqrt(cov[1, 1]) / beta
+    u = alpha * (np.log(mission_time) - np.log(beta))
+    grad = np.array([np.log(mission_time) - np.log(beta), -alpha / beta])
+    se_u = np.sqrt(grad @ cov @ grad)
+
+    alpha_bounds = (alpha * np.exp(-k * se_log_alpha), alpha * np.exp(k * se_log_alpha))
+    beta_bounds = (beta * np.exp(-k * se_log_beta), beta * np.exp(k * se_log_beta))
+    # R decreases in u, so the upper u bound gives the lower R bound
+    reliability_bounds = (np.exp(-np.exp(u + k * se_u)), np.exp(-np.exp(u - k * se_u)))
+    return alpha_bounds, beta_bounds, reliability_bounds
 
 
 class ReliabilityCalculator:
@@ -22,6 +521,9 @@ class ReliabilityCalculator:
         - mean = beta * Gamma(1 + 1/alpha)
         - variance = beta^2 * [Gamma(1 + 2/alpha) - Gamma(1 + 1/alpha)^2]
 
+        The shape is looked up from the precomputed CV table and refined with
+        two Newton steps instead of a 2-D fsolve.
+
         Args:
             mean_time: Mean Time Between Failures (MTBF)
             std_deviation: Standard Deviation
@@ -29,22 +531,19 @@ class ReliabilityCalculator:
         Returns:
             Tuple of (alpha/shape, beta/scale) parameters
         """
-        variance = std_deviation ** 2
-
-        def equations(vars):
-            alpha, beta = vars
-            # Equation 1: mean = beta * Gamma(1 + 1/alpha)
-            eq1 = beta * sp_special.gamma(1 + 1/alpha) - mean_time
-            # Equation 2: variance = beta^2 * [Gamma(1 + 2/alpha) - Gamma(1 + 1/alpha)^2]
-            eq2 = (beta ** 2) * (sp_special.gamma(1 + 2/alpha) - (sp_special.gamma(1 + 1/alpha)) ** 2) - variance
-            return [eq1, eq2]
+        try:
+            if not (mean_time > 0 and std_deviation > 0):
+                raise ValueError(f"MT and SD must be positive (MT={mean_time}, SD={std_deviation})")
 
-        # Initial guess
-        initial_guess = [2.0, mean_time]
+            # Shape from the coefficient of variation (table guess + Newton),
+            # then scale in closed form: beta = mean / Gamma(1 + 1/alpha)
+            log1p_cv2 = np.log1p((std_deviation / mean_time) ** 2)
+            inv_shape = float(_inv_shape_from_cv(log1p_cv2))
+            alpha = 1.0 / inv_shape
+            beta = float(mean_time * np.exp(-sp_special.gammaln(1 + inv_shape)))
 
-        try:
-            solution = fsolve(equations, initial_guess)
-            alpha, beta = solution
+            if not (np.isfinite(alpha) and np.isfinite(beta)):
+                raise ValueError(f"no Weibull solution for MT={mean_time}, SD={std_deviation}")
 
             # Ensure positive values
             alpha = max(0.1, abs(alpha))
@@ -57,7 +556,55 @@ class ReliabilityCalculator:
             return 1.0, mean_time
 
     @staticmethod
-    def calculate_from_manual_hours(failure_hours: List[float]) -> Tuple[float, float]:
+    def calculate_from_mean_sd_batch(
+        mean_times: np.ndarray,
+        std_deviations: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized Method 1 for many (MT, SD) pairs at once
+
+        The coefficient of variation CV = SD / MT depends only on the shape:
+        - 1 + CV^2 = Gamma(1 + 2/alpha) / Gamma(1 + 1/alpha)^2
+
+        so alpha is found with a single vectorized 1-D root-find and beta follows
+        in closed form from beta = MT / Gamma(1 + 1/alpha).
+
+        Elements with a non-positive or non-finite MT/SD fall back to the simple
+        exponential (alpha=1, beta=MT), as in calculate_from_mean_sd.
+
+        Args:
+            mean_times: Array of Mean Times
+            std_deviations: Array of Standard Deviations (same shape as mean_times)
+
+        Returns:
+            Tuple of (alpha array, beta array)
+        """
+        mean_times = np.asarray(mean_times, dtype=np.float64)
+        std_deviations = np.asarray(std_deviations, dtype=np.float64)
+        mean_times, std_deviations = np.broadcast_arrays(mean_times, std_deviations)
+
+        alpha = np.ones(mean_times.shape)
+        beta = mean_times.copy()
+
+        valid = (
+            np.isfinite(mean_times) & np.isfinite(std_deviations)
+            & (mean_times > 0) & (std_deviations > 0)
+        )
+        if not np.any(valid):
+            return alpha, beta
+
+        cv = std_deviations[valid] / mean_times[valid]
+        log1p_cv2 = np.log1p(cv ** 2)
+        inv_shape = _solve_inv_shape_from_cv(log1p_cv2, inv_shape=_inv_shape_from_cv(log1p_cv2, newton_steps=0))
+
+        # Ensure positive values (same floor as the scalar solver)
+        alpha[valid] = np.maximum(0.1, 1.0 / inv_shape)
+        beta[valid] = np.maximum(0.1, mean_times[valid] * np.exp(-sp_special.gammaln(1 + inv_shape)))
+
+        return alpha, beta
+
+    @staticmethod
+    def calculate_from_manual_hours(failure_hours: List[float], method: str = "profile") -> Tuple[float, float]:
         """
         Method 2: Calculate Weibull parameters using Maximum Likelihood Estimation (MLE)
 
@@ -66,18 +613,36 @@ class ReliabilityCalculator:
 
         where gamma = 0 (two-parameter Weibull)
 
+        Engines:
+        - "profile" (default): beta is eliminated analytically and the 1-D profile
+          equation in alpha is solved with Halley steps using analytic derivatives,
+          in log-space so (t/beta)^alpha cannot overflow
+        - "lbfgsb": 2-D L-BFGS-B on the negative log-likelihood
+
         Args:
             failure_hours: List of failure times (manual input from user)
+            method: MLE engine, "profile" or "lbfgsb"
 
         Returns:
             Tuple of (alpha/shape, beta/scale) parameters
         """
         if not failure_hours or len(failure_hours) == 0:
             raise ValueError("failure_hours must contain at least one value")
+        if method not in MLE_METHODS:
+            raise ValueError(f"Unknown MLE method: {method}")
 
         ts = np.array(failure_hours)
         n = len(ts)
 
+        if method == "profile":
+            try:
+                alpha, beta, _ = _weibull_profile_mle(ts)
+                return alpha, beta
+            except ValueError as e:
+                print(f"Profile MLE failed: {e}")
+                # Fallback to method of moments
+                return ReliabilityCalculator.calculate_from_mean_sd(np.mean(ts), np.std(ts))
+
         def negative_log_likelihood(params):
             """Negative log-likelihood function to minimize"""
             alpha, beta = params
@@ -129,6 +694,130 @@ class ReliabilityCalculator:
             mean_val = np.mean(ts)
             return 1.0, mean_val
 
+    @staticmethod
+    def refit_manual_hours(
+        failure_hours: List[float],
+        previous_alpha: Optional[float] = None,
+        previous_count: Optional[int] = None,
+        previous_sum_log: Optional[float] = None
+    ) -> Tuple[float, float, int, Optional[float], int]:
+        """
+        Incremental Method 2 after failure hours are appended to a sample
+
+        The sufficient statistics (count, sum of ln t) of the previous fit are
+        updated with the new values only, and the profile MLE is warm-started from
+        the previous shape, so a single appended observation costs a couple of
+        Halley steps. Without a usable previous state this is a cold fit.
+
+        Args:
+            failure_hours: Full sample, whose first previous_count values were fitted before
+            previous_alpha: Shape of the previous fit
+            previous_count: Number of values in the previous fit
+            previous_sum_log: Sum of ln t over the previous values
+
+        Returns:
+            Tuple of (alpha, beta, count, sum_log, iterations); sum_log is None
+            when the sample has non-positive values, iterations is 0 for a
+            moment fallback
+        """
+        if not failure_hours or len(failure_hours) == 0:
+            raise ValueError("failure_hours must contain at least one value")
+
+        ts = np.asarray(failure_hours, dtype=np.float64)
+        n = len(ts)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            warm = (
+                previous_count is not None and previous_sum_log is not None
+                and 0 < previous_count <= n and np.isfinite(previous_sum_log)
+            )
+            if warm:
+                sum_log = float(previous_sum_log + np.sum(np.log(ts[previous_count:])))
+            else:
+                sum_log = float(np.sum(np.log(ts)))
+                previous_alpha = None
+        if not np.isfinite(sum_log):
+            sum_log = None
+
+        try:
+            if sum_log is None:
+                raise ValueError("failure_hours must be positive")
+            alpha, beta, iterations = _weibull_profile_mle(ts, alpha0=previous_alpha, mean_log=sum_log / n)
+        except ValueError as e:
+            print(f"Profile MLE failed: {e}")
+            alpha, beta = ReliabilityCalculator.calculate_from_mean_sd(np.mean(ts), np.std(ts))
+            iterations = 0
+
+        return float(alpha), float(beta), n, sum_log, iterations
+
+    @staticmethod
+    def calculate_three_parameter(failure_hours: List[float]) -> Tuple[float, float, float]:
+        """
+        Method 3: Three-parameter Weibull MLE (shape, scale and location gamma)
+
+        Maximizes the likelihood of calculate_from_manual_hours without fixing
+        gamma = 0:
+        R(t) = e^(-((t - gamma)/beta)^alpha),  t >= gamma
+
+        gamma is found by a bounded 1-D search over the profile likelihood in
+        [0, min(t)), reusing the two-parameter profile MLE as the inner solve.
+        Samples that cannot support a location estimate (fewer than three values,
+        non-positive values) fall back to the two-parameter fit with gamma = 0.
+        So do samples whose only "maximum" is the singularity at gamma -> min(t)
+        with shape < 1, where the likelihood is unbounded.
+
+        Args:
+            failure_hours: List of failure times (manual input from user)
+
+        Returns:
+            Tuple of (alpha/shape, beta/scale, gamma/location) parameters
+        """
+        if not failure_hours or len(failure_hours) == 0:
+            raise ValueError("failure_hours must contain at least one value")
+
+        try:
+            alpha, beta, gamma, _ = _weibull_three_parameter_mle(np.asarray(failure_hours, dtype=np.float64))
+            return alpha, beta, gamma
+        except ValueError as e:
+            print(f"Three-parameter MLE failed: {e}")
+            alpha, beta = ReliabilityCalculator.calculate_from_manual_hours(failure_hours)
+            return alpha, beta, 0.0
+
+    @staticmethod
+    def calculate_from_manual_hours_batch(samples: List[List[float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized Method 2 (profile MLE) for many ragged failure-hour samples
+
+        The samples are packed into one flat float64 buffer plus offsets and the
+        shape of every sample is iterated simultaneously with np.add.reduceat
+        segment reductions. Samples without a finite MLE fall back to the method
+        of moments, as in calculate_from_manual_hours.
+
+        Args:
+            samples: One list of failure hours per component / failure mode
+
+        Returns:
+            Tuple of (alpha array, beta array), one entry per sample
+        """
+        for i, sample in enumerate(samples):
+            if sample is None or len(sample) == 0:
+                raise ValueError(f"samples[{i}] must contain at least one value")
+
+        flat, offsets, lengths = pack_ragged(samples)
+        alpha, beta, valid = _weibull_profile_mle_packed(flat, offsets, lengths)
+
+        if not np.all(valid):
+            # Method of moments fallback on the raw sample (np.std, ddof=0)
+            mean = np.add.reduceat(flat, offsets) / lengths
+            dev = flat - np.repeat(mean, lengths)
+            std = np.sqrt(np.add.reduceat(dev * dev, offsets) / lengths)
+            invalid = ~valid
+            alpha[invalid], beta[invalid] = ReliabilityCalculator.calculate_from_mean_sd_batch(
+                mean[invalid], std[invalid]
+            )
+
+        return alpha, beta
+
     @staticmethod
     def calculate_reliability(alpha: float, beta: float, time: float) -> float:
         """
@@ -153,6 +842,147 @@ class ReliabilityCalculator:
         except (OverflowError, ValueError):
             return 0.0
 
+    @staticmethod
+    def calculate_confidence_bounds(
+        failure_hours: List[float],
+        mission_time: float,
+        confidence: float = 0.9,
+        method: str = "auto",
+        n_bootstrap: int = 2000,
+        seed: Optional[int] = None
+    ) -> Dict:
+        """
+        Two-sided confidence bounds on alpha, beta and R(mission_time)
+
+        Methods:
+        - "bootstrap": percentile bootstrap with n_bootstrap resamples, all fitted
+          in one batched profile-MLE pass (seedable through seed)
+        - "fisher": Fisher-matrix (observed information) bounds, a fast path
+          for large samples
+        - "auto": "fisher" when len(failure_hours) >= FISHER_MIN_SAMPLES or the
+          sample is too small for the bootstrap, otherwise "bootstrap"
+
+        The bootstrap needs at least BOOTSTRAP_MIN_SAMPLES values with
+        BOOTSTRAP_MIN_DISTINCT distinct ones; below that its bounds collapse onto
+        the estimate, so "bootstrap" raises ValueError and "auto" uses "fisher".
+
+        Args:
+            failure_hours: List of failure times (manual input from user)
+            mission_time: Time at which reliability bounds are reported
+            confidence: Two-sided confidence level, e.g. 0.9
+            method: "auto", "bootstrap" or "fisher"
+            n_bootstrap: Number of bootstrap resamples
+            seed: Seed for the bootstrap random generator
+
+        Returns:
+            Dict with "method", "confidence", and "alpha", "beta", "reliability"
+            entries holding estimate/lower/upper
+        """
+        if method not in CONFIDENCE_METHODS:
+            raise ValueError(f"Unknown confidence method: {method}")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        if mission_time <= 0:
+            raise ValueError("mission_time must be positive")
+
+        ts = np.asarray(failure_hours, dtype=np.float64)
+        # Raises ValueError for samples without a finite MLE
+        alpha, beta, _ = _weibull_profile_mle(ts)
+        reliability = ReliabilityCalculator.calculate_reliability(alpha, beta, mission_time)
+
+        bootstrap_ok = len(ts) >= BOOTSTRAP_MIN_SAMPLES and len(np.unique(ts)) >= BOOTSTRAP_MIN_DISTINCT
+        if method == "auto":
+            method = "fisher" if len(ts) >= FISHER_MIN_SAMPLES or not bootstrap_ok else "bootstrap"
+        elif method == "bootstrap" and not bootstrap_ok:
+            raise ValueError(
+                f"bootstrap bounds need at least {BOOTSTRAP_MIN_SAMPLES} failure hours with "
+                f"{BOOTSTRAP_MIN_DISTINCT} distinct values; use the Fisher-matrix bounds"
+            )
+
+        result = {"method": method, "confidence": confidence}
+        if method == "bootstrap":
+            if n_bootstrap < 2:
+                raise ValueError("n_bootstrap must be at least 2")
+            rng = np.random.default_rng(seed)
+            alpha_b, beta_b, reliability_b, used = _bootstrap_bounds(
+                ts, alpha, mission_time, confidence, n_bootstrap, rng
+            )
+            result["n_bootstrap"] = used
+        else:
+            alpha_b, beta_b, reliability_b = _fisher_bounds(ts, alpha, beta, mission_time, confidence)
+
+        result["alpha"] = _bound(alpha, *alpha_b)
+        result["beta"] = _bound(beta, *beta_b)
+        result["reliability"] = dict(time=float(mission_time), **_bound(reliability, *reliability_b))
+        return result
+
+    @staticmethod
+    def calculate_reliability_grid(alphas: np.ndarray, betas: np.ndarray, times: np.ndarray) -> np.ndarray:
+        """
+        R(t) = e^(-(t/beta)^alpha) for many components over a shared time grid
+
+        Same as calculate_curves(...)["reliability"] without the other matrices.
+
+        Returns:
+            (n_components x n_times) matrix; rows with a non-positive alpha or beta are NaN
+        """
+        alphas = np.atleast_1d(np.asarray(alphas, dtype=np.float64))[:, None]
+        betas = np.atleast_1d(np.asarray(betas, dtype=np.float64))[:, None]
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))[None, :]
+        if np.any(times < 0):
+            raise ValueError("times must be non-negative")
+
+        valid = (alphas > 0) & (betas > 0)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            cum_hazard = np.exp(np.where(valid, alphas, np.nan) * (np.log(times) - np.log(np.where(valid, betas, np.nan))))
+        return np.exp(-cum_hazard)
+
+    @staticmethod
+    def calculate_curves(alphas: np.ndarray, betas: np.ndarray, times: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Weibull curves for many components over a shared time grid
+
+        All matrices are (n_components x n_times), built by broadcasting in log space:
+        - H(t) = exp(alpha * (ln t - ln beta))       cumulative hazard
+        - R(t) = exp(-H),  F(t) = 1 - R = -expm1(-H)
+        - h(t) = (alpha / beta) * (t / beta)^(alpha - 1)   hazard rate
+        - f(t) = h(t) * R(t)                               pdf
+
+        Rows with a non-positive alpha or beta are NaN.
+
+        Args:
+            alphas: Shape parameters, one per component
+            betas: Scale parameters, one per component
+            times: Non-negative time points
+
+        Returns:
+            Dict with "reliability", "unreliability", "pdf" and "hazard" matrices
+        """
+        alphas = np.atleast_1d(np.asarray(alphas, dtype=np.float64))[:, None]
+        betas = np.atleast_1d(np.asarray(betas, dtype=np.float64))[:, None]
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))[None, :]
+        if np.any(times < 0):
+            raise ValueError("times must be non-negative")
+
+        valid = (alphas > 0) & (betas > 0)
+        alphas = np.where(valid, alphas, np.nan)
+        betas = np.where(valid, betas, np.nan)
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            log_ratio = np.log(times) - np.log(betas)
+            cum_hazard = np.exp(alphas * log_ratio)
+            # (alpha - 1) * ln(t/beta) is 0 * -inf at t = 0 for the exponential case
+            hazard_exp = np.where(alphas == 1, 0.0, (alphas - 1) * log_ratio)
+            hazard = np.exp(np.log(alphas) - np.log(betas) + hazard_exp)
+
+        reliability = np.exp(-cum_hazard)
+        return {
+            "reliability": reliability,
+            "unreliability": -np.expm1(-cum_hazard),
+            "pdf": np.where(reliability == 0, 0.0, hazard * reliability),
+            "hazard": hazard,
+        }
+
     @staticmethod
     def calculate_standard_reliability(
         mean_time: Optional[float] = None,
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+# Run from python-back/ or the repo root: make the backend packages importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Never touch a configured database from the tests
+os.environ["DATABASE_URL"] = "sqlite://"
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from models.database import Base, User  # noqa: E402
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a fresh SQLite database (a file, so worker threads get their own connections)"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="test@example.com", password_hash="x", username="test")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def client(session_factory, user, tmp_path, monkeypatch):
+    """API client as `user` on the test database, with uploads in tmp_path and a private CSV job queue"""
+    from fastapi.testclient import TestClient
+
+    from app import app
+    from routes import csv_upload
+    from services.csv_jobs import CsvJobQueue
+    from utils.auth import get_current_user
+    from utils.database import get_db
+
+    def override_get_db():
+        with session_factory() as session:
+            yield session
+
+    jobs = CsvJobQueue(workers=1, session_factory=session_factory)
+    monkeypatch.setattr(csv_upload, "csv_jobs", jobs)
+    monkeypatch.setattr(csv_upload, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        yield TestClient(app)
+    finally:
+        jobs.shutdown(wait=True)
+        app.dependency_overrides.clear()
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from services.reliability_calculator import ReliabilityCalculator
+
+
+def bounds(hours, method, **kwargs):
+    return ReliabilityCalculator.calculate_confidence_bounds(hours, mission_time=5.0, method=method, seed=0, **kwargs)
+
+
+@pytest.mark.parametrize("hours", [[5.0, 6.0], [5.0, 5.0, 5.0, 6.0]])
+def test_small_samples_never_get_zero_width_bootstrap_bounds(hours):
+    with pytest.raises(ValueError):
+        bounds(hours, "bootstrap")
+
+    result = bounds(hours, "auto")
+    assert result["method"] == "fisher"
+    for name in ("alpha", "beta"):
+        assert result[name]["lower"] < result[name]["estimate"] < result[name]["upper"]
+
+
+def test_bootstrap_rejects_mostly_degenerate_resamples():
+    # Five values, three distinct, but dominated by one value: many resamples are constant
+    with pytest.raises(ValueError, match="finite MLE"):
+        bounds([5.0] * 20 + [6.0, 7.0], "bootstrap", n_bootstrap=500)
+
+
+def test_bootstrap_bounds_contain_estimate():
+    hours = (np.random.default_rng(3).weibull(1.8, 20) * 1000).tolist()
+    result = bounds(hours, "bootstrap", n_bootstrap=500)
+    assert result["n_bootstrap"] >= 475
+    for name in ("alpha", "beta"):
+        assert result[name]["lower"] < result[name]["estimate"] < result[name]["upper"]
@@ -0,0 +1,72 @@
+import pandas as pd
+
+from models.database import Component
+from services.csv_processor import (
+    COPY_NULL,
+    aggregate_components,
+    build_component_frame,
+    copy_buffer,
+    insert_components,
+)
+
+
+def copy_fields(frame):
+    """Raw fields of the COPY input per row (test values contain no commas or quotes)"""
+    return [line.split(",") for line in copy_buffer(frame).getvalue().splitlines()]
+
+
+def test_copy_keeps_empty_component_names_and_writes_null_markers():
+    df = pd.DataFrame({
+        "Component": ["Motor", "   "],
+        "SupComponent": ["Bearing", ""],
+        "Failure mode": ["Wear", "Heat"],
+        "Failure hours": [100.0, None],
+    })
+    frame = build_component_frame(df, "user-1")
+    rows = copy_fields(frame)
+    columns = list(frame.columns)
+
+    motor, blank = (dict(zip(columns, row)) for row in rows)
+    assert motor["component_name"] == "Motor"
+    assert motor["machine_id"] == COPY_NULL
+    # With NULL '\N' an unquoted empty field is read as an empty string, not NULL
+    assert blank["component_name"] == ""
+    assert blank["sub_component"] == COPY_NULL
+    assert blank["failure_hours"] == COPY_NULL
+
+
+def test_aggregate_integer_columns_copy_as_integers_or_null():
+    events = pd.DataFrame({
+        "component_name": ["Pump", "Pump", "Fan"],
+        "sub_component": ["Seal", "Seal", None],
+        "failure_mode": ["Leak", "Leak", None],
+        "failure_hours": [120.0, 180.0, float("nan")],
+    })
+    frame = aggregate_components(events, "user-1")
+    assert list(frame["fit_count"].astype(object)) == [2, pd.NA]
+
+    columns = list(frame.columns)
+    # manual_hours is quoted JSON with commas; only read the columns before it
+    prefix = columns.index("manual_hours")
+    lines = copy_buffer(frame[columns[prefix + 1:]]).getvalue().splitlines()
+    fitted, unfitted = (dict(zip(columns[prefix + 1:], line.split(","))) for line in lines)
+    assert (fitted["failure_count"], fitted["fit_count"]) == ("2", "2")
+    assert (unfitted["failure_count"], unfitted["fit_count"]) == ("0", COPY_NULL)
+    assert unfitted["fit_alpha"] == COPY_NULL
+
+
+def test_aggregate_rows_insert_through_executemany(db, user):
+    events = pd.DataFrame({
+        "component_name": ["Pump", "Pump", "Fan"],
+        "sub_component": ["Seal", "Seal", None],
+        "failure_mode": ["Leak", "Leak", None],
+        "failure_hours": [120.0, 180.0, float("nan")],
+    })
+    assert insert_components(db, aggregate_components(events, user.id)) == 2
+    db.commit()
+
+    rows = {c.component_name: c for c in db.query(Component).all()}
+    assert rows["Pump"].fit_count == 2 and rows["Pump"].failure_count == 2
+    assert rows["Pump"].manual_hours == [120.0, 180.0]
+    assert rows["Fan"].fit_count is None and rows["Fan"].failure_hours is None
+    assert rows["Fan"].failure_count == 0
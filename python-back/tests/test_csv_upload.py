@@ -0,0 +1,77 @@
+import os
+
+from models.database import Component, CsvUpload
+from routes import csv_upload
+
+CSV = b"Component,SupComponent,Failure mode,Failure hours\nMotor,Bearing,Wear,8760\nMotor,Winding,Heat,4380\n"
+
+
+def upload(client, content=CSV, mode="rows"):
+    return client.post(f"/csv/upload?mode={mode}", files={"file": ("data.csv", content, "text/csv")})
+
+
+def stored_files(user):
+    directory = os.path.join(csv_upload.UPLOAD_DIR, user.id)
+    return os.listdir(directory) if os.path.isdir(directory) else []
+
+
+def test_identical_upload_returns_the_first_and_discards_its_copy(client, user):
+    first = upload(client)
+    assert first.status_code == 202
+    assert first.json()["content_hash"]
+
+    again = upload(client)
+    assert again.status_code == 200
+    assert again.json()["id"] == first.json()["id"]
+    assert len(stored_files(user)) == 1
+
+    assert upload(client, mode="aggregate").status_code == 202
+
+
+def test_completed_upload_whose_components_were_deleted_is_imported_again(client, user, db):
+    first = upload(client)
+    csv_upload.csv_jobs.shutdown(wait=True)
+    assert db.query(Component).filter(Component.csv_upload_id == first.json()["id"]).count() == 2
+
+    db.query(Component).filter(Component.csv_upload_id == first.json()["id"]).delete()
+    db.commit()
+
+    again = upload(client)
+    assert again.status_code == 202
+    assert again.json()["id"] != first.json()["id"]
+    assert len(stored_files(user)) == 2
+
+
+def test_stale_pending_upload_is_not_matched(client, user, db):
+    first = upload(client)
+    csv_upload.csv_jobs.shutdown(wait=True)
+
+    # A row left "processing" by a restart: no worker owns it any more
+    row = db.query(CsvUpload).filter(CsvUpload.id == first.json()["id"]).one()
+    row.status = "processing"
+    db.commit()
+
+    again = upload(client)
+    assert again.status_code == 202
+    assert again.json()["id"] != first.json()["id"]
+
+
+def test_upload_over_the_size_limit_is_rejected(client, user, monkeypatch):
+    monkeypatch.setattr(csv_upload, "MAX_UPLOAD_SIZE", len(CSV) - 1)
+    assert upload(client).status_code == 413
+    assert stored_files(user) == []
+
+
+def test_uploads_left_by_a_restart_are_marked_failed(client, user, db):
+    first = upload(client)
+    csv_upload.csv_jobs.shutdown(wait=True)
+    for status in ("pending", "processing"):
+        db.add(CsvUpload(user_id=user.id, filename="old.csv", file_size=1, status=status))
+    db.commit()
+
+    assert csv_upload.csv_jobs.fail_interrupted() == 2
+    db.expire_all()
+    statuses = sorted((u.status, u.error_message or "") for u in db.query(CsvUpload).all())
+    assert [s for s, _ in statuses] == ["completed", "failed", "failed"]
+    assert all("restart" in message for s, message in statuses if s == "failed")
+    assert db.query(CsvUpload).filter(CsvUpload.id == first.json()["id"]).one().status == "completed"
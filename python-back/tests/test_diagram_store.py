@@ -0,0 +1,71 @@
+import json
+
+import numpy as np
+import pytest
+
+import services.diagram_store as diagram_store
+from models.database import Component, Diagram, ReliabilityResult
+from services.diagram_store import cached_curve, get_compiled, grid_spec, structure_hash
+
+CONTENT = {
+    "nodeDataArray": [
+        {"key": "p", "isGroup": True, "text": "pumps"},
+        {"key": 1, "text": "A", "group": "p"},
+        {"key": 2, "text": "B", "group": "p"},
+    ]
+}
+
+
+@pytest.fixture
+def diagram(db, user):
+    a = Component(user_id=user.id, machine_name="M1", component_name="A", manual_hours=[100.0, 150.0, 210.0, 260.0])
+    b = Component(user_id=user.id, machine_name="M1", component_name="B", failure_hours=300.0)
+    db.add_all([a, b])
+    db.flush()
+    diagram = Diagram(
+        user_id=user.id, name="line", content=CONTENT,
+        bindings={"A": a.id, "B": b.id}, structure_hash=structure_hash(CONTENT)
+    )
+    db.add(diagram)
+    db.commit()
+    return diagram
+
+
+def curve(db, diagram, n_points=20):
+    return cached_curve(
+        db, diagram, get_compiled(diagram), None, grid_spec(None, 500.0, n_points),
+        lambda alphas, betas: np.linspace(0.0, 500.0, n_points)
+    )
+
+
+def test_hit_reads_the_stored_curve_without_fitting(db, diagram, monkeypatch):
+    times, r_system, cached = curve(db, diagram)
+    assert not cached and len(times) == 20 and r_system[0] == pytest.approx(1.0)
+
+    def no_fit(*args):
+        raise AssertionError("fitted on a cache hit")
+
+    monkeypatch.setattr(diagram_store, "source_parameters_bulk", no_fit)
+    assert curve(db, diagram) == (times, r_system, True)
+
+
+def test_editing_a_bound_row_changes_the_key(db, diagram):
+    _, before, _ = curve(db, diagram)
+    component = db.query(Component).filter(Component.component_name == "B").one()
+    component.failure_hours = 30.0
+    db.commit()
+
+    _, after, cached = curve(db, diagram)
+    assert not cached
+    assert after[-1] < before[-1]
+
+
+def test_stored_curves_are_capped_per_diagram(db, diagram, monkeypatch):
+    monkeypatch.setattr(diagram_store.prune_results, "__defaults__", (3,))
+    for n_points in range(2, 8):
+        curve(db, diagram, n_points)
+
+    rows = db.query(ReliabilityResult).filter(ReliabilityResult.diagram_id == diagram.id).all()
+    assert sorted(len(json.loads(r.results)["times"]) for r in rows) == [5, 6, 7]
+    assert curve(db, diagram, 7)[2]
+    assert not curve(db, diagram, 2)[2]
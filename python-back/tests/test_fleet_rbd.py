@@ -0,0 +1,56 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from models.database import Component, Diagram, ReliabilityResult
+from services import fleet_rbd
+from services.diagram_store import structure_hash
+from services.fleet_rbd import load_fleet, stream_fleet_curves
+
+
+CONTENT = {"nodeDataArray": [{"key": 1, "text": "A"}]}
+
+
+def add_diagram(db, user, name, component):
+    diagram = Diagram(
+        user_id=user.id, name=name, content=CONTENT,
+        bindings={"A": component.id}, structure_hash=structure_hash(CONTENT)
+    )
+    db.add(diagram)
+    return diagram
+
+
+def test_a_failing_diagram_does_not_truncate_the_stream(db, user, session_factory, monkeypatch):
+    pump = Component(user_id=user.id, machine_name="M", component_name="Pump", failure_hours=500.0)
+    fan = Component(user_id=user.id, machine_name="M", component_name="Fan", failure_hours=777.0)
+    db.add_all([pump, fan])
+    db.flush()
+    good = add_diagram(db, user, "good", pump)
+    bad = add_diagram(db, user, "bad", fan)
+    db.commit()
+
+    evaluate = fleet_rbd.evaluate_fleet_diagram
+
+    def flaky(index, rbd, alphas, betas, times):
+        if betas[0] == 777.0:
+            raise RuntimeError("worker died")
+        return evaluate(index, rbd, alphas, betas, times)
+
+    monkeypatch.setattr(fleet_rbd, "evaluate_fleet_diagram", flaky)
+    monkeypatch.setattr(fleet_rbd, "SessionLocal", session_factory)
+
+    jobs = load_fleet(db, user.id)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        lines = [json.loads(line) for line in stream_fleet_curves(
+            db, user.id, jobs, {"times": [0.0, 100.0]}, lambda a, b: np.array([0.0, 100.0]), executor=pool
+        )]
+
+    by_id = {line.get("diagram_id"): line for line in lines[:-1]}
+    assert by_id[good.id]["cached"] is False
+    assert by_id[bad.id]["error"] == "Evaluation failed: worker died"
+    assert lines[-1]["summary"]["evaluated"] == 1
+    assert lines[-1]["summary"]["failed"] == 1
+    assert lines[-1]["summary"]["stored"] == 1
+    stored = db.query(ReliabilityResult.diagram_id).filter(ReliabilityResult.analysis_type == "rbd").all()
+    assert [r.diagram_id for r in stored] == [good.id]
@@ -0,0 +1,36 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from models.database import Component, ReliabilityResult
+from services.fleet_refit import refit_user_components
+from services.reliability_calculator import ReliabilityCalculator
+
+
+def test_refit_replaces_previous_weibull_results(db, user):
+    db.add_all([
+        Component(user_id=user.id, machine_name="M", component_name="Pump", manual_hours=[100.0, 250.0, 400.0]),
+        Component(user_id=user.id, machine_name="M", component_name="Fan", failure_hours=900.0),
+    ])
+    db.commit()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for _ in range(3):
+            summary = refit_user_components(user.id, db, executor=pool, shard_size=1)
+            assert summary["results_written"] == 2
+
+    rows = db.query(ReliabilityResult).filter(ReliabilityResult.analysis_type == "weibull").all()
+    assert sorted(r.component.component_name for r in rows) == ["Fan", "Pump"]
+
+
+def test_refit_uses_the_aggregated_sd_for_rows_without_hours(db, user):
+    db.add(Component(user_id=user.id, machine_name="M", component_name="Gearbox", failure_hours=900.0, failure_sd=300.0))
+    db.commit()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        refit_user_components(user.id, db, executor=pool)
+
+    result = json.loads(db.query(ReliabilityResult).one().results)
+    assert result["method"] == "mean_sd"
+    assert (result["shape"], result["scale"]) == pytest.approx(ReliabilityCalculator.calculate_from_mean_sd(900.0, 300.0))
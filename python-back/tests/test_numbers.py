@@ -0,0 +1,10 @@
+import numpy as np
+
+from utils.numbers import finite_floats
+
+
+def test_finite_floats_are_python_floats_with_none_for_the_rest():
+    values = finite_floats(np.array([1.5, np.nan, np.inf, -np.inf, 0.0]))
+    assert values == [1.5, None, None, None, 0.0]
+    assert type(values[0]) is float
+    assert finite_floats([]) == []
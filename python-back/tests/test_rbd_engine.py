@@ -0,0 +1,132 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from services.rbd_engine import compile_diagram
+from services.reliability_calculator import ReliabilityCalculator
+
+NESTED = {
+    "nodeDataArray": [
+        {"key": "line", "isGroup": True, "horiz": True, "text": "line"},
+        {"key": "pumps", "isGroup": True, "group": "line", "text": "pumps"},
+        {"key": "train", "isGroup": True, "group": "pumps", "horiz": True, "text": "train"},
+        {"key": 1, "text": "P1", "group": "pumps"},
+        {"key": 2, "text": "V1", "group": "train"},
+        {"key": 3, "text": "P2", "group": "train"},
+        {"key": 4, "text": "M", "group": "line"},
+        {"key": 5, "text": "C"},
+    ]
+}
+
+
+def works(diagram, up):
+    """Structure function by recursion over the raw diagram: does the system work with these leaves up?"""
+    nodes = diagram["nodeDataArray"]
+    leaves = [n for n in nodes if not n.get("isGroup")]
+    state = {id(n): bool(s) for n, s in zip(leaves, up)}
+
+    def node_works(node):
+        if not node.get("isGroup"):
+            return state[id(node)]
+        members = [node_works(n) for n in nodes if n.get("group") == node["key"]]
+        if node.get("k") is not None:
+            return sum(members) >= node["k"]
+        return all(members) if node.get("horiz") else any(members)
+
+    return all(node_works(n) for n in nodes if n.get("group") is None)
+
+
+def brute_force(diagram, r):
+    """System reliability by enumerating all 2^n leaf states"""
+    total = 0.0
+    for up in itertools.product((0, 1), repeat=len(r)):
+        if works(diagram, up):
+            total += np.prod([p if u else 1.0 - p for p, u in zip(r, up)])
+    return total
+
+
+def test_evaluate_matches_state_enumeration():
+    rbd = compile_diagram(NESTED)
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        r = rng.uniform(0.0, 1.0, rbd.n_leaves)
+        assert rbd.evaluate(r) == pytest.approx(brute_force(NESTED, r), abs=1e-13)
+
+
+def test_evaluate_times_matches_state_enumeration_per_time():
+    rbd = compile_diagram(NESTED)
+    alphas = np.array([1.2, 0.8, 2.5, 1.0, 3.0])
+    betas = np.array([900.0, 4000.0, 1500.0, 2500.0, 6000.0])
+    times = np.array([0.0, 100.0, 1000.0, 5000.0])
+    curve = rbd.evaluate_times(alphas, betas, times)
+
+    leaf = ReliabilityCalculator.calculate_reliability_grid(alphas, betas, times)
+    expected = [brute_force(NESTED, leaf[:, j]) for j in range(len(times))]
+    np.testing.assert_allclose(curve, expected, atol=1e-13)
+
+
+def test_gradients_match_finite_differences():
+    rbd = compile_diagram(NESTED)
+    r = np.array([0.7, 0.8, 0.9, 0.85, 0.6])
+    _, gradient = rbd.gradients(r)
+
+    h = 1e-6
+    for column, node in enumerate(rbd.leaf_nodes):
+        up, down = r.copy(), r.copy()
+        up[column] += h
+        down[column] -= h
+        expected = (brute_force(NESTED, up) - brute_force(NESTED, down)) / (2 * h)
+        assert gradient[node] == pytest.approx(expected, abs=1e-8)
+
+
+VOTING = {
+    "nodeDataArray": [
+        {"key": "line", "isGroup": True, "horiz": True, "text": "line"},
+        {"key": "vote", "isGroup": True, "group": "line", "k": 2, "text": "sensors"},
+        {"key": "pair", "isGroup": True, "group": "vote", "text": "pair"},
+        {"key": "all", "isGroup": True, "k": 3, "text": "3-of-3"},
+        {"key": 1, "text": "S1", "group": "vote"},
+        {"key": 2, "text": "S2", "group": "vote"},
+        {"key": 3, "text": "S3a", "group": "pair"},
+        {"key": 4, "text": "S3b", "group": "pair"},
+        {"key": 5, "text": "M", "group": "line"},
+        {"key": 6, "text": "A", "group": "all"},
+        {"key": 7, "text": "B", "group": "all"},
+        {"key": 8, "text": "C", "group": "all"},
+    ]
+}
+
+
+@pytest.mark.parametrize("k", [1, 2, 3])
+def test_k_of_n_matches_state_enumeration(k):
+    diagram = {"nodeDataArray": [dict(n, k=k) if n["key"] == "vote" else n for n in VOTING["nodeDataArray"]]}
+    rbd = compile_diagram(diagram)
+    rng = np.random.default_rng(k)
+    for _ in range(10):
+        r = rng.uniform(0.0, 1.0, rbd.n_leaves)
+        assert rbd.evaluate(r) == pytest.approx(brute_force(diagram, r), abs=1e-13)
+
+
+def test_k_of_n_gradients_match_finite_differences():
+    rbd = compile_diagram(VOTING)
+    r = np.array([0.7, 0.8, 0.9, 0.85, 0.6, 0.95, 0.75, 0.65])
+    _, gradient = rbd.gradients(r)
+
+    h = 1e-6
+    for column, node in enumerate(rbd.leaf_nodes):
+        up, down = r.copy(), r.copy()
+        up[column] += h
+        down[column] -= h
+        expected = (brute_force(VOTING, up) - brute_force(VOTING, down)) / (2 * h)
+        assert gradient[node] == pytest.approx(expected, abs=1e-8)
+
+
+def test_system_failure_time_is_the_first_time_the_structure_fails():
+    rbd = compile_diagram(VOTING)
+    leaf_times = np.random.default_rng(5).exponential(1000.0, (rbd.n_leaves, 50))
+    system = rbd.system_failure_times(leaf_times)
+
+    for j in range(leaf_times.shape[1]):
+        failed = [t for t in sorted(leaf_times[:, j]) if not works(VOTING, leaf_times[:, j] > t)]
+        assert system[j] == failed[0]
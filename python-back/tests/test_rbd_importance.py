@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from services.rbd_engine import compile_diagram
+
+DIAGRAM = {
+    "nodeDataArray": [
+        {"key": "line", "isGroup": True, "horiz": True, "text": "line"},
+        {"key": "pumps", "isGroup": True, "group": "line", "text": "pumps"},
+        {"key": "vote", "isGroup": True, "group": "line", "k": 2, "text": "sensors"},
+        {"key": 1, "text": "P1", "group": "pumps"},
+        {"key": 2, "text": "P2", "group": "pumps"},
+        {"key": 3, "text": "S1", "group": "vote"},
+        {"key": 4, "text": "S2", "group": "vote"},
+        {"key": 5, "text": "S3", "group": "vote"},
+        {"key": 6, "text": "M", "group": "line"},
+    ]
+}
+
+
+def test_rrw_of_leaves_matches_reevaluation_with_the_leaf_perfect():
+    rbd = compile_diagram(DIAGRAM)
+    r = np.array([0.7, 0.8, 0.9, 0.85, 0.6, 0.95])
+    measures = rbd.importance(r)
+    f_sys = 1.0 - rbd.evaluate(r)
+
+    for column, node in enumerate(rbd.leaf_nodes):
+        perfect = r.copy()
+        perfect[column] = 1.0
+        expected = f_sys / (1.0 - rbd.evaluate(perfect))
+        assert measures["rrw"][node] == pytest.approx(expected, rel=1e-12)
+
+
+def test_rrw_of_a_parallel_member_is_inf():
+    rbd = compile_diagram({
+        "nodeDataArray": [
+            {"key": "p", "isGroup": True, "text": "redundant"},
+            {"key": 1, "text": "A", "group": "p"},
+            {"key": 2, "text": "B", "group": "p"},
+        ]
+    })
+    for r in ([0.9, 0.8], [1 - 1e-9, 1 - 3e-7], [0.3, 1 - 1e-12]):
+        rrw = rbd.importance(np.array(r))["rrw"]
+        assert np.all(np.isinf(rrw[rbd.leaf_nodes]))
+
+
+def test_rrw_over_a_time_grid_matches_single_points():
+    rbd = compile_diagram(DIAGRAM)
+    grid = np.array([[0.7, 0.99], [0.8, 0.5], [0.9, 0.9], [0.85, 0.2], [0.6, 0.999], [0.95, 0.7]])
+    rrw = rbd.importance(grid)["rrw"]
+    for t in range(grid.shape[1]):
+        np.testing.assert_allclose(rrw[:, t], rbd.importance(grid[:, t])["rrw"], rtol=1e-12)
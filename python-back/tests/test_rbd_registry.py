@@ -0,0 +1,90 @@
+from services.rbd_incremental import RBDRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_read_entry_is_evicted_past_maxsize():
+    registry = RBDRegistry(maxsize=2, ttl=3600)
+    registry.register("a", "u1", "rbd-a", ["c1"])
+    registry.register("b", "u1", "rbd-b", ["c2"])
+    assert registry.get("a", "u1") == "rbd-a"
+
+    registry.register("c", "u1", "rbd-c", ["c3"])
+
+    assert len(registry) == 2
+    assert registry.get("b", "u1") is None
+    assert registry.get("a", "u1") == "rbd-a"
+    assert not registry.watches("c2")
+    assert registry.watches("c1") and registry.watches("c3")
+
+
+def test_idle_entries_expire_after_ttl():
+    clock = FakeClock()
+    registry = RBDRegistry(maxsize=10, ttl=60, clock=clock)
+    registry.register("a", "u1", "rbd-a", ["c1"])
+    registry.register("b", "u1", "rbd-b", ["c1", "c2"])
+
+    clock.now = 50
+    assert registry.get("b", "u1") == "rbd-b"
+
+    clock.now = 100
+    assert registry.get("a", "u1") is None
+    assert registry.get("b", "u1") == "rbd-b"
+    assert registry.watches("c1")
+
+    clock.now = 200
+    assert len(registry) == 0
+    assert not registry.watches("c1") and not registry.watches("c2")
+
+
+def test_get_and_remove_are_scoped_to_the_owner():
+    registry = RBDRegistry(maxsize=10, ttl=60)
+    registry.register("a", "u1", "rbd-a", ["c1"])
+
+    assert registry.get("a", "u2") is None
+    assert not registry.remove("a", "u2")
+    assert registry.remove("a", "u1")
+    assert not registry.watches("c1")
+
+
+def live_entry(registry):
+    from services.rbd_engine import compile_diagram
+    from services.rbd_incremental import IncrementalRBD
+
+    rbd = compile_diagram({"nodeDataArray": [{"key": 1, "text": "A"}, {"key": 2, "text": "B"}]})
+    evaluator = IncrementalRBD(rbd, [1.0, 2.0], [100.0, 200.0], [0.0, 50.0])
+    registry.register("a", "u1", evaluator, ["c1", "c2"])
+    return evaluator
+
+
+def test_leaves_of_a_row_without_parameters_are_reported_stale_until_refitted():
+    registry = RBDRegistry(maxsize=10, ttl=60)
+    live_entry(registry)
+    before = registry.snapshot("a", "u1")["r_system"]
+
+    assert registry.mark_stale("u1", "c1") == {"a": 0}
+    snapshot = registry.snapshot("a", "u1")
+    assert snapshot["stale_sources"] == ["c1"]
+    assert list(snapshot["r_system"]) == list(before)
+
+    registry.update_source("u1", "c1", 1.5, 120.0)
+    assert registry.snapshot("a", "u1")["stale_sources"] == []
+
+
+def test_deleted_rows_stay_stale_and_snapshots_are_copies():
+    registry = RBDRegistry(maxsize=10, ttl=60)
+    evaluator = live_entry(registry)
+    snapshot = registry.snapshot("a", "u1")
+
+    registry.unbind_source("c2")
+    registry.update_source("u1", "c1", 1.5, 120.0)
+
+    assert registry.snapshot("a", "u1")["stale_sources"] == ["c2"]
+    assert snapshot["r_system"][1] != evaluator.r_system[1]
+    assert registry.snapshot("a", "u2") is None
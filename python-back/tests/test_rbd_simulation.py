@@ -0,0 +1,33 @@
+import json
+
+import numpy as np
+
+from services.rbd_engine import compile_diagram
+from services.rbd_simulation import SEED_BITS, simulate_system
+
+DIAGRAM = {
+    "nodeDataArray": [
+        {"key": "p", "isGroup": True, "text": "pumps"},
+        {"key": 1, "text": "A", "group": "p"},
+        {"key": 2, "text": "B", "group": "p"},
+        {"key": 3, "text": "C"},
+    ]
+}
+
+
+def simulate(seed=None):
+    rbd = compile_diagram(DIAGRAM)
+    return simulate_system(rbd, np.array([1.5, 2.0, 3.0]), np.array([100.0, 120.0, 300.0]), 2000, seed=seed)
+
+
+def test_drawn_seed_survives_json_and_reproduces_the_run():
+    first = simulate()
+    seed = json.loads(json.dumps(first["seed"], allow_nan=False), parse_int=float)
+
+    assert 0 <= first["seed"] < 2 ** SEED_BITS
+    assert seed == first["seed"]
+    assert simulate(int(seed))["mttf"] == first["mttf"]
+
+
+def test_given_seed_is_reported_unchanged():
+    assert simulate(12345)["seed"] == 12345
@@ -0,0 +1,29 @@
+from services.reliability_cache import ReliabilityCache
+
+
+def test_entries_are_keyed_by_content_only():
+    cache = ReliabilityCache(maxsize=2)
+    calls = []
+
+    def fit():
+        calls.append(1)
+        return (1.5, 900.0, 0.99)
+
+    key = ReliabilityCache.fingerprint("mle", manual_hours=[100, 200.0], time=1)
+    # Two components with the same hours share one entry
+    assert cache.get_or_compute(key, fit) == cache.get_or_compute(
+        ReliabilityCache.fingerprint("mle", manual_hours=[100.0, 200], time=1.0), fit
+    )
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ReliabilityCache(maxsize=2)
+    for key in ("a", "b"):
+        cache.get_or_compute(key, lambda: (1.0, 1.0, 1.0))
+    cache.get_or_compute("a", lambda: (2.0, 2.0, 2.0))
+    cache.get_or_compute("c", lambda: (3.0, 3.0, 3.0))
+
+    assert cache.get_or_compute("a", lambda: (9.0, 9.0, 9.0)) == (1.0, 1.0, 1.0)
+    assert cache.get_or_compute("b", lambda: (9.0, 9.0, 9.0)) == (9.0, 9.0, 9.0)
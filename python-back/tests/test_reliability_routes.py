@@ -0,0 +1,87 @@
+import pytest
+
+BAD_DIAGRAMS = [
+    ({"nodeDataArray": [{"key": "g", "isGroup": True}, {"key": "g", "isGroup": True}]}, "Duplicate group key"),
+    ({"nodeDataArray": [{"key": 1, "text": "A", "group": "missing"}]}, "unknown group"),
+]
+
+
+@pytest.mark.parametrize("diagram, message", BAD_DIAGRAMS)
+@pytest.mark.parametrize("path, extra", [
+    ("/reliability/rbd/evaluate", {"reliabilities": {"A": 0.9}}),
+    ("/reliability/rbd/curve", {"parameters": {"A": {"shape": 2.0, "scale": 100.0}}}),
+    ("/reliability/rbd/live", {"bindings": {"A": "component-1"}}),
+])
+def test_invalid_diagrams_are_400(client, path, extra, diagram, message):
+    response = client.post(path, json={"diagram": diagram, **extra})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid diagram: ")
+    assert message in response.json()["detail"]
+
+
+def test_missing_leaf_value_is_400(client):
+    diagram = {"nodeDataArray": [{"key": 1, "text": "A"}, {"key": 2, "text": "B"}]}
+    response = client.post("/reliability/rbd/evaluate", json={"diagram": diagram, "reliabilities": {"A": 0.9}})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid diagram: ")
+
+
+def test_curves_use_the_stored_fit_only_while_it_is_current(client, db, user):
+    from models.database import Component
+
+    current = Component(
+        user_id=user.id, machine_name="M", component_name="Pump", manual_hours=[100.0, 250.0, 400.0],
+        fit_alpha=1.25, fit_beta=321.0, fit_count=3
+    )
+    stale = Component(
+        user_id=user.id, machine_name="M", component_name="Fan", manual_hours=[100.0, 250.0, 400.0],
+        fit_alpha=1.25, fit_beta=321.0, fit_count=2
+    )
+    db.add_all([current, stale])
+    db.commit()
+
+    response = client.post("/reliability/curves", json={"component_ids": [current.id, stale.id], "times": [0, 100]})
+    assert response.status_code == 200
+    curves = response.json()["curves"]
+    assert (curves[0]["shape"], curves[0]["scale"]) == (1.25, 321.0)
+    assert curves[1]["shape"] != 1.25
+
+
+def test_live_diagram_reports_a_failure_item_that_lost_its_parameters(client, db, user):
+    from models.database import Component, FailureItem, FailureParameter
+
+    component = Component(user_id=user.id, machine_name="M", component_name="Pump", failure_hours=500.0)
+    db.add(component)
+    db.flush()
+    item = FailureItem(user_id=user.id, component_id=component.id, failure_item_id="fi-1", failure_item_name="Seal")
+    db.add(item)
+    db.flush()
+    shape = FailureParameter(user_id=user.id, failure_item_id=item.id, parameter_type="weibull_shape", parameter_value=2.0)
+    scale = FailureParameter(user_id=user.id, failure_item_id=item.id, parameter_type="weibull_scale", parameter_value=300.0)
+    db.add_all([shape, scale])
+    db.commit()
+
+    diagram = {"nodeDataArray": [{"key": 1, "text": "A"}, {"key": 2, "text": "B"}]}
+    created = client.post("/reliability/rbd/live", json={
+        "diagram": diagram, "bindings": {"A": component.id, "B": item.id}, "times": [0, 100]
+    })
+    assert created.status_code == 201
+    entry_id = created.json()["id"]
+
+    assert client.delete(f"/failure-items/{item.id}/parameters/{scale.id}").status_code == 204
+    live = client.get(f"/reliability/rbd/live/{entry_id}").json()
+    assert live["stale_sources"] == [item.id]
+    assert live["r_system"] == created.json()["r_system"]
+
+
+def test_curves_fit_aggregated_components_without_hours_from_mean_and_sd(client, db, user):
+    from models.database import Component
+    from services.reliability_calculator import ReliabilityCalculator
+
+    component = Component(user_id=user.id, machine_name="M", component_name="Gearbox", failure_hours=900.0, failure_sd=300.0)
+    db.add(component)
+    db.commit()
+
+    curve = client.post("/reliability/curves", json={"component_ids": [component.id], "times": [0, 100]}).json()["curves"][0]
+    assert (curve["shape"], curve["scale"]) == pytest.approx(ReliabilityCalculator.calculate_from_mean_sd(900.0, 300.0))
+    assert curve["shape"] > 1
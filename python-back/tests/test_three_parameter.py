@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from services.reliability_calculator import ReliabilityCalculator
+
+
+@pytest.mark.parametrize("hours", [[500, 550, 580, 600], [10, 11, 30, 50, 80, 100]])
+def test_singular_location_falls_back_to_two_parameter_fit(hours):
+    alpha, beta, gamma = ReliabilityCalculator.calculate_three_parameter(hours)
+    alpha2, beta2 = ReliabilityCalculator.calculate_from_manual_hours(hours)
+    # Never the gamma -> min(t) singularity with shape < 1
+    assert gamma < min(hours) * (1 - 1e-3)
+    assert gamma == 0.0
+    assert alpha == pytest.approx(alpha2)
+    assert beta == pytest.approx(beta2)
+
+
+def test_interior_location_is_recovered():
+    rng = np.random.default_rng(1)
+    hours = (1000 + rng.weibull(2.5, 200) * 3000).tolist()
+    alpha, beta, gamma = ReliabilityCalculator.calculate_three_parameter(hours)
+    assert 500 < gamma < min(hours)
+    assert alpha > 1
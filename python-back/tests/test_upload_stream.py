@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from routes import csv_upload
+from routes.csv_upload import receive_upload
+
+BOUNDARY = "testboundary"
+
+
+def multipart_body(content: bytes, filename: str = "data.csv", field: str = "file") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+class StreamedRequest:
+    """ASGI request whose body arrives in chunks; counts the chunks read"""
+
+    def __init__(self, body: bytes, chunk_size: int = 1024, content_length: bool = True):
+        self.chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        self.read = 0
+        headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+        if content_length:
+            headers.append((b"content-length", str(len(body)).encode()))
+        self.request = Request({"type": "http", "method": "POST", "headers": headers}, self.receive)
+
+    async def receive(self):
+        chunk = self.chunks[self.read]
+        self.read += 1
+        return {"type": "http.request", "body": chunk, "more_body": self.read < len(self.chunks)}
+
+
+def receive(streamed):
+    return asyncio.run(receive_upload(streamed.request))
+
+
+def test_file_is_spooled_and_hashed_in_one_pass_and_saved_on_demand(tmp_path):
+    content = b"Component,Failure hours\n" + b"Motor,100\n" * 1000
+    upload = receive(StreamedRequest(multipart_body(content, filename="C:\\data\\line.csv")))
+
+    assert upload.filename == "line.csv"
+    assert upload.size == len(content)
+    assert upload.digest.hexdigest() == hashlib.sha256(content).hexdigest()
+    assert list(tmp_path.iterdir()) == []
+
+    path = upload.save(str(tmp_path / "user"))
+    assert path == upload.file_path and path.endswith("_line.csv")
+    with open(path, "rb") as f:
+        assert f.read() == content
+
+
+def test_spool_spills_past_its_memory_size(monkeypatch):
+    monkeypatch.setattr(csv_upload, "UPLOAD_SPOOL_SIZE", 1000)
+    monkeypatch.setattr(csv_upload, "UPLOAD_CHUNK_SIZE", 100)
+    upload = receive(StreamedRequest(multipart_body(b"a,b\n" * 1000)))
+    assert upload._spool._rolled
+    upload.close()
+    assert upload._spool is None
+
+
+def test_content_length_over_the_limit_is_rejected_before_reading(monkeypatch):
+    monkeypatch.setattr(csv_upload, "MAX_UPLOAD_SIZE", 1000)
+    streamed = StreamedRequest(multipart_body(b"x" * 200_000))
+    with pytest.raises(HTTPException) as e:
+        receive(streamed)
+    assert e.value.status_code == 413
+    assert streamed.read == 0
+
+
+def test_streamed_file_over_the_limit_stops_reading(monkeypatch):
+    monkeypatch.setattr(csv_upload, "MAX_UPLOAD_SIZE", 10_000)
+    streamed = StreamedRequest(multipart_body(b"x" * 200_000), content_length=False)
+    with pytest.raises(HTTPException) as e:
+        receive(streamed)
+    assert e.value.status_code == 413
+    assert streamed.read < len(streamed.chunks) // 10
+
+
+@pytest.mark.parametrize("body", [
+    multipart_body(b"a,b\n", filename="data.txt"),
+    multipart_body(b"a,b\n", field="other"),
+    multipart_body(b"a,b\n")[:-20],
+])
+def test_bad_forms_are_rejected(body):
+    with pytest.raises(HTTPException) as e:
+        receive(StreamedRequest(body))
+    assert e.value.status_code == 400
+
+
+def test_upload_form_is_documented(client):
+    body = client.get("/openapi.json").json()["paths"]["/csv/upload"]["post"]["requestBody"]
+    assert "file" in body["content"]["multipart/form-data"]["schema"]["properties"]
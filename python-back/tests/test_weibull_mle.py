@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from services.reliability_calculator import ReliabilityCalculator
+
+
+def sample(seed, n, alpha=1.8, beta=4000.0):
+    return (np.random.default_rng(seed).weibull(alpha, n) * beta).tolist()
+
+
+@pytest.mark.parametrize("seed,n,alpha", [(1, 5, 0.8), (2, 40, 1.8), (3, 400, 3.5), (4, 25, 12.0)])
+def test_profile_mle_matches_scipy(seed, n, alpha):
+    hours = sample(seed, n, alpha)
+    fit_alpha, fit_beta = ReliabilityCalculator.calculate_from_manual_hours(hours)
+    ref_alpha, _, ref_beta = stats.weibull_min.fit(hours, floc=0)
+    assert fit_alpha == pytest.approx(ref_alpha, rel=1e-4)
+    assert fit_beta == pytest.approx(ref_beta, rel=1e-4)
+
+
+def test_profile_mle_matches_lbfgsb():
+    hours = sample(5, 60)
+    profile = ReliabilityCalculator.calculate_from_manual_hours(hours, method="profile")
+    lbfgsb = ReliabilityCalculator.calculate_from_manual_hours(hours, method="lbfgsb")
+    assert profile == pytest.approx(lbfgsb, rel=1e-3)
+
+
+def test_batch_mle_matches_the_single_fit():
+    rng = np.random.default_rng(11)
+    samples = [sample(seed, int(rng.integers(1, 80)), rng.uniform(0.5, 6.0)) for seed in range(200)]
+    samples.append([250.0, 250.0, 250.0])
+    alphas, betas = ReliabilityCalculator.calculate_from_manual_hours_batch(samples)
+
+    expected = np.array([ReliabilityCalculator.calculate_from_manual_hours(s) for s in samples])
+    np.testing.assert_allclose(alphas, expected[:, 0], rtol=1e-8)
+    np.testing.assert_allclose(betas, expected[:, 1], rtol=1e-8)
+
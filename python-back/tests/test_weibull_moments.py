@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from scipy import special
+
+from services.reliability_calculator import ReliabilityCalculator
+
+
+def weibull_mean_sd(alpha, beta):
+    g1 = special.gamma(1 + 1 / alpha)
+    g2 = special.gamma(1 + 2 / alpha)
+    return beta * g1, beta * np.sqrt(g2 - g1 * g1)
+
+
+@pytest.mark.parametrize("alpha", [0.3, 0.7, 1.0, 1.5, 3.4, 8.0, 25.0])
+@pytest.mark.parametrize("beta", [12.0, 8760.0])
+def test_moment_fit_reproduces_the_weibull_mean_and_sd(alpha, beta):
+    mean, sd = weibull_mean_sd(alpha, beta)
+    fit_alpha, fit_beta = ReliabilityCalculator.calculate_from_mean_sd(mean, sd)
+    assert fit_alpha == pytest.approx(alpha, rel=1e-8)
+    assert fit_beta == pytest.approx(beta, rel=1e-8)
+
+
+def test_batch_moment_fit_matches_the_scalar_fit():
+    rng = np.random.default_rng(7)
+    means = rng.uniform(10, 20000, 500)
+    sds = means * rng.uniform(0.05, 4.0, 500)
+    alphas, betas = ReliabilityCalculator.calculate_from_mean_sd_batch(means, sds)
+
+    expected = np.array([ReliabilityCalculator.calculate_from_mean_sd(m, s) for m, s in zip(means, sds)])
+    np.testing.assert_allclose(alphas, expected[:, 0], rtol=1e-9)
+    np.testing.assert_allclose(betas, expected[:, 1], rtol=1e-9)
+
+
+def test_batch_moment_fit_falls_back_to_exponential_on_invalid_input():
+    means = np.array([100.0, -5.0, 100.0, np.nan])
+    sds = np.array([0.0, 10.0, np.inf, 10.0])
+    alphas, betas = ReliabilityCalculator.calculate_from_mean_sd_batch(means, sds)
+    np.testing.assert_array_equal(alphas, 1.0)
+    np.testing.assert_array_equal(betas, means)
@@ -0,0 +1,15 @@
+"""
+Numeric helpers shared by routes and services
+"""
+from typing import List, Optional
+
+import numpy as np
+
+
+def finite_floats(values) -> List[Optional[float]]:
+    """Python floats of a 1-D array, None where not finite (JSON / NULL safe)"""
+    array = np.asarray(values, dtype=np.float64)
+    result = array.tolist()
+    for i in np.flatnonzero(~np.isfinite(array)):
+        result[i] = None
+    return result